@@ -79,6 +79,54 @@ async def update_strategy(strategy_name: str, update: StrategyConfigUpdate, db:
     db.refresh(config)
     return {"success": True, "data": config}
 
+@router.get("/providers")
+async def get_provider_stats():
+    """
+    Upstream data provider diagnostics: rate limiter wait counters,
+    request coalescing, circuit breaker state and quote cache statistics.
+    """
+    from services.rate_limiter import limiter_stats
+    from services.circuit_breaker import breaker_stats
+    from services.data_provider import inflight, quote_cache, ohlcv_store, intraday_archive
+    from services import quote_stream
+    from services.indicators import indicator_cache
+    return {
+        "success": True,
+        "data": {
+            "rate_limits": limiter_stats(),
+            "single_flight": inflight.stats(),
+            "circuit_breakers": breaker_stats(),
+            "quote_cache": quote_cache.stats(),
+            "ohlcv_store": ohlcv_store.stats(),
+            "intraday_archive": intraday_archive.stats(),
+            "quote_stream": quote_stream.quote_stream.stats() if quote_stream.quote_stream else None,
+            "indicator_cache": indicator_cache.stats(),
+        }
+    }
+
+
+@router.get("/scanner")
+async def get_scanner_stats():
+    """
+    Last market scan timings per shard, compared against the background
+    scan interval, plus the symbol universe tags available for scanning.
+    """
+    from services.signal_service import last_scan_report
+    from services.background_scanner import SCAN_INTERVAL_SECONDS
+    from services.symbol_universe import get_universe
+    report = dict(last_scan_report)
+    if report:
+        report["fits_interval"] = report["total_seconds"] <= SCAN_INTERVAL_SECONDS
+    universe = get_universe()
+    return {
+        "success": True,
+        "data": {
+            "interval_seconds": SCAN_INTERVAL_SECONDS,
+            "last_scan": report or None,
+            "universe": {"symbols": len(universe), "tags": universe.tags()},
+        }
+    }
+
 @router.post("/scan")
 async def trigger_manual_scan(
     symbols: List[str] = Body(default=["RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "SBIN.NS"]), 
@@ -3,7 +3,8 @@ Market status API routes.
 """
 from fastapi import APIRouter, HTTPException
 from services.market_status import get_market_status
-from services.data_provider import get_index_value
+from services.async_quotes import get_index_value_async
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,11 +27,13 @@ def market_status():
 
 
 @router.get("/indices")
-def market_indices():
+async def market_indices():
     """Get current values of major indices (NIFTY 50, BANK NIFTY)."""
     try:
-        nifty = get_index_value('NIFTY')
-        bank_nifty = get_index_value('BANKNIFTY')
+        nifty, bank_nifty = await asyncio.gather(
+            get_index_value_async('NIFTY'),
+            get_index_value_async('BANKNIFTY')
+        )
         
         indices = []
         if nifty:
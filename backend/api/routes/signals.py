@@ -6,9 +6,11 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
-from services.signal_generator import generate_signal
+from services.signal_generator import generate_signal, strategy_requirements
 from services.data_provider import get_stock_info, get_ohlcv_data, NIFTY_50_SYMBOLS
 from services.indicators import calculate_all_indicators
+from services.multi_timeframe import attach_confirmations
+from services.signal_batch import signal_series
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
@@ -84,7 +86,8 @@ def get_signal_by_id(
 def get_signal_for_stock(
     symbol: str,
     exchange: str = Query(default="NSE", pattern="^(NSE|BSE)$"),
-    strategy: str = Query(default="combined", pattern="^(combined|rsi_macd|bb_volume|ema_crossover|vwap_reversal)$")
+    strategy: str = Query(default="combined", pattern="^(combined|rsi_macd|bb_volume|ema_crossover|vwap_reversal)$"),
+    db: Session = Depends(get_db)
 ):
     """
     Generate a trading signal for a specific stock.
@@ -108,13 +111,21 @@ def get_signal_for_stock(
         if not ohlcv or len(ohlcv) < 50:
             raise HTTPException(status_code=400, detail=f"Insufficient data for {symbol}")
         
+        # Strategy parameters tuned by the admin decide which periods are computed
+        configs = db.query(models.StrategyConfig).filter(models.StrategyConfig.is_active == True).all()
+        config_dict = {c.strategy_name: c.parameters for c in configs}
+        
         # Calculate indicators
-        indicators = calculate_all_indicators(ohlcv)
+        indicators = calculate_all_indicators(
+            ohlcv, symbol, '1d', exchange, requirements=strategy_requirements(config_dict)
+        )
         if not indicators:
             raise HTTPException(status_code=500, detail="Failed to calculate indicators")
+        # Higher-timeframe summary the strategy's config confirms against, if any
+        attach_confirmations(indicators, symbol, '1d', config_dict, strategy, exchange)
         
         # Generate signal
-        signal = generate_signal(symbol, current_price, indicators, strategy)
+        signal = generate_signal(symbol, current_price, indicators, strategy, config_dict)
         
         # Add stock metadata
         signal['stock'] = {
@@ -141,6 +152,63 @@ def get_signal_for_stock(
         raise HTTPException(status_code=500, detail="Failed to generate signal")
 
 
+@router.get("/stock/{symbol}/history")
+def get_signal_history(
+    symbol: str,
+    exchange: str = Query(default="NSE", pattern="^(NSE|BSE)$"),
+    strategy: str = Query(default="combined", pattern="^(combined|rsi_macd|bb_volume|ema_crossover|vwap_reversal)$"),
+    timeframe: str = Query(default="1d", pattern="^(1m|5m|15m|1h|1d)$"),
+    period: str = Query(default="6mo", pattern="^(1d|5d|1mo|3mo|6mo|1y|2y|5y)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    The strategy's signal at every bar of a stock's history (from the 50th
+    bar on, when live signals become available), for signal-history charts.
+    """
+    try:
+        symbol = symbol.upper()
+        ohlcv = get_ohlcv_data(symbol, timeframe, period, exchange)
+        if not ohlcv or len(ohlcv) < 50:
+            raise HTTPException(status_code=400, detail=f"Insufficient data for {symbol}")
+        
+        configs = db.query(models.StrategyConfig).filter(models.StrategyConfig.is_active == True).all()
+        config_dict = {c.strategy_name: c.parameters for c in configs}
+        signals = signal_series(ohlcv, strategy, config_dict)
+        
+        history = [
+            {
+                'timestamp': ts.isoformat(),
+                'close': round(close, 2),
+                'signal': signal,
+                'confidence': confidence,
+                'stop_loss': round(stop_loss, 2),
+                'target': round(target, 2),
+            }
+            for ts, close, signal, confidence, stop_loss, target in zip(
+                ohlcv.index()[49:],
+                ohlcv.close[49:].tolist(),
+                signals.signals[49:].tolist(),
+                signals.confidence[49:].tolist(),
+                signals.stop_loss[49:].tolist(),
+                signals.target[49:].tolist()
+            )
+        ]
+        
+        return {
+            "success": True,
+            "symbol": symbol,
+            "strategy": strategy,
+            "timeframe": timeframe,
+            "count": len(history),
+            "data": history
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating signal history for {symbol}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate signal history")
+
+
 @router.post("/generate")
 def trigger_signal_generation(
     symbols: Optional[List[str]] = None,
@@ -5,11 +5,12 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from services.data_provider import (
     get_stock_info,
-    get_ohlcv_data,
-    get_all_nifty50_stocks,
     NIFTY_50_SYMBOLS
 )
+from services.async_quotes import get_all_nifty50_stocks_async
+from services.quote_stream import get_live_ohlcv
 from services.indicators import calculate_all_indicators
+from services.multi_timeframe import DEFAULT_TIMEFRAMES, get_multi_timeframe_indicators
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,10 +19,10 @@ router = APIRouter(prefix="/api/stocks", tags=["stocks"])
 
 
 @router.get("")
-def list_stocks():
+async def list_stocks():
     """Get list of all NIFTY 50 stocks with current prices."""
     try:
-        stocks = get_all_nifty50_stocks()
+        stocks = await get_all_nifty50_stocks_async()
         return {
             "success": True,
             "count": len(stocks),
@@ -71,7 +72,8 @@ def get_stock_ohlcv(
     """
     try:
         symbol = symbol.upper()
-        ohlcv = get_ohlcv_data(symbol, timeframe, period, exchange)
+        # Intraday series of streamed symbols include the forming bar
+        ohlcv = get_live_ohlcv(symbol, timeframe, period, exchange)
         
         if not ohlcv:
             raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
@@ -82,7 +84,7 @@ def get_stock_ohlcv(
             "timeframe": timeframe,
             "period": period,
             "count": len(ohlcv),
-            "data": ohlcv
+            "data": ohlcv.to_records()
         }
     except HTTPException:
         raise
@@ -91,6 +93,42 @@ def get_stock_ohlcv(
         raise HTTPException(status_code=500, detail="Failed to fetch OHLCV data")
 
 
+@router.get("/{symbol}/indicators/mtf")
+def get_stock_indicators_mtf(
+    symbol: str,
+    timeframes: str = Query(default=",".join(DEFAULT_TIMEFRAMES), pattern="^(1m|5m|15m|1h|1d)(,(1m|5m|15m|1h|1d))*$"),
+    exchange: str = Query(default="NSE", pattern="^(NSE|BSE)$")
+):
+    """
+    Indicators for several timeframes from one fetch of the finest.
+    
+    - timeframes: comma-separated, e.g. 15m,1h,1d
+    
+    `data` holds the finest timeframe's indicators, with the coarser
+    timeframes under `data.mtf`.
+    """
+    try:
+        symbol = symbol.upper()
+        indicators, sources = get_multi_timeframe_indicators(symbol, timeframes.split(","), exchange)
+        if not sources:
+            raise HTTPException(status_code=404, detail=f"No data found for {symbol}")
+        if not indicators:
+            raise HTTPException(status_code=500, detail="Failed to calculate indicators (None returned)")
+        
+        return {
+            "success": True,
+            "symbol": symbol,
+            "timeframe": next(iter(sources)),
+            "sources": sources,
+            "data": indicators
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing multi-timeframe indicators for {symbol}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to calculate indicators")
+
+
 @router.get("/{symbol}/indicators")
 def get_stock_indicators(
     symbol: str,
@@ -102,7 +140,7 @@ def get_stock_indicators(
         symbol = symbol.upper()
         
         # Fetch OHLCV data
-        ohlcv = get_ohlcv_data(symbol, timeframe, "3mo", exchange)
+        ohlcv = get_live_ohlcv(symbol, timeframe, "3mo", exchange)
         
         if not ohlcv:
             logger.warning(f"No OHLCV data for {symbol}")
@@ -110,7 +148,7 @@ def get_stock_indicators(
         
         # Calculate indicators
         try:
-            indicators = calculate_all_indicators(ohlcv)
+            indicators = calculate_all_indicators(ohlcv, symbol, timeframe, exchange)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
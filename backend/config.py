@@ -14,12 +14,36 @@ class Settings(BaseSettings):
     allowed_origins: str = "http://localhost:5173,http://localhost:8080"
     
     # Data Provider
-    data_provider: str = "yahoo_finance"
+    data_provider: str = "yahoo_finance"  # or "replay" for offline fixtures
+    replay_data_dir: str = "data/replay"
     rate_limit_requests: int = 200
     rate_limit_period: int = 60
+    rate_limit_burst: int = 10
+    ohlcv_store_enabled: bool = True
+    ohlcv_store_dir: str = "data/ohlcv"
+    intraday_archive_enabled: bool = True
+    intraday_archive_dir: str = "data/archive"
+    google_max_concurrency: int = 10
+    google_timeout: float = 10.0
+    quote_cache_ttl: int = 30
+    quote_cache_size: int = 1024
+    breaker_failure_threshold: int = 5
+    breaker_window: float = 60
+    breaker_cooldown: float = 30
+    breaker_slow_call_seconds: float = 5.0
+    warmup_enabled: bool = True
+    quote_snapshot_path: str = "data/quote_snapshot.json"
+    quote_stream_enabled: bool = False
+    quote_stream_interval: float = 5.0
+    indicator_state_path: str = "data/indicator_state.json"
+    indicator_cache_size: int = 2048
     
     # Signal Generation
     signal_scan_interval: int = 60
+    symbol_universe_file: str = "data/universe.csv"
+    scan_universe_tag: str = "NIFTY50"
+    scan_shard_size: int = 50
+    scan_max_workers: int = 10
     min_confidence_score: int = 70
     
     # Admin
@@ -74,16 +74,49 @@ def health_check():
     }
 
 
+from fastapi.responses import JSONResponse
+from services.warmup import start_warmup, save_quote_snapshot, warmup_status, is_ready
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness endpoint: 503 until the startup cache warm-up has finished."""
+    return JSONResponse(
+        status_code=200 if is_ready() else 503,
+        content={"ready": is_ready(), "warmup": warmup_status}
+    )
+
+
 from services.background_scanner import start_background_scanner
+from services.quote_stream import start_quote_stream, save_stream_state
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Initializing database...")
     init_db()
+    logger.info("Starting cache warm-up...")
+    start_warmup()
     logger.info("Starting background tasks...")
+    start_quote_stream()
     # start_background_scanner()
 
 
+from services.async_quotes import close_async_client
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Saving quote cache snapshot...")
+    try:
+        save_quote_snapshot()
+    except Exception as e:
+        logger.error(f"Failed to save quote snapshot: {e}")
+    try:
+        save_stream_state()
+    except Exception as e:
+        logger.error(f"Failed to save indicator state: {e}")
+    logger.info("Closing async quote client...")
+    await close_async_client()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -11,6 +11,7 @@ import uuid
 
 from database import get_db
 from models.backtest_models import BacktestConfig, BacktestResult
+from models.admin_models import StrategyConfig
 from services.backtest_engine import BacktestEngine
 
 
@@ -24,6 +25,7 @@ class BacktestRequest(BaseModel):
     start_date: str
     end_date: str
     initial_capital: float = 100000
+    timeframe: str = "1d"
 
 
 class BacktestResponse(BaseModel):
@@ -74,13 +76,16 @@ async def run_backtest(request: BacktestRequest, db: Session = Depends(get_db)):
         db.add(config)
         db.commit()
         
-        # Run backtest
+        # Run backtest with the parameters of the active strategy configs
+        strategy_configs = db.query(StrategyConfig).filter(StrategyConfig.is_active == True).all()
         engine = BacktestEngine(
             symbol=request.symbol,
             strategy_name=request.strategy_name,
             start_date=request.start_date,
             end_date=request.end_date,
-            initial_capital=request.initial_capital
+            initial_capital=request.initial_capital,
+            timeframe=request.timeframe,
+            config={c.strategy_name: c.parameters for c in strategy_configs}
         )
         
         result_data = engine.run()
@@ -0,0 +1,244 @@
+"""
+Async quote path for Google Finance.
+Uses one pooled keep-alive aiohttp session per event loop with a bounded
+number of concurrent requests, so routes can await quotes for a whole
+symbol list without tying up threadpool workers.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from config import settings
+from services.circuit_breaker import breakers
+from services.rate_limiter import throttle_async, request_priority, PRIORITY_BACKGROUND
+from services.data_provider import (
+    NIFTY_50_SYMBOLS,
+    GOOGLE_INDEX_SYMBOLS,
+    session as sync_session,
+    google_quote_url,
+    is_healthy_status,
+    parse_google_quote,
+    parse_google_index,
+    get_stock_info_yahoo,
+    get_index_value_yahoo,
+    get_bulk_quotes,
+    quote_cache,
+    mock_stock_info,
+    mock_index_value,
+    replay_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncQuoteClient:
+    """
+    Pooled async HTTP client for quote pages.
+    The session and semaphore are bound to the event loop that created
+    them and are rebuilt transparently (closing the old session) if a
+    different loop uses the client.
+    """
+
+    def __init__(self, max_concurrency: int, timeout: float):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            await self._discard_session()
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=dict(sync_session.headers),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._session
+
+    async def _discard_session(self) -> None:
+        """Close a session left by another event loop before it is replaced."""
+        session, loop = self._session, self._loop
+        if session is None or session.closed:
+            return
+        if loop is None or loop.is_closed():
+            # Nothing is left to run on a closed loop; closing only releases the connector
+            await session.close()
+        else:
+            # Its connections belong to a loop still alive in another thread
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    async def fetch_text(self, url: str) -> Tuple[int, Optional[str]]:
+        """GET a page, returning the status and the body (None unless 200)."""
+        client = await self._ensure_session()
+        async with self._semaphore:
+            async with client.get(url) as response:
+                if response.status != 200:
+                    return response.status, None
+                return response.status, await response.text()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+quote_client = AsyncQuoteClient(settings.google_max_concurrency, settings.google_timeout)
+
+
+async def get_stock_info_google_async(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """Async Google Finance scraper; skipped while the Google circuit is open."""
+    breaker = breakers['google_quote']
+    if not breaker.allow():
+        return None
+    try:
+        await throttle_async('google')
+        started = time.monotonic()
+        status, html = await quote_client.fetch_text(google_quote_url(symbol, exchange))
+    except Exception as e:
+        breaker.record(False)
+        logger.error(f"Error scraping Google Finance for {symbol}: {e}")
+        return None
+
+    breaker.record(is_healthy_status(status), time.monotonic() - started)
+    try:
+        return parse_google_quote(html, symbol, exchange) if html else None
+    except Exception as e:
+        logger.error(f"Error parsing Google Finance page for {symbol}: {e}")
+        return None
+
+
+async def fetch_stock_info_async(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """
+    Async variant of `fetch_stock_info` (live quote, no cache).
+    Google is awaited directly; only the Yahoo fallback runs in a worker thread.
+    """
+    google_data = await get_stock_info_google_async(symbol, exchange)
+    if google_data:
+        return google_data
+
+    return await asyncio.to_thread(get_stock_info_yahoo, symbol, exchange)
+
+
+# Strong references to running refresh tasks so they are not garbage collected
+_refresh_tasks = set()
+
+
+async def _refresh_quote(symbol: str, exchange: str) -> None:
+    key = (symbol, exchange)
+    try:
+        with request_priority(PRIORITY_BACKGROUND):
+            quote = await fetch_stock_info_async(symbol, exchange)
+        if quote:
+            quote_cache.put(key, quote)
+    finally:
+        quote_cache.end_refresh(key)
+
+
+def _cached_quote(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """Cached quote if any; stale ones get an async background refresh."""
+    cached = quote_cache.lookup((symbol, exchange))
+    if cached is None:
+        return None
+    quote, fresh = cached
+    if not fresh and quote_cache.try_begin_refresh((symbol, exchange)):
+        task = asyncio.get_running_loop().create_task(_refresh_quote(symbol, exchange))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+    return quote
+
+
+async def get_stock_info_async(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """Async variant of `get_stock_info` (cached, stale-while-revalidate)."""
+    replay = replay_provider()
+    if replay:
+        return replay.get_stock_info(symbol, exchange)
+
+    quote = _cached_quote(symbol, exchange)
+    if quote:
+        return quote
+
+    quote = await fetch_stock_info_async(symbol, exchange)
+    if quote:
+        quote_cache.put((symbol, exchange), quote)
+        return quote
+
+    return mock_stock_info(symbol, exchange)
+
+
+async def get_all_nifty50_stocks_async() -> List[Dict]:
+    """
+    Async variant of `get_all_nifty50_stocks`.
+    Cached quotes are used as-is; the rest are scraped concurrently on the
+    event loop, and symbols Google could not serve are filled from one
+    batched Yahoo download.
+    """
+    replay = replay_provider()
+    if replay:
+        return replay.get_all_nifty50_stocks()
+
+    quotes = {}
+    for symbol in NIFTY_50_SYMBOLS:
+        quote = _cached_quote(symbol)
+        if quote:
+            quotes[symbol] = quote
+
+    to_fetch = [symbol for symbol in NIFTY_50_SYMBOLS if symbol not in quotes]
+    results = await asyncio.gather(*(get_stock_info_google_async(s) for s in to_fetch))
+    fetched = {symbol: quote for symbol, quote in zip(to_fetch, results) if quote}
+
+    missing = [symbol for symbol in to_fetch if symbol not in fetched]
+    if missing:
+        logger.info(f"Google quotes missing {len(missing)} symbols, using bulk Yahoo download")
+        fetched.update(await asyncio.to_thread(get_bulk_quotes, missing))
+
+    for symbol, quote in fetched.items():
+        quote_cache.put((symbol, 'NSE'), quote)
+    quotes.update(fetched)
+
+    return [quotes[symbol] for symbol in NIFTY_50_SYMBOLS if symbol in quotes]
+
+
+async def get_index_value_async(index: str = 'NIFTY') -> Optional[Dict]:
+    """
+    Async variant of `get_index_value`.
+    Keeps the Yahoo-first order; the Google fallback is awaited directly.
+    """
+    replay = replay_provider()
+    if replay:
+        return replay.get_index_value(index)
+
+    yahoo_data = await asyncio.to_thread(get_index_value_yahoo, index)
+    if yahoo_data:
+        return yahoo_data
+
+    try:
+        g_sym = GOOGLE_INDEX_SYMBOLS.get(index.upper())
+        if g_sym and breakers['google_quote'].allow():
+            await throttle_async('google')
+            started = time.monotonic()
+            try:
+                status, html = await quote_client.fetch_text(f"https://www.google.com/finance/quote/{g_sym}")
+            except Exception:
+                breakers['google_quote'].record(False)
+                raise
+            breakers['google_quote'].record(is_healthy_status(status), time.monotonic() - started)
+            google_data = parse_google_index(html, index) if html else None
+            if google_data:
+                return google_data
+    except Exception as e:
+        logger.error(f"Google Finance failed for index {index}: {e}")
+
+    return mock_index_value(index)
+
+
+async def close_async_client() -> None:
+    """Close the pooled session (called on application shutdown)."""
+    await quote_client.close()
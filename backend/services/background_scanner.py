@@ -3,9 +3,13 @@ import logging
 from database import SessionLocal
 from services.signal_service import scan_market_and_save_signals
 from services.websocket_manager import manager
+from services.rate_limiter import at_priority, PRIORITY_BACKGROUND
 
 logger = logging.getLogger(__name__)
 
+# Pause between background scans
+SCAN_INTERVAL_SECONDS = 900
+
 async def run_scanner_loop():
     while True:
         try:
@@ -14,7 +18,9 @@ async def run_scanner_loop():
             try:
                 # Run sync function in thread pool to avoid blocking the event loop
                 loop = asyncio.get_running_loop()
-                generated, saved = await loop.run_in_executor(None, scan_market_and_save_signals, db)
+                # Background scans queue behind user-facing provider calls
+                scan = at_priority(PRIORITY_BACKGROUND, lambda: scan_market_and_save_signals(db))
+                generated, saved = await loop.run_in_executor(None, scan)
                 
                 if saved > 0:
                     logger.info(f"Broadcasting {saved} new signals to clients")
@@ -28,7 +34,7 @@ async def run_scanner_loop():
                 db.close()
             
             # Wait for 15 minutes (900 seconds)
-            await asyncio.sleep(900)
+            await asyncio.sleep(SCAN_INTERVAL_SECONDS)
         except Exception as e:
             logger.error(f"Error in background scanner: {e}")
             await asyncio.sleep(60) # Retry after 1 min on error
@@ -3,13 +3,48 @@ Backtesting Engine for Trading Strategies
 Simulates trading strategies on historical data and calculates performance metrics
 """
 
+import logging
+import math
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import numpy as np
 import pandas as pd
-from services.data_provider import DataProvider
+from services.data_provider import PERIOD_DELTAS, get_data_provider, intraday_archive
+from services.market_status import IST, MARKET_CLOSE_TIME, MARKET_OPEN_TIME
+from services.multi_timeframe import confirm_timeframe, higher_timeframe_trend
+from services.ohlcv import OHLCVBars
+from services.resampler import NS_PER_MINUTE, TIMEFRAME_MINUTES, resample
+from services.signal_batch import HOLD, SIGNAL_NAMES, STRATEGIES, signal_series
+from services.signal_generator import indicator_requirements
 from services.signal_service import SignalService
 
+logger = logging.getLogger(__name__)
+
+# Backtest strategy names (as offered by the UI) and the strategies they run
+BACKTEST_STRATEGIES = {
+    'RSI+MACD': 'rsi_macd',
+    'Bollinger Bands+Volume': 'bb_volume',
+    'EMA Crossover': 'ema_crossover',
+    'VWAP Reversal': 'vwap_reversal',
+    'Combined': 'combined',
+}
+
+# History live signals need (calculate_all_indicators refuses fewer bars)
+MIN_SIGNAL_BARS = 50
+
+
+def warmup_bars(strategy: str, config: Optional[Dict] = None) -> int:
+    """
+    Bars to read before a backtest's start: the longest indicator period
+    the strategy reads (MACD counts slow + signal) plus MIN_SIGNAL_BARS.
+    """
+    periods = []
+    for name in (STRATEGIES if strategy not in STRATEGIES else (strategy,)):
+        for requirement in indicator_requirements(name, config).values():
+            kind, *params = requirement
+            periods.append(params[1] + params[2] if kind == 'macd' else int(params[0]))
+    return max(periods, default=0) + MIN_SIGNAL_BARS
+
 
 class Trade:
     """Represents a single trade"""
@@ -58,64 +93,162 @@ class Trade:
         }
 
 
+# Minutes in one trading session (9:15 - 15:30)
+SESSION_MINUTES = (MARKET_CLOSE_TIME.hour * 60 + MARKET_CLOSE_TIME.minute) - (MARKET_OPEN_TIME.hour * 60 + MARKET_OPEN_TIME.minute)
+
+
+def history_period(
+    timeframe: str,
+    start_ns: int,
+    warmup: int,
+    now_ns: int,
+    lookback: Optional[Dict[str, timedelta]] = None
+) -> Optional[str]:
+    """
+    Shortest provider period reaching `warmup` bars before `start_ns`,
+    within the provider's `lookback` limit for the interval (warm-up is
+    cut short at the limit). None when `start_ns` itself is beyond it.
+    """
+    limit = (lookback or {}).get(timeframe)
+    per_session = 1 if timeframe == '1d' else math.ceil(SESSION_MINUTES / TIMEFRAME_MINUTES[timeframe])
+    # Sessions to calendar days (5 per week), with slack for holidays
+    warmup_days = math.ceil(warmup / per_session * 7 / 5) + 5
+    since_start = timedelta(microseconds=(now_ns - start_ns) // 1000)
+    periods = sorted(
+        (delta, period) for period, delta in PERIOD_DELTAS.items() if limit is None or delta <= limit
+    )
+    for delta, period in periods:
+        if delta >= since_start + timedelta(days=warmup_days):
+            return period
+    if limit is not None and since_start > limit:
+        return None
+    return periods[-1][1]
+
+
+def _to_ns(date) -> int:
+    """Date/datetime (naive values are taken as IST) to UTC nanoseconds."""
+    ts = pd.Timestamp(date)
+    if ts.tz is None:
+        ts = ts.tz_localize(IST)
+    return ts.value
+
+
+def _end_ns(date) -> int:
+    """Inclusive end of a range: a bare date covers that whole IST day."""
+    ts = pd.Timestamp(date)
+    if ts == ts.normalize():
+        return _to_ns(ts + pd.Timedelta(days=1)) - 1
+    return _to_ns(ts)
+
+
 class BacktestEngine:
     """Main backtesting engine"""
     
     def __init__(self, symbol: str, strategy_name: str, start_date: str, 
-                 end_date: str, initial_capital: float = 100000):
+                 end_date: str, initial_capital: float = 100000, timeframe: str = "1d",
+                 config: Optional[Dict] = None):
         self.symbol = symbol
+        self.timeframe = timeframe
         self.strategy_name = strategy_name
+        self.strategy = BACKTEST_STRATEGIES.get(strategy_name, strategy_name)
+        self.config = config
         self.start_date = start_date
         self.end_date = end_date
         self.initial_capital = initial_capital
         self.current_capital = initial_capital
         
-        self.data_provider = DataProvider()
+        self.data_provider = get_data_provider()
         self.signal_service = SignalService()
         
         self.trades: List[Trade] = []
         self.equity_curve: List[Dict] = []
         self.current_position: Optional[Trade] = None
+        self.signals = None
     
     def run(self) -> Dict[str, Any]:
         """Execute the backtest"""
         try:
-            # Fetch historical data
-            historical_data = self.data_provider.get_ohlcv_data(
-                self.symbol,
-                period="1y",  # Adjust based on date range
-                interval="1d"
-            )
+            start_ns, end_ns = _to_ns(self.start_date), _end_ns(self.end_date)
             
-            if not historical_data or len(historical_data) == 0:
+            # Intraday runs read the memory-mapped 1m archive (zero-copy range,
+            # with warm-up bars before the start), resampled to the timeframe;
+            # otherwise fetch from the provider
+            historical_data = None
+            if self.timeframe != "1d":
+                historical_data = intraday_archive.range(
+                    self.symbol, start_ns, end_ns,
+                    lookback=warmup_bars(self.strategy, self.config) * TIMEFRAME_MINUTES[self.timeframe]
+                )
+                if historical_data is not None and len(historical_data) and self.timeframe != "1m":
+                    historical_data = resample(historical_data, self.timeframe)
+            if historical_data is None or len(historical_data) == 0:
+                # Enough history for the range plus warm-up, within what the
+                # provider serves at this interval
+                lookback = getattr(self.data_provider, 'interval_lookback', {})
+                period = history_period(
+                    self.timeframe, start_ns, warmup_bars(self.strategy, self.config),
+                    pd.Timestamp.now(tz='UTC').value, lookback
+                )
+                if period is None:
+                    return {
+                        "status": "failed",
+                        "error": f"{self.timeframe} history for {self.symbol} is not archived, and the provider "
+                                 f"only serves the last {lookback[self.timeframe].days} days"
+                    }
+                # Never backtest on placeholder bars
+                historical_data = self.data_provider.get_ohlcv_data(
+                    self.symbol,
+                    period=period,
+                    interval=self.timeframe,
+                    mock_fallback=False
+                )
+            
+            if historical_data is None or len(historical_data) == 0:
                 return {
                     "status": "failed",
-                    "error": "No historical data available"
+                    "error": f"No historical data available for {self.symbol}"
                 }
             
-            # Convert to DataFrame for easier processing
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            # Filter by date range (dates are IST calendar dates)
+            bars = historical_data.slice(start_ns, end_ns)
             
-            # Filter by date range
-            start_dt = pd.to_datetime(self.start_date)
-            end_dt = pd.to_datetime(self.end_date)
-            df = df[(df['timestamp'] >= start_dt) & (df['timestamp'] <= end_dt)]
-            
-            if len(df) == 0:
+            if len(bars) == 0:
                 return {
                     "status": "failed",
                     "error": "No data in specified date range"
                 }
             
+            # Strategy output for every bar at once; indicators warm up on
+            # the history before the range
+            if self.strategy in STRATEGIES or self.strategy == 'combined':
+                self.signals = signal_series(
+                    historical_data, self.strategy, self.config, trend=self._confirmation_trend(historical_data)
+                )
+            offset = int(np.searchsorted(historical_data.timestamp, bars.timestamp[0]))
+            
             # Simulate trading day by day
-            for idx, row in df.iterrows():
-                self._process_day(row)
+            for bar, timestamp, open_, high, low, close, volume in zip(
+                range(offset, offset + len(bars)),
+                bars.index(),
+                bars.open.tolist(),
+                bars.high.tolist(),
+                bars.low.tolist(),
+                bars.close.tolist(),
+                bars.volume.tolist()
+            ):
+                self._process_day({
+                    'bar': bar,
+                    'timestamp': timestamp,
+                    'open': open_,
+                    'high': high,
+                    'low': low,
+                    'close': close,
+                    'volume': volume
+                })
             
             # Close any open position at the end
             if self.current_position:
-                last_row = df.iloc[-1]
-                self.current_position.close(last_row['timestamp'], last_row['close'])
+                self.current_position.close(bars.index()[-1], float(bars.close[-1]))
                 self.trades.append(self.current_position)
                 self.current_position = None
             
@@ -165,6 +298,11 @@ class BacktestEngine:
                     should_exit = True
                 elif current_price >= self.current_position.target:
                     should_exit = True
+            else:
+                if current_price >= self.current_position.stop_loss:
+                    should_exit = True
+                elif current_price <= self.current_position.target:
+                    should_exit = True
             
             if should_exit:
                 self.current_position.close(current_date, current_price)
@@ -192,35 +330,41 @@ class BacktestEngine:
                     target=signal.get('target', current_price * 1.03)
                 )
     
+    def _confirmation_trend(self, bars: OHLCVBars) -> Optional[np.ndarray]:
+        """
+        Per-bar trend of the strategy's confirm_timeframe, if it sets one:
+        resampled from the bars themselves, or for a finer timeframe from
+        the archived 1m bars (no confirmation when those are missing).
+        """
+        timeframe = confirm_timeframe(self.config, self.strategy)
+        if timeframe is None:
+            return None
+        if TIMEFRAME_MINUTES[timeframe] >= TIMEFRAME_MINUTES[self.timeframe]:
+            higher = resample(bars, timeframe)
+        else:
+            end = int(bars.timestamp[-1]) + TIMEFRAME_MINUTES[self.timeframe] * NS_PER_MINUTE
+            minutes = intraday_archive.range(self.symbol, int(bars.timestamp[0]), end)
+            if minutes is None or len(minutes) == 0:
+                logger.warning(f"No archived 1m bars for {self.symbol}; backtesting without {timeframe} confirmation")
+                return None
+            higher = resample(minutes, timeframe)
+        return higher_timeframe_trend(bars, self.timeframe, higher, timeframe)
+    
     def _generate_signal_for_day(self, row) -> Optional[Dict]:
-        """Generate trading signal for a specific day using strategy"""
-        # This is a simplified version - in reality, we'd need historical data
-        # up to this point to calculate indicators properly
-        
-        # For now, use a simple RSI-based strategy as example
-        # In production, this should use the actual strategy from signal_service
-        
-        try:
-            # Create a mock data structure with enough history
-            # This is a placeholder - real implementation would maintain rolling window
-            
-            if self.strategy_name == "RSI+MACD":
-                # Simple RSI logic (placeholder)
-                close_price = row['close']
-                
-                # Generate buy signal if price is "low" (simplified)
-                # Real implementation would calculate actual RSI
-                return {
-                    'type': 'BUY',
-                    'stop_loss': close_price * 0.97,
-                    'target': close_price * 1.05,
-                    'confidence': 0.7
-                }
-            
+        """The strategy's signal at this bar, from the precomputed signal series"""
+        bar = row['bar']
+        if self.signals is None or bar + 1 < MIN_SIGNAL_BARS:
             return None
-            
-        except Exception as e:
+        
+        code = self.signals.signal[bar]
+        if code == HOLD:
             return None
+        return {
+            'type': str(SIGNAL_NAMES[code]),
+            'stop_loss': float(self.signals.stop_loss[bar]),
+            'target': float(self.signals.target[bar]),
+            'confidence': int(self.signals.confidence[bar])
+        }
     
     def _calculate_metrics(self) -> Dict[str, Any]:
         """Calculate performance metrics"""
@@ -0,0 +1,181 @@
+"""
+In-process caches shared by the data and indicator services.
+"""
+import math
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Thread-safe size-bounded LRU mapping with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of the entries, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class TTLCache:
+    """
+    LRU cache whose entries go stale after a TTL, with stale-while-revalidate.
+
+    A stale entry is still returned immediately while a background refresh
+    replaces it. `ttl` is a callable so the lifetime can follow external
+    state (e.g. market hours); it is evaluated on every lookup. The optional
+    `fresh_since` callable gives a monotonic time before which entries are
+    stale whatever their age (e.g. quotes fetched before the close).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Callable[[], float],
+        refresh_workers: int = 4,
+        fresh_since: Optional[Callable[[], float]] = None
+    ):
+        self._entries = LRUCache(maxsize)
+        self.ttl = ttl
+        self.fresh_since = fresh_since
+        self._refreshing: Set[Hashable] = set()
+        self._refresh_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cache-refresh')
+        self.stale_hits = 0
+        self.refreshes = 0
+
+    def lookup(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """Return (value, is_fresh), or None if the key is not cached."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, fetched_at = entry
+        fresh = (time.monotonic() - fetched_at) < self.ttl()
+        if fresh and self.fresh_since is not None:
+            fresh = fetched_at >= self.fresh_since()
+        if not fresh:
+            self.stale_hits += 1
+        return value, fresh
+
+    def put(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """Store a value; `age` backdates it, e.g. for entries restored from disk."""
+        self._entries.put(key, (value, time.monotonic() - age))
+
+    def items(self) -> List[Tuple[Hashable, Any, float]]:
+        """Snapshot of (key, value, age in seconds) for every entry."""
+        now = time.monotonic()
+        return [(key, value, now - fetched_at) for key, (value, fetched_at) in self._entries.items()]
+
+    def try_begin_refresh(self, key: Hashable) -> bool:
+        """Claim the refresh of a key; False if one is already running."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: Hashable) -> None:
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Any]) -> None:
+        try:
+            value = fetch()
+            if value is not None:
+                self.put(key, value)
+                self.refreshes += 1
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            self.end_refresh(key)
+
+    def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Any],
+        refresh: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """
+        Return the cached value, fetching it synchronously on a miss.
+        Stale values are returned as-is and refreshed in the background
+        with `refresh` (defaults to `fetch`).
+        A fetch returning None is not cached.
+        """
+        cached = self.lookup(key)
+        if cached is not None:
+            value, fresh = cached
+            if not fresh and self.try_begin_refresh(key):
+                self._executor.submit(self._refresh, key, refresh or fetch)
+            return value
+
+        value = fetch()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        ttl = self.ttl()
+        return {
+            **self._entries.stats(),
+            'ttl_seconds': None if math.isinf(ttl) else ttl,
+            'stale_hits': self.stale_hits,
+            'refreshes': self.refreshes,
+        }
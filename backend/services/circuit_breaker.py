@@ -0,0 +1,137 @@
+"""
+Per-source circuit breakers for the upstream data providers.
+A source that keeps failing (or answering too slowly) is skipped outright
+until a cool-down passes, after which a single probe call decides whether
+it is healthy again.
+"""
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Sliding-window circuit breaker.
+
+    - closed: calls pass; failures within `window` seconds are counted and
+      `failure_threshold` of them open the breaker. Calls slower than
+      `slow_call_seconds` count as failures.
+    - open: calls are rejected until `cooldown` seconds have passed.
+    - half_open: one probe call is let through; its outcome closes or
+      re-opens the breaker. A probe that never reports back is replaced
+      after another cool-down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        window: float = 60,
+        cooldown: float = 30,
+        slow_call_seconds: float = 5
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.slow_call_seconds = slow_call_seconds
+        self.state = CLOSED
+        self._failures = deque()
+        self._latencies = deque(maxlen=50)
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call to this source should be attempted now."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probe_started = None
+            if self.state == HALF_OPEN:
+                now = time.monotonic()
+                if self._probe_started is not None and now - self._probe_started < self.cooldown:
+                    self.rejected += 1
+                    return False
+                self._probe_started = now
+            return True
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        """Record the outcome of an allowed call."""
+        now = time.monotonic()
+        with self._lock:
+            if latency is not None:
+                self._latencies.append(latency)
+                if latency > self.slow_call_seconds:
+                    ok = False
+
+            if self.state == HALF_OPEN:
+                self._probe_started = None
+                if ok:
+                    logger.info(f"Circuit {self.name} closed after successful probe")
+                    self.state = CLOSED
+                    self._failures.clear()
+                else:
+                    self._open(now)
+                return
+
+            if ok:
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if self.state == CLOSED and len(self._failures) >= self.failure_threshold:
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        logger.warning(f"Circuit {self.name} opened, skipping source for {self.cooldown}s")
+        self.state = OPEN
+        self._opened_at = now
+        self.times_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self._latencies)
+            return {
+                'state': self.state,
+                'recent_failures': len(self._failures),
+                'avg_latency': round(sum(latencies) / len(latencies), 3) if latencies else None,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened,
+            }
+
+
+def _new_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_threshold=settings.breaker_failure_threshold,
+        window=settings.breaker_window,
+        cooldown=settings.breaker_cooldown,
+        slow_call_seconds=settings.breaker_slow_call_seconds
+    )
+
+
+breakers: Dict[str, CircuitBreaker] = {
+    'google_quote': _new_breaker('google_quote'),
+    'yahoo_info': _new_breaker('yahoo_info'),
+    'yahoo_history': _new_breaker('yahoo_history'),
+}
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.stats() for name, breaker in breakers.items()}
@@ -4,11 +4,26 @@ Handles NSE/BSE stock data fetching with proper symbol formatting.
 """
 import yfinance as yf
 import pandas as pd
-from typing import Dict, List, Optional
+import numpy as np
+from typing import Any, Callable, Dict, Hashable, List, Optional
 from datetime import datetime, timedelta
 import logging
+import math
+import re
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from config import settings
+from services.cache import TTLCache
+from services.circuit_breaker import breakers
+from services.market_status import get_current_ist_time, is_market_open, last_market_close
+from services.rate_limiter import throttle, at_priority, PRIORITY_BACKGROUND
+from services.ohlcv import OHLCVBars, OHLCVPanel
+from services.ohlcv_store import OHLCVStore, frame_to_columns
+from services.synthetic_data import generate_bars
+from services.resampler import finest_source, resample, TIMEFRAME_MINUTES
+from services.intraday_archive import IntradayArchive
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +36,130 @@ session.headers.update({
 
 # ... (NIFTY_50_SYMBOLS remains same)
 
+
+class _Call:
+    """One in-flight call tracked by SingleFlight."""
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key.
+    The first caller runs the function; callers arriving while it is in
+    flight wait for it and share its result (or exception). Once it
+    returns, the next call for the key runs the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {'in_flight': len(self._calls), 'executed': self.executed, 'shared': self.shared}
+
+
+# Shared by every upstream fetch in this module
+inflight = SingleFlight()
+
+
+def _quote_ttl() -> float:
+    """Quote lifetime: short while the market trades, unlimited after the close."""
+    return float(settings.quote_cache_ttl) if is_market_open() else math.inf
+
+
+def _fresh_since() -> float:
+    """
+    Monotonic time of the last session close. Anything fetched before it
+    missed the closing prints, so the unlimited after-close lifetime only
+    applies to quotes fetched since.
+    """
+    since_close = (get_current_ist_time() - last_market_close()).total_seconds()
+    return time.monotonic() - since_close
+
+
+# Quotes keyed by (symbol, exchange), shared by routes and the scanner
+quote_cache = TTLCache(maxsize=settings.quote_cache_size, ttl=_quote_ttl, fresh_since=_fresh_since)
+
+_replay = None
+_replay_lock = threading.Lock()
+
+
+def replay_provider():
+    """
+    The offline fixture provider when settings.data_provider is 'replay',
+    else None. The public fetch functions below delegate to it so routes,
+    the scanner and backtests run without network access.
+    """
+    global _replay
+    if settings.data_provider != 'replay':
+        return None
+    with _replay_lock:
+        if _replay is None:
+            from services.replay_provider import ReplayDataProvider
+            _replay = ReplayDataProvider(settings.replay_data_dir)
+        return _replay
+
+
 def get_stock_info(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
     """
     Fetch current stock information including price, change, volume.
+    Served from the quote cache; stale quotes are returned immediately
+    and refreshed in the background.
+    """
+    replay = replay_provider()
+    if replay:
+        return replay.get_stock_info(symbol, exchange)
+
+    fetch = lambda: inflight.do(('quote', symbol, exchange), lambda: fetch_stock_info(symbol, exchange))
+    quote = quote_cache.get_or_fetch(
+        (symbol, exchange),
+        fetch,
+        refresh=at_priority(PRIORITY_BACKGROUND, fetch)
+    )
+    if quote:
+        return quote
+
+    # Last resort: Return mock data (User prefers real, but blank screen is worse)
+    return mock_stock_info(symbol, exchange)
+
+
+def fetch_stock_info(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """
+    Fetch a live quote, bypassing the cache.
     Prioritizes Google Finance (more reliable/faster), falls back to Yahoo.
     """
     # 1. Try Google Finance (Primary)
@@ -32,11 +168,20 @@ def get_stock_info(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
         return google_data
 
     # 2. Fallback to Yahoo Finance
+    return get_stock_info_yahoo(symbol, exchange)
+
+
+def get_stock_info_yahoo(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """Fetch current stock information from Yahoo Finance."""
+    breaker = breakers['yahoo_info']
+    if not breaker.allow():
+        return None
     try:
         yahoo_symbol = to_yahoo_symbol(symbol, exchange)
         ticker = yf.Ticker(yahoo_symbol, session=session)
-        # No sleep needed if this is fallback
-        info = ticker.info
+        throttle('yahoo')
+        started = time.monotonic()
+        info = _recorded(breaker, started, lambda: ticker.info)
         
         if info and ('currentPrice' in info or 'regularMarketPrice' in info):
             current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
@@ -53,14 +198,18 @@ def get_stock_info(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
                 'change': round(change, 2),
                 'changePercent': round(change_percent, 2),
                 'volume': info.get('volume', 0),
+                'volumeReported': 'volume' in info,
                 'avgVolume': info.get('averageVolume', 0),
                 'marketCap': info.get('marketCap', 0),
                 'previousClose': round(previous_close, 2)
             }
     except Exception as e:
         logger.warning(f"Yahoo Finance failed for {symbol}: {e}")
+    return None
+
 
-    # 3. Last resort: Return mock data (User prefers real, but blank screen is worse)
+def mock_stock_info(symbol: str, exchange: str = 'NSE') -> Dict:
+    """Random placeholder quote used when every data source failed."""
     import random
     logger.warning(f"All data sources failed for {symbol}, generating mock data")
     price = random.uniform(100, 3000)
@@ -73,6 +222,7 @@ def get_stock_info(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
         'change': round(random.normalvariate(0, 5), 2),
         'changePercent': round(random.uniform(-3, 3), 2),
         'volume': int(random.uniform(100000, 5000000)),
+        'volumeReported': False,
         'avgVolume': 2000000,
         'marketCap': random.uniform(1e9, 1e12),
         'previousClose': round(price * 0.98, 2)
@@ -110,161 +260,512 @@ def from_yahoo_symbol(yahoo_symbol: str) -> str:
     return yahoo_symbol.replace('.NS', '').replace('.BO', '')
 
 
-def get_stock_info_google(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
-    """Fallback scraper for Google Finance."""
-    try:
-        # Google Finance uses "EXCHANGE:SYMBOL" format
-        market = "NSE" if exchange == "NSE" else "BOM"
-        url = f"https://www.google.com/finance/quote/{symbol}:{market}"
-        response = session.get(url, timeout=10)
-        
-        if response.status_code != 200:
-            return None
-            
-        html = response.text
-        import re
-        
-        # Pattern 1: jsname="LXPcOd" (Most stable price container)
-        price_match = re.search(r'jsname="LXPcOd"[^>]*>₹?([\d,]+\.?\d*)', html)
+def google_quote_url(symbol: str, exchange: str = 'NSE') -> str:
+    """Google Finance quote page URL ("SYMBOL:MARKET" format)."""
+    market = "NSE" if exchange == "NSE" else "BOM"
+    return f"https://www.google.com/finance/quote/{symbol}:{market}"
+
+
+def parse_google_quote(html: str, symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """Extract a quote from a Google Finance quote page."""
+    # Pattern 1: jsname="LXPcOd" (Most stable price container)
+    price_match = re.search(r'jsname="LXPcOd"[^>]*>₹?([\d,]+\.?\d*)', html)
+    
+    if not price_match:
+        # Pattern 2: class="YMlKec fxKbKc"
+        price_match = re.search(r'<div class="YMlKec fxKbKc">₹?([\d,]+\.?\d*)</div>', html)
         
-        if not price_match:
-            # Pattern 2: class="YMlKec fxKbKc"
-            price_match = re.search(r'<div class="YMlKec fxKbKc">₹?([\d,]+\.?\d*)</div>', html)
-            
-        if price_match:
-            price_str = price_match.group(1).replace(',', '')
-            current_price = float(price_str)
-            
-            # Change extraction: <div class="[A-Z0-9 ]*P2Luy[^>]*>([\+\-]?[\d,]+\.?\d*)</div>
-            change = 0.0
-            change_pct = 0.0
-            change_match = re.search(r'jsname="V679Bc"[^>]*>([\+\-]?[\d,]+\.?\d*)', html)
-            if not change_match:
-                change_match = re.search(r'<div class="[A-Z0-9 ]*P2Luy[^>]*>([\+\-]?[\d,]+\.?\d*)</div>', html)
-            
-            if change_match:
-                change = float(change_match.group(1).replace(',', '').replace('+', ''))
-            
-            # Change Percent
-            cp_match = re.search(r'jsname="m69M9d"[^>]*>\(([\+\-]?[\d,]+\.?\d*)%\)', html)
-            if cp_match:
-                change_pct = float(cp_match.group(1).replace(',', '').replace('+', ''))
+    if not price_match:
+        return None
 
-            # Company Name
-            name_match = re.search(r'<div class="zzDege">([^<]+)</div>', html)
-            name = name_match.group(1) if name_match else symbol
+    price_str = price_match.group(1).replace(',', '')
+    current_price = float(price_str)
+    
+    # Change extraction: <div class="[A-Z0-9 ]*P2Luy[^>]*>([\+\-]?[\d,]+\.?\d*)</div>
+    change = 0.0
+    change_pct = 0.0
+    change_match = re.search(r'jsname="V679Bc"[^>]*>([\+\-]?[\d,]+\.?\d*)', html)
+    if not change_match:
+        change_match = re.search(r'<div class="[A-Z0-9 ]*P2Luy[^>]*>([\+\-]?[\d,]+\.?\d*)</div>', html)
+    
+    if change_match:
+        change = float(change_match.group(1).replace(',', '').replace('+', ''))
+    
+    # Change Percent
+    cp_match = re.search(r'jsname="m69M9d"[^>]*>\(([\+\-]?[\d,]+\.?\d*)%\)', html)
+    if cp_match:
+        change_pct = float(cp_match.group(1).replace(',', '').replace('+', ''))
 
-            return {
-                'symbol': symbol,
-                'name': name,
-                'exchange': exchange,
-                'sector': 'Unknown',
-                'currentPrice': round(current_price, 2),
-                'change': round(change, 2),
-                'changePercent': round(change_pct, 2),
-                'volume': 1000000,
-                'avgVolume': 1000000,
-                'marketCap': 0,
-                'previousClose': round(current_price - change, 2)
-            }
+    # Company Name
+    name_match = re.search(r'<div class="zzDege">([^<]+)</div>', html)
+    name = name_match.group(1) if name_match else symbol
+
+    return {
+        'symbol': symbol,
+        'name': name,
+        'exchange': exchange,
+        'sector': 'Unknown',
+        'currentPrice': round(current_price, 2),
+        'change': round(change, 2),
+        'changePercent': round(change_pct, 2),
+        # The quote page carries no volume; these are placeholders
+        'volume': 1000000,
+        'volumeReported': False,
+        'avgVolume': 1000000,
+        'marketCap': 0,
+        'previousClose': round(current_price - change, 2)
+    }
+
+
+def get_stock_info_google(symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+    """Fallback scraper for Google Finance."""
+    breaker = breakers['google_quote']
+    if not breaker.allow():
         return None
+    try:
+        throttle('google')
+        started = time.monotonic()
+        response = session.get(google_quote_url(symbol, exchange), timeout=settings.google_timeout)
     except Exception as e:
+        breaker.record(False)
         logger.error(f"Error scraping Google Finance for {symbol}: {e}")
         return None
 
+    breaker.record(is_healthy_status(response.status_code), time.monotonic() - started)
+    if response.status_code != 200:
+        return None
+    try:
+        return parse_google_quote(response.text, symbol, exchange)
+    except Exception as e:
+        logger.error(f"Error parsing Google Finance page for {symbol}: {e}")
+        return None
+
+
+def reported_volume(quote: Dict) -> Optional[float]:
+    """A quote's session volume, or None when its source only fills in a placeholder."""
+    return quote.get('volume') if quote.get('volumeReported') else None
+
+
+def is_healthy_status(status: int) -> bool:
+    """Whether an HTTP status says the source itself is up (404s are per-symbol)."""
+    return status != 429 and status < 500
+
+
+# How far back each yfinance period reaches, used to check store coverage
+# and to cut the requested window out of a longer stored series.
+PERIOD_DELTAS = {
+    '1d': timedelta(days=1),
+    '5d': timedelta(days=5),
+    '7d': timedelta(days=7),
+    '1mo': timedelta(days=30),
+    '60d': timedelta(days=60),
+    '3mo': timedelta(days=91),
+    '6mo': timedelta(days=182),
+    '1y': timedelta(days=365),
+    '2y': timedelta(days=730),
+    '5y': timedelta(days=1826),
+}
+
+ohlcv_store = OHLCVStore(settings.ohlcv_store_dir)
+intraday_archive = IntradayArchive(settings.intraday_archive_dir)
+
+# Intervals whose completed bars are also appended to the long-term archive
+ARCHIVED_INTERVALS = ('1m',)
+
+
+def _archive_completed(symbol: str, interval: str, exchange: str, columns: Dict[str, np.ndarray], now_ns: int) -> None:
+    """Append freshly fetched, completed bars to the intraday archive."""
+    if not settings.intraday_archive_enabled or interval not in ARCHIVED_INTERVALS:
+        return
+    bar_ns = TIMEFRAME_MINUTES[interval] * 60 * 10**9
+    done = columns['timestamp'] + bar_ns <= now_ns
+    try:
+        intraday_archive.append(symbol, OHLCVBars.from_columns({c: columns[c][done] for c in columns}), interval, exchange)
+    except Exception as e:
+        logger.warning(f"Failed to archive {interval} bars for {symbol}: {e}")
+
+
+def _window(columns: Dict[str, np.ndarray], period_delta: timedelta) -> Dict[str, np.ndarray]:
+    """
+    Slice the last `period_delta` of a stored series.
+    The window is anchored on the newest bar rather than on "now" so that
+    short periods still return the last session over weekends and holidays.
+    """
+    ts = columns['timestamp']
+    if len(ts) == 0:
+        return columns
+    start = ts[-1] - int(period_delta.total_seconds() * 1e9)
+    first = int(np.searchsorted(ts, start, side='left'))
+    return {col: columns[col][first:] for col in ('timestamp', 'open', 'high', 'low', 'close', 'volume')}
+
+
+def _store_covers(stored: Optional[Dict[str, np.ndarray]], period_delta: timedelta, now_ns: int) -> bool:
+    """Whether a stored series reaches back far enough to serve `period_delta`."""
+    return (
+        stored is not None
+        and len(stored['timestamp']) > 0
+        and stored['covered_from'] <= now_ns - int(period_delta.total_seconds() * 1e9)
+    )
+
+
+# yfinance only serves 1m bars for roughly the last week
+MAX_1M_LOOKBACK = timedelta(days=7)
+
+# How far back yfinance serves each intraday interval (daily bars are unlimited)
+INTERVAL_LOOKBACK = {
+    '1m': MAX_1M_LOOKBACK,
+    '5m': timedelta(days=60),
+    '15m': timedelta(days=60),
+    '1h': timedelta(days=730),
+}
+
+# Last successful provider refresh per stored series, keyed like the store
+_series_refreshed: Dict[tuple, float] = {}
+
+
+def _series_fresh(key: tuple) -> bool:
+    """Whether a stored series was refreshed recently enough to skip a top-up."""
+    refreshed = _series_refreshed.get(key)
+    return (
+        refreshed is not None
+        and time.monotonic() - refreshed < _quote_ttl()
+        and refreshed >= _fresh_since()
+    )
+
 
 def get_ohlcv_data(
     symbol: str,
     timeframe: str = '1d',
     period: str = '1mo',
-    exchange: str = 'NSE'
-) -> Optional[List[Dict]]:
+    exchange: str = 'NSE',
+    mock_fallback: bool = True
+) -> Optional[OHLCVBars]:
+    """
+    Fetch OHLCV (Open, High, Low, Close, Volume) data as columnar bars.
+    Concurrent calls with identical arguments share one fetch.
+    Short-period 5m/15m/1h requests are resampled locally from the stored
+    1m series, so one intraday fetch serves every intraday timeframe.
+    With `mock_fallback` off, a failed fetch returns None instead of
+    placeholder bars (e.g. for backtests, which must not run on them).
+    """
+    replay = replay_provider()
+    if replay:
+        return replay.get_ohlcv_data(symbol, period, timeframe, exchange)
+
+    source = finest_source(timeframe)
+    period_delta = PERIOD_DELTAS.get(period)
+    if source and settings.ohlcv_store_enabled and period_delta and period_delta <= MAX_1M_LOOKBACK:
+        base = get_ohlcv_data(symbol, source, period, exchange, mock_fallback)
+        if base is not None and len(base):
+            bars = resample(base, timeframe)
+            # Drop a leading bucket the period window cut into
+            if len(bars) > 1 and bars.timestamp[0] < base.timestamp[0]:
+                bars = bars.slice(int(bars.timestamp[1]), None)
+            return bars
+
+    return inflight.do(
+        ('ohlcv', symbol, timeframe, period, exchange, mock_fallback),
+        lambda: _fetch_ohlcv_data(symbol, timeframe, period, exchange, mock_fallback)
+    )
+
+
+def _fetch_ohlcv_data(
+    symbol: str,
+    timeframe: str,
+    period: str,
+    exchange: str,
+    mock_fallback: bool = True
+) -> Optional[OHLCVBars]:
     """
-    Fetch OHLCV (Open, High, Low, Close, Volume) data.
+    Uncoalesced OHLCV fetch behind `get_ohlcv_data`.
+    Reads the on-disk store first and only downloads bars newer than the
+    last stored one; a full `period` download happens only when the store
+    does not reach back far enough.
     """
+    interval_map = {'1m': '1m', '5m': '5m', '15m': '15m', '1h': '1h', '1d': '1d'}
+    interval = interval_map.get(timeframe, '1d')
+    period_delta = PERIOD_DELTAS.get(period) if settings.ohlcv_store_enabled else None
+
+    stored = ohlcv_store.load(symbol, interval, exchange) if period_delta else None
+    series_key = (symbol, interval, exchange)
+    now_ns = pd.Timestamp.now(tz='UTC').value
+    covered = period_delta is not None and _store_covers(stored, period_delta, now_ns)
+    if covered and _series_fresh(series_key):
+        return OHLCVBars.from_columns(_window(stored, period_delta))
+
+    breaker = breakers['yahoo_history']
     try:
+        if not breaker.allow():
+            raise RuntimeError("yahoo_history circuit open")
         yahoo_symbol = to_yahoo_symbol(symbol, exchange)
-        interval_map = {'1m': '1m', '5m': '5m', '15m': '15m', '1h': '1h', '1d': '1d'}
-        interval = interval_map.get(timeframe, '1d')
-        
         ticker = yf.Ticker(yahoo_symbol, session=session)
-        df = ticker.history(period=period, interval=interval)
-        
+
+        if covered:
+            # Top-up: re-fetch from the last stored bar (it may still be forming)
+            last_bar = pd.Timestamp(int(stored['timestamp'][-1]), unit='ns', tz='UTC')
+            throttle('yahoo')
+            started = time.monotonic()
+            df = _recorded(breaker, started, lambda: ticker.history(start=last_bar, interval=interval))
+            covered_from = None
+        else:
+            throttle('yahoo')
+            started = time.monotonic()
+            # yfinance swallows upstream errors into an empty frame, and a full
+            # period is never legitimately empty, so that counts as a failure
+            df = _recorded(breaker, started, lambda: ticker.history(period=period, interval=interval), _has_rows)
+            covered_from = now_ns - int(period_delta.total_seconds() * 1e9) if period_delta else None
+
         if not df.empty:
-            ohlcv_data = []
-            for timestamp, row in df.iterrows():
-                ohlcv_data.append({
-                    'timestamp': timestamp.isoformat(),
-                    'open': round(row['Open'], 2),
-                    'high': round(row['High'], 2),
-                    'low': round(row['Low'], 2),
-                    'close': round(row['Close'], 2),
-                    'volume': int(row['Volume'])
-                })
-            return ohlcv_data
+            columns = frame_to_columns(df)
+            _archive_completed(symbol, interval, exchange, columns, now_ns)
+            if period_delta:
+                columns = _window(
+                    ohlcv_store.merge(symbol, interval, exchange, columns, covered_from),
+                    period_delta
+                )
+                _series_refreshed[series_key] = time.monotonic()
+            return OHLCVBars.from_columns(columns)
+        elif covered:
+            _series_refreshed[series_key] = time.monotonic()
+            return OHLCVBars.from_columns(_window(stored, period_delta))
         else:
             logger.warning(f"Yahoo history empty for {symbol}, falling back to mock")
     except Exception as e:
         logger.error(f"Error fetching historical data for {symbol}: {e}")
+        if stored is not None and len(stored['timestamp']) > 0:
+            logger.warning(f"Serving stored OHLCV for {symbol} after fetch failure")
+            return OHLCVBars.from_columns(_window(stored, period_delta))
+    if not mock_fallback:
+        return None
         
-    # Mock fallback generator (Always return something to avoid blank screen)
-    import random
-    from datetime import datetime, timedelta
-    
-    data = []
-    # If possible, get current price from Google for a better mock
-    stock_info = get_stock_info_google(symbol, exchange)
-    base_price = stock_info['currentPrice'] if stock_info else random.uniform(100, 3000)
-    
-    volatility = 0.02
+    # Mock fallback generator (Always return something to avoid blank screen).
+    # Seeded by the symbol, so repeated fallbacks for a symbol agree.
     num_candles = 100 if period == '1mo' else 250
     if timeframe == '1h': num_candles = 300
-    if timeframe == '5m' or timeframe == '15m': num_candles = 500
-        
-    now = datetime.now()
-    for i in range(num_candles):
-        dt = now - timedelta(days=num_candles-i) if timeframe == '1d' else now - timedelta(hours=num_candles-i)
-        change_pct = random.normalvariate(0, volatility)
-        close = base_price * (1 + change_pct)
-        open_p = base_price * (1 + random.normalvariate(0, volatility/2))
-        high = max(open_p, close) * (1 + abs(random.normalvariate(0, volatility/2)))
-        low = min(open_p, close) * (1 - abs(random.normalvariate(0, volatility/2)))
-        
-        data.append({
-            'timestamp': dt.isoformat(),
-            'open': round(open_p, 2),
-            'high': round(high, 2),
-            'low': round(low, 2),
-            'close': round(close, 2),
-            'volume': int(random.uniform(100000, 5000000))
-        })
-        base_price = close
-    return data
+    if timeframe in ('1m', '5m', '15m'): num_candles = 500
+
+    bars = generate_bars(symbol, num_candles, interval)
+    # If possible, anchor the mock on the current price from Google
+    stock_info = get_stock_info_google(symbol, exchange)
+    if stock_info:
+        scale = stock_info['currentPrice'] / bars.close[-1]
+        for col in ('open', 'high', 'low', 'close'):
+            setattr(bars, col, getattr(bars, col) * scale)
+    return bars
+
+
+# Symbols per yf.download call in the bulk path
+BULK_BATCH_SIZE = 50
+
+
+def _recorded(
+    breaker,
+    started: float,
+    call: Callable[[], Any],
+    healthy: Optional[Callable[[Any], bool]] = None
+) -> Any:
+    """
+    Run an upstream call, recording its outcome and latency on the breaker.
+    `healthy` judges a returned result; one it rejects counts as a failure.
+    """
+    try:
+        result = call()
+    except Exception:
+        breaker.record(False)
+        raise
+    ok = healthy is None or healthy(result)
+    breaker.record(ok, time.monotonic() - started)
+    return result
+
+
+def _has_rows(df: Optional[pd.DataFrame]) -> bool:
+    return df is not None and not df.empty
+
+
+def _recorded_response(breaker, started: float, call: Callable[[], Any]) -> Any:
+    """Like `_recorded` for an HTTP request: 429 and 5xx responses count as failures."""
+    try:
+        response = call()
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(is_healthy_status(response.status_code), time.monotonic() - started)
+    return response
+
+
+def _download_history(
+    symbols: List[str],
+    interval: str,
+    exchange: str = 'NSE',
+    period: Optional[str] = None,
+    start: Optional[pd.Timestamp] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Download history for many symbols with batched yf.download calls.
+    Returns the non-empty per-symbol frames keyed by plain symbol.
+    """
+    frames = {}
+    breaker = breakers['yahoo_history']
+    for i in range(0, len(symbols), BULK_BATCH_SIZE):
+        batch = symbols[i:i + BULK_BATCH_SIZE]
+        if not breaker.allow():
+            logger.warning(f"yahoo_history circuit open, skipping bulk download of {len(batch)} symbols")
+            continue
+        yahoo_symbols = [to_yahoo_symbol(s, exchange) for s in batch]
+        kwargs = {'start': start} if start is not None else {'period': period}
+        try:
+            # yf.download still requests each ticker, so charge one token per symbol
+            throttle('yahoo', tokens=len(batch))
+            started = time.monotonic()
+            # Errors come back as an empty frame; empty for the whole batch is an outage
+            df = _recorded(breaker, started, lambda: yf.download(
+                yahoo_symbols,
+                interval=interval,
+                group_by='ticker',
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+                session=session,
+                **kwargs
+            ), _has_rows)
+        except Exception as e:
+            logger.error(f"Bulk history download failed for {len(batch)} symbols: {e}")
+            continue
+
+        if df is None or df.empty:
+            continue
+        for symbol, yahoo_symbol in zip(batch, yahoo_symbols):
+            if isinstance(df.columns, pd.MultiIndex):
+                if yahoo_symbol not in df.columns.get_level_values(0):
+                    continue
+                sub = df[yahoo_symbol]
+            else:
+                sub = df
+            sub = sub.dropna(how='all')
+            if not sub.empty:
+                frames[symbol] = sub
+    return frames
+
+
+def get_ohlcv_panel(
+    symbols: List[str],
+    timeframe: str = '1d',
+    period: str = '3mo',
+    exchange: str = 'NSE'
+) -> OHLCVPanel:
+    """
+    Fetch OHLCV data for a whole symbol list as one aligned panel.
+    Concurrent calls with identical arguments share one fetch.
+    """
+    replay = replay_provider()
+    if replay:
+        return replay.get_ohlcv_panel(symbols, period, timeframe, exchange)
+
+    return inflight.do(
+        ('panel', tuple(symbols), timeframe, period, exchange),
+        lambda: _fetch_ohlcv_panel(symbols, timeframe, period, exchange)
+    )
+
+
+def _fetch_ohlcv_panel(
+    symbols: List[str],
+    timeframe: str,
+    period: str,
+    exchange: str
+) -> OHLCVPanel:
+    """
+    Uncoalesced panel fetch behind `get_ohlcv_panel`.
+    Symbols already in the store are topped up together in one batched
+    download starting at the oldest of their last bars; the rest are
+    downloaded for the full period in batches of BULK_BATCH_SIZE.
+    Symbols that could not be fetched are left out of the panel.
+    """
+    interval_map = {'1m': '1m', '5m': '5m', '15m': '15m', '1h': '1h', '1d': '1d'}
+    interval = interval_map.get(timeframe, '1d')
+    period_delta = PERIOD_DELTAS.get(period) if settings.ohlcv_store_enabled else None
+    now_ns = pd.Timestamp.now(tz='UTC').value
+
+    stored = {s: ohlcv_store.load(s, interval, exchange) for s in symbols} if period_delta else {}
+    covered = [s for s in symbols if period_delta and _store_covers(stored[s], period_delta, now_ns)]
+    covered_set = set(covered)
+    uncovered = [s for s in symbols if s not in covered_set]
+
+    series = {}
+    if covered:
+        start = min(int(stored[s]['timestamp'][-1]) for s in covered)
+        fetched = _download_history(covered, interval, exchange, start=pd.Timestamp(start, unit='ns', tz='UTC'))
+        for symbol in covered:
+            if symbol in fetched:
+                series[symbol] = ohlcv_store.merge(symbol, interval, exchange, frame_to_columns(fetched[symbol]))
+            else:
+                series[symbol] = stored[symbol]
+
+    if uncovered:
+        covered_from = now_ns - int(period_delta.total_seconds() * 1e9) if period_delta else None
+        fetched = _download_history(uncovered, interval, exchange, period=period)
+        for symbol in uncovered:
+            if symbol in fetched:
+                columns = frame_to_columns(fetched[symbol])
+                if period_delta:
+                    columns = ohlcv_store.merge(symbol, interval, exchange, columns, covered_from)
+                series[symbol] = columns
+            elif stored.get(symbol) is not None and len(stored[symbol]['timestamp']):
+                series[symbol] = stored[symbol]
+
+    if period_delta:
+        series = {s: _window(cols, period_delta) for s, cols in series.items()}
+    return OHLCVPanel.from_series({s: series[s] for s in symbols if s in series}, exchange)
+
+
+def get_bulk_quotes(symbols: List[str], exchange: str = 'NSE') -> Dict[str, Dict]:
+    """
+    Last quotes for many symbols from one batched daily-bar download.
+    Quotes carry the symbol as name since bulk history has no metadata.
+    """
+    return get_ohlcv_panel(symbols, '1d', '5d', exchange).quotes()
 
 
 def get_all_nifty50_stocks() -> List[Dict]:
     """
-    Fetch current data for all NIFTY 50 stocks using concurrent fetching.
+    Fetch current data for all NIFTY 50 stocks.
+    Uses the batched quote path first and only falls back to per-symbol
+    fetching for symbols missing from the bulk download.
     Returns list of stock data dicts.
     """
-    stocks = []
-    
-    # Use ThreadPoolExecutor for concurrent fetching (Google handles concurrency better)
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        # Submit all fetch tasks
-        future_to_symbol = {executor.submit(get_stock_info, symbol): symbol for symbol in NIFTY_50_SYMBOLS}
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_symbol):
-            symbol = future_to_symbol[future]
-            try:
-                stock_data = future.result(timeout=10)
-                if stock_data:
-                    stocks.append(stock_data)
-            except Exception as e:
-                logger.warning(f"Failed to fetch {symbol}: {e}")
-    
-    return stocks
+    replay = replay_provider()
+    if replay:
+        return replay.get_all_nifty50_stocks()
+
+    quotes = get_bulk_quotes(NIFTY_50_SYMBOLS)
+    missing = [symbol for symbol in NIFTY_50_SYMBOLS if symbol not in quotes]
+
+    if missing:
+        logger.info(f"Bulk quotes missing {len(missing)} symbols, fetching individually")
+        # Use ThreadPoolExecutor for concurrent fetching (Google handles concurrency better)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            future_to_symbol = {executor.submit(get_stock_info, symbol): symbol for symbol in missing}
+
+            for future in as_completed(future_to_symbol):
+                symbol = future_to_symbol[future]
+                try:
+                    stock_data = future.result(timeout=10)
+                    if stock_data:
+                        quotes[symbol] = stock_data
+                except Exception as e:
+                    logger.warning(f"Failed to fetch {symbol}: {e}")
+
+    return [quotes[symbol] for symbol in NIFTY_50_SYMBOLS if symbol in quotes]
+
+
+INDEX_SYMBOLS = {
+    'NIFTY': '^NSEI',
+    'BANKNIFTY': '^NSEBANK'
+}
+
+GOOGLE_INDEX_SYMBOLS = {
+    'NIFTY': 'NIFTY_50:INDEXNSE',
+    'BANKNIFTY': 'NIFTY_BANK:INDEXNSE'
+}
 
 
 def get_index_value(index: str = 'NIFTY') -> Optional[Dict]:
@@ -272,17 +773,43 @@ def get_index_value(index: str = 'NIFTY') -> Optional[Dict]:
     Get current index value (NIFTY 50, BANK NIFTY, etc.)
     Tries Yahoo Finance first, then falls back to Google Finance.
     """
-    index_symbols = {
-        'NIFTY': '^NSEI',
-        'BANKNIFTY': '^NSEBANK'
-    }
-    
+    replay = replay_provider()
+    if replay:
+        return replay.get_index_value(index)
+
     # 1. Try Yahoo Finance
+    yahoo_data = get_index_value_yahoo(index)
+    if yahoo_data:
+        return yahoo_data
+
+    # 2. Try Google Finance Fallback
+    try:
+        g_sym = GOOGLE_INDEX_SYMBOLS.get(index.upper())
+        if g_sym and breakers['google_quote'].allow():
+            url = f"https://www.google.com/finance/quote/{g_sym}"
+            throttle('google')
+            started = time.monotonic()
+            response = _recorded_response(breakers['google_quote'], started, lambda: session.get(url, timeout=settings.google_timeout))
+            if response.status_code == 200:
+                google_data = parse_google_index(response.text, index)
+                if google_data:
+                    return google_data
+    except Exception as e:
+        logger.error(f"Google Finance failed for index {index}: {e}")
+
+    # 3. Last resort: Return mock index data (To keep UI alive)
+    return mock_index_value(index)
+
+
+def get_index_value_yahoo(index: str = 'NIFTY') -> Optional[Dict]:
+    """Get current index value from Yahoo Finance."""
     try:
-        yahoo_symbol = index_symbols.get(index.upper())
-        if yahoo_symbol:
+        yahoo_symbol = INDEX_SYMBOLS.get(index.upper())
+        if yahoo_symbol and breakers['yahoo_info'].allow():
             ticker = yf.Ticker(yahoo_symbol, session=session)
-            info = ticker.info
+            throttle('yahoo')
+            started = time.monotonic()
+            info = _recorded(breakers['yahoo_info'], started, lambda: ticker.info)
             
             current_value = info.get('regularMarketPrice', 0) or info.get('currentPrice', 0)
             previous_close = info.get('previousClose', current_value)
@@ -299,38 +826,31 @@ def get_index_value(index: str = 'NIFTY') -> Optional[Dict]:
                 }
     except Exception as e:
         logger.warning(f"Yahoo Finance failed for index {index}: {e}")
+    return None
 
-    # 2. Try Google Finance Fallback
-    try:
-        google_symbols = {
-            'NIFTY': 'NIFTY_50:INDEXNSE',
-            'BANKNIFTY': 'NIFTY_BANK:INDEXNSE'
-        }
-        g_sym = google_symbols.get(index.upper())
-        if g_sym:
-            url = f"https://www.google.com/finance/quote/{g_sym}"
-            response = session.get(url, timeout=10)
-            if response.status_code == 200:
-                html = response.text
-                import re
-                # Pattern 1: <div class="YMlKec fxKbKc">24,367.50</div>
-                price_match = re.search(r'<div class="YMlKec fxKbKc">([\d,]+\.?\d*)</div>', html)
-                if not price_match:
-                    price_match = re.search(r'data-last-price="([\d\.]+)"', html)
-                
-                if price_match:
-                    val = float(price_match.group(1).replace(',', ''))
-                    # For indices, we'll return 0 change if we can't scrape it, or we could scrape change too
-                    return {
-                        'name': index.upper(),
-                        'value': round(val, 2),
-                        'change': 0.0,
-                        'changePercent': 0.0
-                    }
-    except Exception as e:
-        logger.error(f"Google Finance failed for index {index}: {e}")
 
-    # 3. Last resort: Return mock index data (To keep UI alive)
+def parse_google_index(html: str, index: str) -> Optional[Dict]:
+    """Extract an index value from a Google Finance quote page."""
+    # Pattern 1: <div class="YMlKec fxKbKc">24,367.50</div>
+    price_match = re.search(r'<div class="YMlKec fxKbKc">([\d,]+\.?\d*)</div>', html)
+    if not price_match:
+        price_match = re.search(r'data-last-price="([\d\.]+)"', html)
+    
+    if not price_match:
+        return None
+
+    val = float(price_match.group(1).replace(',', ''))
+    # For indices, we'll return 0 change if we can't scrape it, or we could scrape change too
+    return {
+        'name': index.upper(),
+        'value': round(val, 2),
+        'change': 0.0,
+        'changePercent': 0.0
+    }
+
+
+def mock_index_value(index: str) -> Dict:
+    """Random placeholder index value used when every data source failed."""
     import random
     base_val = 22000 if 'NIFTY' in index else 48000
     change_pct = random.uniform(-1, 1)
@@ -346,6 +866,8 @@ def get_index_value(index: str = 'NIFTY') -> Optional[Dict]:
 class DataProvider:
     """Data provider class for fetching stock market data"""
     
+    interval_lookback = INTERVAL_LOOKBACK
+    
     def __init__(self):
         pass
     
@@ -358,11 +880,26 @@ class DataProvider:
         symbol: str,
         period: str = '1mo',
         interval: str = '1d',
-        exchange: str = 'NSE'
-    ) -> Optional[List[Dict]]:
+        exchange: str = 'NSE',
+        mock_fallback: bool = True
+    ) -> Optional[OHLCVBars]:
         """Fetch OHLCV data"""
-        return get_ohlcv_data(symbol, interval, period, exchange)
+        return get_ohlcv_data(symbol, interval, period, exchange, mock_fallback)
     
+    def get_ohlcv_panel(
+        self,
+        symbols: List[str],
+        period: str = '3mo',
+        interval: str = '1d',
+        exchange: str = 'NSE'
+    ) -> OHLCVPanel:
+        """Fetch OHLCV data for many symbols as one aligned panel"""
+        return get_ohlcv_panel(symbols, interval, period, exchange)
+
+    def get_bulk_quotes(self, symbols: List[str], exchange: str = 'NSE') -> Dict[str, Dict]:
+        """Fetch last quotes for many symbols in batched calls"""
+        return get_bulk_quotes(symbols, exchange)
+
     def get_all_nifty50_stocks(self) -> List[Dict]:
         """Fetch all NIFTY 50 stocks"""
         return get_all_nifty50_stocks()
@@ -371,3 +908,8 @@ class DataProvider:
         """Get index value"""
         return get_index_value(index)
 
+
+def get_data_provider():
+    """Provider selected by settings.data_provider ('replay' or live)."""
+    return replay_provider() or DataProvider()
+
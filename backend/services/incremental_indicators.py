@@ -0,0 +1,616 @@
+"""
+Incremental (streaming) indicators.
+Each indicator keeps a small state and takes one bar at a time in O(1),
+producing the same values as the batch engine (`indicator_engine`) at that
+bar. States serialise to plain JSON-compatible dicts (`to_dict` /
+`from_dict`) so they can be saved on shutdown and resumed after a restart
+without replaying history.
+"""
+import json
+import math
+import os
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from services.indicator_engine import VOLUME_SPIKE_THRESHOLD, VOLUME_SPIKE_WINDOW, summarize
+from services.ohlcv import OHLCVBars
+from services.resampler import IST_OFFSET_NS, NS_PER_DAY
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+class EMA:
+    """EMA seeded with the SMA of its first `length` inputs."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.count = 0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        if self.count < self.length:
+            self.value = x if self.count == 1 else self.value + x
+            return NAN
+        if self.count == self.length:
+            self.value = (x if self.length == 1 else self.value + x) / self.length
+        else:
+            self.value += 2.0 / (self.length + 1) * (x - self.value)
+        return self.value
+
+    @property
+    def current(self) -> float:
+        return self.value if self.count >= self.length else NAN
+
+    def to_dict(self) -> Dict:
+        return {'length': self.length, 'count': self.count, 'value': self.value}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EMA':
+        ema = cls(data['length'])
+        ema.count, ema.value = data['count'], data['value']
+        return ema
+
+
+class RMA:
+    """Wilder's average as an adjusted EWM (alpha = 1/length), like pandas' ewm().mean()."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.count = 0
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def update(self, x: float) -> float:
+        decay = 1.0 - 1.0 / self.length
+        self.numerator *= decay
+        self.denominator *= decay
+        if not math.isnan(x):
+            self.numerator += x
+            self.denominator += 1.0
+            self.count += 1
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.numerator / self.denominator if self.count >= self.length else NAN
+
+    def to_dict(self) -> Dict:
+        return {'length': self.length, 'count': self.count, 'numerator': self.numerator, 'denominator': self.denominator}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RMA':
+        rma = cls(data['length'])
+        rma.count, rma.numerator, rma.denominator = data['count'], data['numerator'], data['denominator']
+        return rma
+
+
+class RSI:
+    def __init__(self, length: int = 14):
+        self.previous = NAN
+        self.gains = RMA(length)
+        self.losses = RMA(length)
+
+    def update(self, close: float) -> float:
+        change = close - self.previous
+        self.previous = close
+        self.gains.update(max(change, 0.0) if not math.isnan(change) else NAN)
+        self.losses.update(max(-change, 0.0) if not math.isnan(change) else NAN)
+        return self.current
+
+    @property
+    def current(self) -> float:
+        gains, losses = self.gains.current, self.losses.current
+        total = gains + losses
+        return 100.0 * gains / total if total > 0 else NAN
+
+    def to_dict(self) -> Dict:
+        return {'previous': self.previous, 'gains': self.gains.to_dict(), 'losses': self.losses.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RSI':
+        rsi = cls()
+        rsi.previous = data['previous']
+        rsi.gains, rsi.losses = RMA.from_dict(data['gains']), RMA.from_dict(data['losses'])
+        return rsi
+
+
+class MACD:
+    """MACD line, signal and histogram; the signal starts once the line is defined."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+
+    def update(self, close: float) -> Dict[str, float]:
+        line = self.fast.update(close) - self.slow.update(close)
+        if not math.isnan(line):
+            self.signal.update(line)
+        return self.current
+
+    @property
+    def current(self) -> Dict[str, float]:
+        line = self.fast.current - self.slow.current
+        signal = self.signal.current
+        return {'macd': line, 'macd_signal': signal, 'macd_hist': line - signal}
+
+    def to_dict(self) -> Dict:
+        return {'fast': self.fast.to_dict(), 'slow': self.slow.to_dict(), 'signal': self.signal.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MACD':
+        macd = cls()
+        macd.fast, macd.slow, macd.signal = (EMA.from_dict(data[k]) for k in ('fast', 'slow', 'signal'))
+        return macd
+
+
+class RollingWindow:
+    """
+    Trailing window with running sum and sum of squares (values centred on
+    the first input for accuracy). The sums are recomputed from the buffer
+    each time it wraps, so rounding error cannot accumulate; amortised O(1).
+    """
+
+    def __init__(self, length: int):
+        self.length = length
+        self.buffer: List[float] = []
+        self.position = 0
+        self.centre: Optional[float] = None
+        self.total = 0.0
+        self.squares = 0.0
+
+    def update(self, x: float) -> None:
+        if self.centre is None:
+            self.centre = x
+        x -= self.centre
+        if len(self.buffer) < self.length:
+            self.buffer.append(x)
+        else:
+            old = self.buffer[self.position]
+            self.buffer[self.position] = x
+            self.total -= old
+            self.squares -= old * old
+            self.position = (self.position + 1) % self.length
+            if self.position == 0:
+                self.total = math.fsum(self.buffer)
+                self.squares = math.fsum(v * v for v in self.buffer)
+                return
+        self.total += x
+        self.squares += x * x
+
+    @property
+    def full(self) -> bool:
+        return len(self.buffer) == self.length
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.length + self.centre if self.full else NAN
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the window."""
+        if not self.full:
+            return NAN
+        mean = self.total / self.length
+        return math.sqrt(max(self.squares / self.length - mean * mean, 0.0))
+
+    def to_dict(self) -> Dict:
+        return {
+            'length': self.length, 'buffer': list(self.buffer), 'position': self.position,
+            'centre': self.centre, 'total': self.total, 'squares': self.squares,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RollingWindow':
+        window = cls(data['length'])
+        window.buffer, window.position, window.centre = list(data['buffer']), data['position'], data['centre']
+        window.total, window.squares = data['total'], data['squares']
+        return window
+
+
+class ATR:
+    def __init__(self, length: int = 14):
+        self.previous = NAN
+        self.average = RMA(length)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if math.isnan(self.previous):
+            true_range = NAN
+        else:
+            true_range = max(high - low, abs(high - self.previous), abs(low - self.previous))
+        self.previous = close
+        return self.average.update(true_range)
+
+    def to_dict(self) -> Dict:
+        return {'previous': self.previous, 'average': self.average.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ATR':
+        atr = cls()
+        atr.previous, atr.average = data['previous'], RMA.from_dict(data['average'])
+        return atr
+
+
+class RollingExtreme:
+    """
+    Maximum (or minimum) of the last `length` inputs via a monotonic deque
+    of (index, value) pairs: each input is pushed and popped at most once,
+    so updates are amortised O(1).
+    """
+
+    def __init__(self, length: int, largest: bool = True):
+        self.length = length
+        self.largest = largest
+        self.count = 0
+        self.window: Deque[Tuple[int, float]] = deque()
+
+    def update(self, x: float) -> float:
+        beaten = (lambda v: v <= x) if self.largest else (lambda v: v >= x)
+        while self.window and beaten(self.window[-1][1]):
+            self.window.pop()
+        self.window.append((self.count, x))
+        self.count += 1
+        if self.window[0][0] <= self.count - 1 - self.length:
+            self.window.popleft()
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.window[0][1] if self.count >= self.length else NAN
+
+    def to_dict(self) -> Dict:
+        return {'length': self.length, 'largest': self.largest, 'count': self.count, 'window': [list(p) for p in self.window]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RollingExtreme':
+        extreme = cls(data['length'], data['largest'])
+        extreme.count = data['count']
+        extreme.window = deque((index, value) for index, value in data['window'])
+        return extreme
+
+
+class WindowMean:
+    """Mean of the last `length` inputs, NaN unless all are valid; for short windows."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.buffer: Deque[float] = deque(maxlen=length)
+
+    def update(self, x: float) -> float:
+        self.buffer.append(x)
+        return self.current
+
+    @property
+    def current(self) -> float:
+        if len(self.buffer) < self.length or any(math.isnan(v) for v in self.buffer):
+            return NAN
+        return math.fsum(self.buffer) / self.length
+
+    def to_dict(self) -> Dict:
+        return {'length': self.length, 'buffer': list(self.buffer)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WindowMean':
+        mean = cls(data['length'])
+        mean.buffer.extend(data['buffer'])
+        return mean
+
+
+class Stochastic:
+    def __init__(self, k: int = 14, d: int = 3, smooth_k: int = 3):
+        self.highest = RollingExtreme(k, largest=True)
+        self.lowest = RollingExtreme(k, largest=False)
+        self.k = WindowMean(smooth_k)
+        self.d = WindowMean(d)
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        highest, lowest = self.highest.update(high), self.lowest.update(low)
+        spread = highest - lowest
+        self.d.update(self.k.update(100.0 * (close - lowest) / spread if spread > 0 else NAN))
+        return self.current
+
+    @property
+    def current(self) -> Tuple[float, float]:
+        return self.k.current, self.d.current
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name).to_dict() for name in ('highest', 'lowest', 'k', 'd')}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Stochastic':
+        stochastic = cls()
+        stochastic.highest, stochastic.lowest = RollingExtreme.from_dict(data['highest']), RollingExtreme.from_dict(data['lowest'])
+        stochastic.k, stochastic.d = WindowMean.from_dict(data['k']), WindowMean.from_dict(data['d'])
+        return stochastic
+
+
+class ADX:
+    """ADX with +DI/-DI; takes the ATR of the same length from `ATR`."""
+
+    def __init__(self, length: int = 14):
+        self.previous_high = NAN
+        self.previous_low = NAN
+        self.plus = RMA(length)
+        self.minus = RMA(length)
+        self.average = RMA(length)
+        self.plus_di = NAN
+        self.minus_di = NAN
+
+    def update(self, high: float, low: float, average_range: float) -> float:
+        up, down = high - self.previous_high, self.previous_low - low
+        self.previous_high, self.previous_low = high, low
+        if math.isnan(up):
+            plus = minus = NAN
+        else:
+            plus = up if up > down and up > 0 else 0.0
+            minus = down if down > up and down > 0 else 0.0
+        plus, minus = self.plus.update(plus), self.minus.update(minus)
+        self.plus_di = 100.0 * plus / average_range if average_range else NAN
+        self.minus_di = 100.0 * minus / average_range if average_range else NAN
+        total = self.plus_di + self.minus_di
+        return self.average.update(100.0 * abs(self.plus_di - self.minus_di) / total if total else NAN)
+
+    def to_dict(self) -> Dict:
+        return {
+            'previous_high': self.previous_high, 'previous_low': self.previous_low,
+            'plus_di': self.plus_di, 'minus_di': self.minus_di,
+            **{name: getattr(self, name).to_dict() for name in ('plus', 'minus', 'average')},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ADX':
+        adx = cls()
+        adx.previous_high, adx.previous_low = data['previous_high'], data['previous_low']
+        adx.plus_di, adx.minus_di = data['plus_di'], data['minus_di']
+        adx.plus, adx.minus, adx.average = (RMA.from_dict(data[k]) for k in ('plus', 'minus', 'average'))
+        return adx
+
+
+class SuperTrend:
+    """SuperTrend line and direction from bands `multiplier` ATRs around the bar midpoint."""
+
+    def __init__(self, length: int = 7, multiplier: float = 3.0):
+        self.multiplier = multiplier
+        self.atr = ATR(length)
+        self.bars = 0
+        self.upper = NAN
+        self.lower = NAN
+        self.direction = 1.0
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        width = self.multiplier * self.atr.update(high, low, close)
+        middle = (high + low) / 2.0
+        upper, lower = middle + width, middle - width
+        self.bars += 1
+        if self.bars > 1:
+            if close > self.upper:
+                self.direction = 1.0
+            elif close < self.lower:
+                self.direction = -1.0
+            else:
+                if self.direction > 0 and lower < self.lower:
+                    lower = self.lower
+                if self.direction < 0 and upper > self.upper:
+                    upper = self.upper
+            self.value = lower if self.direction > 0 else upper
+        self.upper, self.lower = upper, lower
+        return self.value
+
+    @property
+    def current_direction(self) -> float:
+        return NAN if math.isnan(self.value) else self.direction
+
+    def to_dict(self) -> Dict:
+        return {
+            'multiplier': self.multiplier, 'atr': self.atr.to_dict(), 'bars': self.bars,
+            'upper': self.upper, 'lower': self.lower, 'direction': self.direction, 'value': self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SuperTrend':
+        trend = cls(multiplier=data['multiplier'])
+        trend.atr, trend.bars = ATR.from_dict(data['atr']), data['bars']
+        trend.upper, trend.lower = data['upper'], data['lower']
+        trend.direction, trend.value = data['direction'], data['value']
+        return trend
+
+
+class OBV:
+    """On-balance volume; the first bar counts as an up bar."""
+
+    def __init__(self):
+        self.previous = NAN
+        self.value = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        if close < self.previous:
+            self.value -= volume
+        elif not close == self.previous:
+            self.value += volume
+        self.previous = close
+        return self.value
+
+    def to_dict(self) -> Dict:
+        return {'previous': self.previous, 'value': self.value}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'OBV':
+        obv = cls()
+        obv.previous, obv.value = data['previous'], data['value']
+        return obv
+
+
+class SessionVWAP:
+    """VWAP that restarts at each IST day."""
+
+    def __init__(self):
+        self.day: Optional[int] = None
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, timestamp: int, high: float, low: float, close: float, volume: float) -> float:
+        local = timestamp + IST_OFFSET_NS
+        day = local - local % NS_PER_DAY
+        if day != self.day:
+            self.day, self.price_volume, self.volume = day, 0.0, 0.0
+        self.price_volume += (high + low + close) / 3.0 * volume
+        self.volume += volume
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.price_volume / self.volume if self.volume else NAN
+
+    def to_dict(self) -> Dict:
+        return {'day': self.day, 'price_volume': self.price_volume, 'volume': self.volume}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SessionVWAP':
+        vwap = cls()
+        vwap.day, vwap.price_volume, vwap.volume = data['day'], data['price_volume'], data['volume']
+        return vwap
+
+
+class IndicatorState:
+    """
+    Every indicator of `compute_indicators`, updated one bar at a time.
+    `latest()` returns the same summary dict as `calculate_all_indicators`.
+    """
+
+    def __init__(self):
+        self.bars = 0
+        self.timestamp: Optional[int] = None
+        self.close = NAN
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.ema20 = EMA(20)
+        self.ema50 = EMA(50)
+        self.sma200 = RollingWindow(200)
+        self.bands = RollingWindow(20)
+        self.vwap = SessionVWAP()
+        self.atr = ATR(14)
+        self.volumes = RollingWindow(VOLUME_SPIKE_WINDOW)
+        self.volume = NAN
+        self.adx = ADX(14)
+        self.stochastic = Stochastic(14, 3, 3)
+        self.supertrend = SuperTrend(7, 3.0)
+        self.obv = OBV()
+        self.donchian_upper = RollingExtreme(20, largest=True)
+        self.donchian_lower = RollingExtreme(20, largest=False)
+
+    @classmethod
+    def from_bars(cls, bars: OHLCVBars) -> 'IndicatorState':
+        """State after feeding `bars` in order (priming from history)."""
+        state = cls()
+        for bar in zip(*(getattr(bars, col).tolist() for col in ('timestamp', 'open', 'high', 'low', 'close', 'volume'))):
+            state.update(*bar)
+        return state
+
+    def update(self, timestamp: int, open: float, high: float, low: float, close: float, volume: float) -> 'IndicatorState':
+        """
+        Advance by one bar. A NaN volume (a source that reports none) adds
+        nothing to VWAP or OBV and stays out of the volume-spike average.
+        """
+        self.bars += 1
+        self.timestamp = timestamp
+        self.close = close
+        self.volume = float(volume)
+        traded = 0.0 if math.isnan(self.volume) else self.volume
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.ema20.update(close)
+        self.ema50.update(close)
+        self.sma200.update(close)
+        self.bands.update(close)
+        self.vwap.update(timestamp, high, low, close, traded)
+        self.adx.update(high, low, self.atr.update(high, low, close))
+        if not math.isnan(self.volume):
+            self.volumes.update(self.volume)
+        self.stochastic.update(high, low, close)
+        self.supertrend.update(high, low, close)
+        self.obv.update(close, traded)
+        self.donchian_upper.update(high)
+        self.donchian_lower.update(low)
+        return self
+
+    def values(self) -> Dict[str, float]:
+        """Current value of every series, named as in `IndicatorSeries`."""
+        middle, width = self.bands.mean, 2.0 * self.bands.std
+        volume_mean = self.volumes.mean
+        upper, lower = self.donchian_upper.current, self.donchian_lower.current
+        return {
+            'rsi': self.rsi.current,
+            **self.macd.current,
+            'ema20': self.ema20.current,
+            'ema50': self.ema50.current,
+            'sma200': self.sma200.mean,
+            'bb_upper': middle + width,
+            'bb_middle': middle,
+            'bb_lower': middle - width,
+            'vwap': self.vwap.current,
+            'atr': self.atr.average.current,
+            'volume_spike': not math.isnan(volume_mean) and self.volume > volume_mean * VOLUME_SPIKE_THRESHOLD,
+            'adx': self.adx.average.current,
+            'plus_di': self.adx.plus_di,
+            'minus_di': self.adx.minus_di,
+            'stoch_k': self.stochastic.k.current,
+            'stoch_d': self.stochastic.d.current,
+            'supertrend': self.supertrend.value,
+            'supertrend_direction': self.supertrend.current_direction,
+            'obv': self.obv.value,
+            'donchian_upper': upper,
+            'donchian_middle': (upper + lower) / 2.0,
+            'donchian_lower': lower,
+        }
+
+    def latest(self) -> Dict:
+        return summarize(self.values(), self.close, self.bars)
+
+    def to_dict(self) -> Dict:
+        return {
+            'bars': self.bars, 'timestamp': self.timestamp, 'close': self.close, 'volume': self.volume,
+            **{name: getattr(self, name).to_dict() for name in STATE_PARTS},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IndicatorState':
+        state = cls()
+        state.bars, state.timestamp = data['bars'], data['timestamp']
+        state.close, state.volume = data['close'], data['volume']
+        for name, part in STATE_PARTS.items():
+            setattr(state, name, part.from_dict(data[name]))
+        return state
+
+
+# Serialised parts of IndicatorState and their types
+STATE_PARTS = {
+    'rsi': RSI, 'macd': MACD, 'ema20': EMA, 'ema50': EMA, 'sma200': RollingWindow,
+    'bands': RollingWindow, 'vwap': SessionVWAP, 'atr': ATR, 'volumes': RollingWindow,
+    'adx': ADX, 'stochastic': Stochastic, 'supertrend': SuperTrend, 'obv': OBV,
+    'donchian_upper': RollingExtreme, 'donchian_lower': RollingExtreme,
+}
+
+
+def save_states(states: Dict[str, IndicatorState], path: str) -> int:
+    """Write indicator states keyed by symbol to a JSON file; returns the count."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump({symbol: state.to_dict() for symbol, state in states.items()}, fh)
+    os.replace(tmp_path, path)
+    return len(states)
+
+
+def load_states(path: str) -> Dict[str, IndicatorState]:
+    """Indicator states saved by `save_states` (empty if missing or unreadable)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return {symbol: IndicatorState.from_dict(data) for symbol, data in json.load(fh).items()}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable indicator state file {path}: {e}")
+        return {}
@@ -0,0 +1,623 @@
+"""
+Full-series indicator engine.
+Computes RSI, MACD, EMA20/50, SMA200, Bollinger Bands, VWAP, ATR, the
+volume spike, ADX, Stochastic, SuperTrend, OBV and Donchian channels over
+the NumPy columns of `OHLCVBars` in one pass, returning aligned series
+(NaN during each indicator's warm-up). Shared intermediates (price change,
+true range, rolling sums of the close) are computed once.
+The kernels work along the last axis, so `compute_panel_indicators` runs
+the same code over a whole (symbols x time) panel at once.
+Strategies with tuned periods declare extra requirements (see
+`compute_requirements`), computed alongside with intermediates shared.
+
+Definitions follow pandas_ta's defaults so values match what
+`calculate_all_indicators` returned when it called pandas_ta:
+RSI and ATR smooth with Wilder's RMA (an adjusted EWM with alpha=1/length),
+EMAs are seeded with the SMA of their first `length` values, Bollinger
+Bands use the population standard deviation and VWAP restarts every IST
+trading day. The extended set uses pandas_ta's default parameters too:
+ADX(14), Stochastic(14, 3, 3), SuperTrend(7, 3.0) and Donchian(20).
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from services.ohlcv import OHLCVBars
+from services.resampler import bucket_starts
+
+# Block length of the EWM scan; keeps decay**-k well inside float64 range
+SCAN_BLOCK = 64
+
+VOLUME_SPIKE_WINDOW = 20
+VOLUME_SPIKE_THRESHOLD = 1.5
+
+# Requirements (name, *params) already covered by the standard summary
+BASE_REQUIREMENTS = frozenset({
+    ('rsi', 14), ('macd', 12, 26, 9), ('ema', 20), ('ema', 50),
+    ('sma', 200), ('bbands', 20, 2.0), ('atr', 14),
+})
+
+
+def linear_scan(x: np.ndarray, decay: float, carry=0.0) -> np.ndarray:
+    """
+    s[t] = decay * s[t-1] + x[t] along the last axis with s[-1] = carry, in
+    closed form per block: s[j] = decay**j * (decay * carry + cumsum(x[k] * decay**-k)).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if decay == 0.0:
+        return x.copy()
+    out = np.empty_like(x)
+    carry = np.asarray(carry, dtype=np.float64)
+    inverse = decay ** -np.arange(SCAN_BLOCK, dtype=np.float64)
+    for start in range(0, x.shape[-1], SCAN_BLOCK):
+        chunk = x[..., start:start + SCAN_BLOCK]
+        weights = inverse[:chunk.shape[-1]]
+        block = (np.cumsum(chunk * weights, axis=-1) + decay * carry[..., None]) / weights
+        out[..., start:start + chunk.shape[-1]] = block
+        carry = block[..., -1]
+    return out
+
+
+def shift(x: np.ndarray) -> np.ndarray:
+    """Previous value along the last axis (NaN for the first)."""
+    return np.concatenate([np.full(x.shape[:-1] + (1,), np.nan), x[..., :-1]], axis=-1)
+
+
+def first_valid(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index and value of the first non-NaN entry along the last axis (NaN if none)."""
+    valid = ~np.isnan(x)
+    index = np.argmax(valid, axis=-1)
+    value = np.take_along_axis(x, index[..., None], axis=-1)[..., 0] if x.shape[-1] else np.full(x.shape[:-1], np.nan)
+    return index, value
+
+
+def rolling_sum(x: np.ndarray, length: int) -> np.ndarray:
+    """Sum over the trailing `length` values; NaN until the window holds `length` valid values."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= length:
+        valid = ~np.isnan(x)
+        pad = np.zeros(x.shape[:-1] + (1,))
+        total = np.concatenate([pad, np.cumsum(np.where(valid, x, 0.0), axis=-1)], axis=-1)
+        count = np.concatenate([pad, np.cumsum(valid, axis=-1)], axis=-1)
+        full = count[..., length:] - count[..., :-length] == length
+        out[..., length - 1:] = np.where(full, total[..., length:] - total[..., :-length], np.nan)
+    return out
+
+
+def sma(x: np.ndarray, length: int) -> np.ndarray:
+    return rolling_sum(x, length) / length
+
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """
+    EMA (alpha = 2/(length+1)) seeded with the SMA of the first `length`
+    valid values; leading NaNs (e.g. panel padding) delay the seed.
+    """
+    alpha = 2.0 / (length + 1)
+    first, _ = first_valid(x)
+    seed_at = np.where(np.isnan(x).all(axis=-1), x.shape[-1], first + length - 1)[..., None]
+    seeds = np.take_along_axis(sma(x, length), np.minimum(seed_at, max(x.shape[-1] - 1, 0)), axis=-1)
+    position = np.arange(x.shape[-1])
+    # Zero before the seed, the seed itself, then alpha * x feeding the recursion
+    inputs = np.where(position > seed_at, alpha * np.nan_to_num(x), 0.0)
+    inputs = np.where(position == seed_at, seeds, inputs)
+    return np.where(position >= seed_at, linear_scan(inputs, 1.0 - alpha), np.nan)
+
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """
+    Wilder's moving average as pandas computes ewm(alpha=1/length,
+    min_periods=length).mean(): an adjusted EWM where leading NaNs carry no
+    weight.
+    """
+    alpha = 1.0 / length
+    observed = ~np.isnan(x)
+    numerator = linear_scan(np.where(observed, x, 0.0), 1.0 - alpha)
+    denominator = linear_scan(observed.astype(np.float64), 1.0 - alpha)
+    ready = np.cumsum(observed, axis=-1) >= length
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(ready, numerator / denominator, np.nan)
+
+
+def rsi(change: np.ndarray, length: int = 14) -> np.ndarray:
+    """RSI from bar-to-bar close changes (NaN where there is no previous close)."""
+    gains = rma(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), length)
+    losses = rma(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100.0 * gains / (gains + losses)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line (an EMA of the MACD line) and histogram."""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def rolling_std(x: np.ndarray, length: int, window_sum: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Population standard deviation over a trailing window. `window_sum` (the
+    rolling sum of x) is reused when given; values are centred on the first
+    valid value to keep the sum-of-squares form accurate.
+    """
+    if window_sum is None:
+        window_sum = rolling_sum(x, length)
+    _, centre = first_valid(x)
+    centre = np.nan_to_num(centre)[..., None]
+    mean = window_sum / length - centre
+    squares = rolling_sum((x - centre) ** 2, length) / length
+    return np.sqrt(np.maximum(squares - mean ** 2, 0.0))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; NaN on the first bar, which has no previous close."""
+    previous = shift(close)
+    ranges = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    return np.where(np.isnan(previous), np.nan, ranges)
+
+
+def rolling_max(x: np.ndarray, length: int) -> np.ndarray:
+    """
+    Maximum over the trailing `length` values; NaN until the window is full
+    or while it holds a NaN. Uses van Herk/Gil-Werman: running maxima from
+    each block start and to each block end (blocks of `length`), so every
+    window is one comparison of a suffix and a prefix - O(n) whatever the
+    window, and vectorised rather than a per-element monotonic deque.
+    """
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    if n < length:
+        return out
+    blocks = -(-n // length)
+    padded = np.full(x.shape[:-1] + (blocks * length,), -np.inf)
+    padded[..., :n] = x
+    grouped = padded.reshape(x.shape[:-1] + (blocks, length))
+    prefix = np.maximum.accumulate(grouped, axis=-1).reshape(padded.shape)
+    suffix = np.maximum.accumulate(grouped[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    out[..., length - 1:] = np.maximum(suffix[..., :n - length + 1], prefix[..., length - 1:n])
+    return out
+
+
+def rolling_min(x: np.ndarray, length: int) -> np.ndarray:
+    """Minimum over the trailing `length` values (see `rolling_max`)."""
+    return -rolling_max(-x, length)
+
+
+def stochastic(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    k: int = 14,
+    d: int = 3,
+    smooth_k: int = 3
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Slow stochastic %K (smoothed over `smooth_k`) and %D; NaN while the k-bar range is flat."""
+    lowest = rolling_min(low, k)
+    spread = rolling_max(high, k) - lowest
+    with np.errstate(invalid='ignore', divide='ignore'):
+        raw = np.where(spread > 0, 100.0 * (close - lowest) / spread, np.nan)
+    stoch_k = sma(raw, smooth_k)
+    return stoch_k, sma(stoch_k, d)
+
+
+def adx(
+    high: np.ndarray,
+    low: np.ndarray,
+    average_range: np.ndarray,
+    length: int = 14
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ADX with +DI and -DI, Wilder-smoothed with RMA. `average_range` is the
+    ATR over the same `length` (shared with the ATR series).
+    """
+    up = high - shift(high)
+    down = shift(low) - low
+    plus = np.where((up > down) & (up > 0), up, 0.0)
+    minus = np.where((down > up) & (down > 0), down, 0.0)
+    first = np.isnan(up)
+    # No range (flat prices), no direction
+    average_range = np.where(average_range > 0, average_range, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plus_di = 100.0 * rma(np.where(first, np.nan, plus), length) / average_range
+        minus_di = 100.0 * rma(np.where(first, np.nan, minus), length) / average_range
+        dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return rma(dx, length), plus_di, minus_di
+
+
+def supertrend(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    average_range: np.ndarray,
+    multiplier: float = 3.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    SuperTrend line and direction (1 up, -1 down) from bands `multiplier`
+    ATRs around the bar midpoint. A band only ratchets in the trend's
+    direction, which makes this a sequential recursion: it runs as a plain
+    loop per row, O(n) in total.
+    """
+    width = multiplier * average_range
+    middle = (high + low) / 2.0
+    upper_bands, lower_bands = middle + width, middle - width
+    trend = np.full(close.shape, np.nan)
+    direction = np.full(close.shape, np.nan)
+    for row in np.ndindex(close.shape[:-1]):
+        closes, uppers, lowers = close[row].tolist(), upper_bands[row].tolist(), lower_bands[row].tolist()
+        values, directions = [np.nan] * len(closes), [np.nan] * len(closes)
+        up = 1.0
+        for i in range(1, len(closes)):
+            if closes[i] > uppers[i - 1]:
+                up = 1.0
+            elif closes[i] < lowers[i - 1]:
+                up = -1.0
+            else:
+                if up > 0 and lowers[i] < lowers[i - 1]:
+                    lowers[i] = lowers[i - 1]
+                if up < 0 and uppers[i] > uppers[i - 1]:
+                    uppers[i] = uppers[i - 1]
+            values[i] = lowers[i] if up > 0 else uppers[i]
+            if values[i] == values[i]:
+                directions[i] = up
+        trend[row], direction[row] = values, directions
+    return trend, direction
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """On-balance volume; the first bar counts as an up bar."""
+    change = close - shift(close)
+    missing = np.isnan(close)
+    signed = np.where(np.isnan(change), 1.0, np.sign(change)) * np.where(missing, 0.0, volume)
+    return np.where(missing, np.nan, np.cumsum(np.nan_to_num(signed), axis=-1))
+
+
+def vwap(typical: np.ndarray, volume: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    """VWAP anchored at the start of every IST day."""
+    days = bucket_starts(timestamps, '1d')
+    position = np.arange(days.shape[-1])
+    new_day = np.concatenate([np.ones(days.shape[:-1] + (1,), dtype=bool), days[..., 1:] != days[..., :-1]], axis=-1)
+    # Column where each bar's session starts
+    session_start = np.maximum.accumulate(np.where(new_day, position, 0), axis=-1)
+
+    def session_cumsum(values):
+        total = np.cumsum(np.nan_to_num(values), axis=-1)
+        before = np.concatenate([np.zeros(total.shape[:-1] + (1,)), total], axis=-1)
+        return total - np.take_along_axis(before, session_start, axis=-1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(np.isnan(typical), np.nan, session_cumsum(typical * volume) / session_cumsum(volume))
+
+
+def summarize(values: Dict[str, float], close: float, n: int) -> Dict:
+    """
+    The `calculate_all_indicators` dict from one bar's indicator values,
+    `n` being the number of bars seen. Keeps the fallbacks the per-indicator
+    pandas_ta calls used: a neutral RSI, the close for moving averages,
+    bands and VWAP, and zero ATR/MACD. ADX, stochastic, SuperTrend, OBV
+    and Donchian values are None until their windows fill.
+    """
+    def rounded(name, default=None):
+        value = values[name]
+        return default if np.isnan(value) else round(float(value), 2)
+
+    if n >= 26:
+        macd_values = {
+            'value': round(float(values['macd']), 2),
+            'signal': round(float(values['macd_signal']), 2),
+            'histogram': round(float(values['macd_hist']), 2),
+        }
+    else:
+        macd_values = {'value': 0.0, 'signal': 0.0, 'histogram': 0.0}
+
+    if n >= 20:
+        bands = {
+            'upper': round(float(values['bb_upper']), 2),
+            'middle': round(float(values['bb_middle']), 2),
+            'lower': round(float(values['bb_lower']), 2),
+        }
+    else:
+        bands = {'upper': close, 'middle': close, 'lower': close}
+
+    return {
+        'rsi': rounded('rsi', 50.0),
+        'macd': macd_values,
+        'ema20': rounded('ema20', close),
+        'ema50': rounded('ema50', close),
+        'sma200': rounded('sma200', close) if n >= 200 else close,
+        'bollingerBands': bands,
+        'vwap': rounded('vwap', close),
+        'atr': rounded('atr', 0.0),
+        'volumeSpike': bool(values['volume_spike']),
+        'adx': {'value': rounded('adx'), 'plusDI': rounded('plus_di'), 'minusDI': rounded('minus_di')},
+        'stochastic': {'k': rounded('stoch_k'), 'd': rounded('stoch_d')},
+        'supertrend': {
+            'value': rounded('supertrend'),
+            'direction': None if np.isnan(values['supertrend_direction']) else int(values['supertrend_direction']),
+        },
+        'obv': rounded('obv'),
+        'donchianChannels': {
+            'upper': rounded('donchian_upper'),
+            'middle': rounded('donchian_middle'),
+            'lower': rounded('donchian_lower'),
+        },
+    }
+
+
+class IndicatorSeries:
+    """
+    Full indicator series aligned with the bars they were computed from.
+    Index like a dict (``series['rsi']``); `latest` gives the summary dict
+    returned by `calculate_all_indicators`.
+    """
+
+    __slots__ = ('timestamp', 'close', 'values', 'tuned')
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        close: np.ndarray,
+        values: Dict[str, np.ndarray],
+        tuned: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+    ):
+        self.timestamp = timestamp
+        self.close = close
+        self.values = values
+        self.tuned = tuned or {}
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    def at(self, name: str, i: int = -1, default=None):
+        """Value of one indicator at bar `i`, or `default` while it is still NaN."""
+        value = self.values[name][i]
+        return default if np.isnan(value) else value
+
+    def latest(self, i: int = -1) -> Dict:
+        """Summary of the indicators at bar `i` (default: the last bar)."""
+        n = len(self) + i + 1 if i < 0 else i + 1
+        summary = summarize({name: values[i] for name, values in self.values.items()}, float(self.close[i]), n)
+        if self.tuned:
+            summary['tuned'] = tuned_at(self.tuned, i)
+        return summary
+
+
+def _compute(timestamp: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """Every indicator along the last axis of 1D series or 2D (symbols x time) arrays."""
+    change = close - shift(close)
+    macd_line, macd_signal, macd_hist = macd(close)
+
+    close_sum20 = rolling_sum(close, 20)
+    bb_middle = close_sum20 / 20
+    bb_width = 2.0 * rolling_std(close, 20, close_sum20)
+
+    volume_mean = sma(volume, VOLUME_SPIKE_WINDOW)
+    with np.errstate(invalid='ignore'):
+        volume_spike = volume > volume_mean * VOLUME_SPIKE_THRESHOLD
+
+    # True range feeds ATR, ADX and SuperTrend
+    ranges = true_range(high, low, close)
+    atr14 = rma(ranges, 14)
+    adx_line, plus_di, minus_di = adx(high, low, atr14, 14)
+    trend, trend_direction = supertrend(high, low, close, rma(ranges, 7), 3.0)
+    stoch_k, stoch_d = stochastic(high, low, close, 14, 3, 3)
+    donchian_upper = rolling_max(high, 20)
+    donchian_lower = rolling_min(low, 20)
+
+    return {
+        'rsi': rsi(change, 14),
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'macd_hist': macd_hist,
+        'ema20': ema(close, 20),
+        'ema50': ema(close, 50),
+        'sma200': sma(close, 200),
+        'bb_upper': bb_middle + bb_width,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_middle - bb_width,
+        'vwap': vwap((high + low + close) / 3.0, volume, timestamp),
+        'atr': atr14,
+        'volume_spike': volume_spike,
+        'adx': adx_line,
+        'plus_di': plus_di,
+        'minus_di': minus_di,
+        'stoch_k': stoch_k,
+        'stoch_d': stoch_d,
+        'supertrend': trend,
+        'supertrend_direction': trend_direction,
+        'obv': obv(close, volume),
+        'donchian_upper': donchian_upper,
+        'donchian_middle': (donchian_upper + donchian_lower) / 2.0,
+        'donchian_lower': donchian_lower,
+    }
+
+
+def requirement_key(requirement: tuple) -> str:
+    """Name of a requirement in `indicators['tuned']`, e.g. 'rsi_9' or 'bbands_20_2.5'."""
+    name, *params = requirement
+    return '_'.join([name] + [f"{param:g}" for param in params])
+
+
+def compute_requirements(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    requirements: Iterable[tuple]
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Series for each distinct requirement ``(name, *params)`` - 'rsi', 'ema',
+    'sma', 'atr' (length), 'macd' (fast, slow, signal) or 'bbands' (length,
+    std) - keyed by `requirement_key`. Intermediates are memoised across
+    requirements: an EMA length is computed once whether an EMA crossover
+    or a MACD asks for it, and likewise the price change, true range and
+    rolling sums of the close.
+    """
+    memo: Dict[tuple, np.ndarray] = {}
+
+    def shared(key, build):
+        if key not in memo:
+            memo[key] = build()
+        return memo[key]
+
+    def ema_of(length):
+        return shared(('ema', length), lambda: ema(close, length))
+
+    def sum_of(length):
+        return shared(('sum', length), lambda: rolling_sum(close, length))
+
+    out: Dict[str, Dict[str, np.ndarray]] = {}
+    for requirement in set(requirements):
+        key = requirement_key(requirement)
+        name, *params = requirement
+        if name == 'rsi':
+            change = shared(('change',), lambda: close - shift(close))
+            series = {'value': rsi(change, int(params[0]))}
+        elif name == 'ema':
+            series = {'value': ema_of(int(params[0]))}
+        elif name == 'sma':
+            series = {'value': sum_of(int(params[0])) / int(params[0])}
+        elif name == 'atr':
+            ranges = shared(('true_range',), lambda: true_range(high, low, close))
+            series = {'value': rma(ranges, int(params[0]))}
+        elif name == 'macd':
+            fast, slow, signal = (int(p) for p in params)
+            line = ema_of(fast) - ema_of(slow)
+            signal_line = ema(line, signal)
+            series = {'value': line, 'signal': signal_line, 'histogram': line - signal_line}
+        elif name == 'bbands':
+            length, std = int(params[0]), float(params[1])
+            middle = sum_of(length) / length
+            width = std * shared(('std', length), lambda: rolling_std(close, length, sum_of(length)))
+            series = {'upper': middle + width, 'middle': middle, 'lower': middle - width}
+        else:
+            raise ValueError(f"Unknown indicator requirement: {requirement}")
+        out[key] = series
+    return out
+
+
+def tuned_at(tuned: Dict[str, Dict[str, np.ndarray]], index) -> Dict:
+    """
+    Rounded values of `compute_requirements` series at `index` (None while
+    warming up). Single-valued requirements map to a number, the others
+    (MACD, bands) to a dict of their parts.
+    """
+    def rounded(values):
+        value = values[index]
+        return None if np.isnan(value) else round(float(value), 2)
+
+    result = {}
+    for key, series in tuned.items():
+        if set(series) == {'value'}:
+            result[key] = rounded(series['value'])
+        else:
+            result[key] = {part: rounded(values) for part, values in series.items()}
+    return result
+
+
+def compute_indicators(bars: OHLCVBars, requirements: Iterable[tuple] = ()) -> IndicatorSeries:
+    """
+    Compute every indicator series for `bars` in one pass, plus any
+    `requirements` beyond the standard set (see `compute_requirements`).
+    """
+    values = _compute(bars.timestamp, bars.high, bars.low, bars.close, bars.volume.astype(np.float64))
+    tuned = compute_requirements(bars.high, bars.low, bars.close, set(requirements) - BASE_REQUIREMENTS)
+    return IndicatorSeries(bars.timestamp, bars.close, values, tuned)
+
+
+class PanelIndicators:
+    """
+    Indicators for every symbol of an `OHLCVPanel`, computed as 2D arrays.
+    Each row is right-aligned (its bars packed against the last column,
+    padding in front), so column -1 is every symbol's latest bar and a
+    symbol's values match `compute_indicators` on its own bars.
+    """
+
+    def __init__(
+        self,
+        symbols,
+        timestamp: np.ndarray,
+        close: np.ndarray,
+        counts: np.ndarray,
+        values: Dict[str, np.ndarray],
+        tuned: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+    ):
+        self.symbols = list(symbols)
+        self.timestamp = timestamp
+        self.close = close
+        self.counts = counts
+        self.values = values
+        self.tuned = tuned or {}
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        row = self._rows.get(symbol)
+        return row is not None and self.counts[row] > 0
+
+    def bars(self, symbol: str) -> int:
+        row = self._rows.get(symbol)
+        return 0 if row is None else int(self.counts[row])
+
+    def latest(self, symbol: str) -> Optional[Dict]:
+        """The `calculate_all_indicators` summary for one symbol's last bar."""
+        if symbol not in self:
+            return None
+        row = self._rows[symbol]
+        summary = summarize(
+            {name: values[row, -1] for name, values in self.values.items()},
+            float(self.close[row, -1]),
+            int(self.counts[row])
+        )
+        if self.tuned:
+            summary['tuned'] = tuned_at(self.tuned, (row, -1))
+        return summary
+
+    def series(self, symbol: str) -> Optional[IndicatorSeries]:
+        """Full series for one symbol, without the padding."""
+        if symbol not in self:
+            return None
+        row, count = self._rows[symbol], int(self.counts[self._rows[symbol]])
+        return IndicatorSeries(
+            self.timestamp[row, -count:],
+            self.close[row, -count:],
+            {name: values[row, -count:] for name, values in self.values.items()},
+            {key: {part: values[row, -count:] for part, values in series.items()} for key, series in self.tuned.items()}
+        )
+
+
+def compute_panel_indicators(panel, requirements: Iterable[tuple] = ()) -> PanelIndicators:
+    """
+    Compute every indicator (and any extra `requirements`) for all symbols
+    of `panel` at once, vectorised along the time axis. Bars a symbol lacks
+    (NaN close) are dropped, so gaps behave as they would in that symbol's
+    own series.
+    """
+    valid = ~np.isnan(panel.close)
+    counts = valid.sum(axis=1)
+    width = int(counts.max()) if len(counts) else 0
+    rows, cols = np.nonzero(valid)
+    # Right-align: a row's k-th valid bar goes to column width - count + k
+    dest = (width - counts)[rows] + (np.cumsum(valid, axis=1) - 1)[rows, cols]
+
+    def packed(source, fill=np.nan, dtype=np.float64):
+        out = np.full((len(counts), width), fill, dtype=dtype)
+        out[rows, dest] = source[rows, cols]
+        return out
+
+    timestamp = packed(np.broadcast_to(panel.timestamps, panel.close.shape), fill=0, dtype=np.int64)
+    close = packed(panel.close)
+    volume = packed(np.nan_to_num(panel.volume))
+    if width == 0:
+        values, tuned = {}, {}
+    else:
+        high, low = packed(panel.high), packed(panel.low)
+        values = _compute(timestamp, high, low, close, volume)
+        tuned = compute_requirements(high, low, close, set(requirements) - BASE_REQUIREMENTS)
+    return PanelIndicators(panel.symbols, timestamp, close, counts, values, tuned)
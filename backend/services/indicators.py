@@ -1,16 +1,43 @@
 """
 Technical indicators calculation service.
-Implements RSI, MACD, EMA, SMA, Bollinger Bands, VWAP, ATR, and volume analysis.
+Implements RSI, MACD, EMA, SMA, Bollinger Bands, VWAP, ATR, and volume analysis;
+`calculate_all_indicators` also reports ADX, Stochastic, SuperTrend, OBV and
+Donchian channels.
+All values come from the NumPy kernels in `indicator_engine`; pandas_ta is
+only an optional dependency the tests use to cross-check them.
 """
+import copy
 import pandas as pd
-import pandas_ta as ta
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, Hashable, Iterable, List, Optional, Union
 import logging
 
+from config import settings
+from services.cache import LRUCache
+from services.market_status import IST
+from services.ohlcv import OHLCVBars
+from services import indicator_engine as kernels
+from services.indicator_engine import BASE_REQUIREMENTS, compute_indicators, requirement_key
+
 logger = logging.getLogger(__name__)
 
 
+def _last(values: np.ndarray) -> Optional[float]:
+    """Last value of a kernel result, or None while it is undefined."""
+    if len(values) == 0 or np.isnan(values[-1]):
+        return None
+    return round(float(values[-1]), 2)
+
+
+def _index_ns(index: pd.Index) -> Optional[np.ndarray]:
+    """UTC nanosecond timestamps of a DatetimeIndex (naive times are IST)."""
+    if not isinstance(index, pd.DatetimeIndex):
+        return None
+    if index.tz is None:
+        index = index.tz_localize(IST)
+    return index.as_unit('ns').asi8
+
+
 def calculate_rsi(prices: pd.Series, period: int = 14) -> float:
     """
     Calculate Relative Strength Index.
@@ -23,8 +50,9 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> float:
         Current RSI value (0-100)
     """
     try:
-        rsi = ta.rsi(prices, length=period)
-        return round(rsi.iloc[-1], 2) if not pd.isna(rsi.iloc[-1]) else 50.0
+        closes = np.asarray(prices, dtype=np.float64)
+        rsi = _last(kernels.rsi(closes - kernels.shift(closes), period))
+        return rsi if rsi is not None else 50.0
     except:
         return 50.0
 
@@ -37,14 +65,15 @@ def calculate_macd(prices: pd.Series) -> Dict[str, float]:
         Dict with 'value', 'signal', and 'histogram'
     """
     try:
-        macd = ta.macd(prices, fast=12, slow=26, signal=9)
-        if macd is None or macd.empty:
+        closes = np.asarray(prices, dtype=np.float64)
+        if len(closes) < 26:
             return {'value': 0.0, 'signal': 0.0, 'histogram': 0.0}
         
+        line, signal, histogram = kernels.macd(closes, fast=12, slow=26, signal=9)
         return {
-            'value': round(macd['MACD_12_26_9'].iloc[-1], 2),
-            'signal': round(macd['MACDs_12_26_9'].iloc[-1], 2),
-            'histogram': round(macd['MACDh_12_26_9'].iloc[-1], 2)
+            'value': round(float(line[-1]), 2),
+            'signal': round(float(signal[-1]), 2),
+            'histogram': round(float(histogram[-1]), 2)
         }
     except:
         return {'value': 0.0, 'signal': 0.0, 'histogram': 0.0}
@@ -62,8 +91,8 @@ def calculate_ema(prices: pd.Series, period: int) -> float:
         Current EMA value
     """
     try:
-        ema = ta.ema(prices, length=period)
-        return round(ema.iloc[-1], 2) if not pd.isna(ema.iloc[-1]) else prices.iloc[-1]
+        ema = _last(kernels.ema(np.asarray(prices, dtype=np.float64), period))
+        return ema if ema is not None else prices.iloc[-1]
     except:
         return prices.iloc[-1]
 
@@ -80,8 +109,8 @@ def calculate_sma(prices: pd.Series, period: int) -> float:
         Current SMA value
     """
     try:
-        sma = ta.sma(prices, length=period)
-        return round(sma.iloc[-1], 2) if not pd.isna(sma.iloc[-1]) else prices.iloc[-1]
+        sma = _last(kernels.sma(np.asarray(prices, dtype=np.float64), period))
+        return sma if sma is not None else prices.iloc[-1]
     except:
         return prices.iloc[-1]
 
@@ -94,15 +123,18 @@ def calculate_bollinger_bands(prices: pd.Series, period: int = 20, std_dev: int
         Dict with 'upper', 'middle', 'lower'
     """
     try:
-        bbands = ta.bbands(prices, length=period, std=std_dev)
-        if bbands is None or bbands.empty:
+        closes = np.asarray(prices, dtype=np.float64)
+        if len(closes) < period:
             current_price = prices.iloc[-1]
             return {'upper': current_price, 'middle': current_price, 'lower': current_price}
         
+        window_sum = kernels.rolling_sum(closes, period)
+        middle = window_sum / period
+        width = std_dev * kernels.rolling_std(closes, period, window_sum)
         return {
-            'upper': round(bbands[f'BBU_{period}_{std_dev}.0'].iloc[-1], 2),
-            'middle': round(bbands[f'BBM_{period}_{std_dev}.0'].iloc[-1], 2),
-            'lower': round(bbands[f'BBL_{period}_{std_dev}.0'].iloc[-1], 2)
+            'upper': round(float(middle[-1] + width[-1]), 2),
+            'middle': round(float(middle[-1]), 2),
+            'lower': round(float(middle[-1] - width[-1]), 2)
         }
     except:
         current_price = prices.iloc[-1]
@@ -120,8 +152,12 @@ def calculate_vwap(df: pd.DataFrame) -> float:
         Current VWAP value
     """
     try:
-        vwap = ta.vwap(df['high'], df['low'], df['close'], df['volume'])
-        return round(vwap.iloc[-1], 2) if not pd.isna(vwap.iloc[-1]) else df['close'].iloc[-1]
+        timestamps = _index_ns(df.index)
+        if timestamps is None:
+            return df['close'].iloc[-1]
+        high, low, close = (np.asarray(df[col], dtype=np.float64) for col in ('high', 'low', 'close'))
+        vwap = _last(kernels.vwap((high + low + close) / 3.0, np.asarray(df['volume'], dtype=np.float64), timestamps))
+        return vwap if vwap is not None else df['close'].iloc[-1]
     except:
         return df['close'].iloc[-1]
 
@@ -138,8 +174,9 @@ def calculate_atr(df: pd.DataFrame, period: int = 14) -> float:
         Current ATR value
     """
     try:
-        atr = ta.atr(df['high'], df['low'], df['close'], length=period)
-        return round(atr.iloc[-1], 2) if not pd.isna(atr.iloc[-1]) else 0.0
+        high, low, close = (np.asarray(df[col], dtype=np.float64) for col in ('high', 'low', 'close'))
+        atr = _last(kernels.rma(kernels.true_range(high, low, close), period))
+        return atr if atr is not None else 0.0
     except:
         return 0.0
 
@@ -184,49 +221,87 @@ def convert_to_native(data):
     return data
 
 
-def calculate_all_indicators(ohlcv_data: List[Dict]) -> Optional[Dict]:
+# Parameter set of calculate_all_indicators; part of every memo key
+INDICATOR_PARAMS = (
+    'rsi14', 'macd12/26/9', 'ema20', 'ema50', 'sma200', 'bb20x2', 'vwapD', 'atr14', 'vol20x1.5',
+    'adx14', 'stoch14/3/3', 'supertrend7x3', 'obv', 'donchian20',
+)
+
+# Indicator summaries keyed by symbol and the bars they were computed from
+indicator_cache = LRUCache(maxsize=settings.indicator_cache_size)
+
+
+def indicator_params(requirements: Iterable[tuple] = ()) -> Hashable:
+    """The standard parameter set plus any extra (tuned) requirements."""
+    extra = set(requirements) - BASE_REQUIREMENTS
+    return INDICATOR_PARAMS + tuple(sorted(requirement_key(r) for r in extra))
+
+
+def indicator_cache_key(
+    symbol: str,
+    bars: OHLCVBars,
+    timeframe: str = '1d',
+    exchange: str = 'NSE',
+    params: Hashable = INDICATOR_PARAMS
+) -> tuple:
+    """
+    Memo key for `calculate_all_indicators`. Besides the last bar's timestamp
+    it holds the window (first timestamp, bar count) and the last bar's
+    close and volume, so a still-forming bar that moved is recomputed.
+    `params` comes from `indicator_params` when tuned requirements apply.
+    """
+    return (
+        symbol, exchange, timeframe, params,
+        int(bars.timestamp[0]), int(bars.timestamp[-1]), len(bars),
+        float(bars.close[-1]), int(bars.volume[-1])
+    )
+
+
+def remember_indicators(key: tuple, indicators: Dict) -> None:
+    """Store a summary computed elsewhere (e.g. the scanner's panel pass)."""
+    indicator_cache.put(key, copy.deepcopy(indicators))
+
+
+def calculate_all_indicators(
+    ohlcv_data: Union[OHLCVBars, List[Dict]],
+    symbol: Optional[str] = None,
+    timeframe: str = '1d',
+    exchange: str = 'NSE',
+    requirements: Iterable[tuple] = ()
+) -> Optional[Dict]:
     """
     Calculate all technical indicators from OHLCV data.
+    Accepts columnar bars (used as-is) or legacy list-of-dicts records.
+    Full series are available from `indicator_engine.compute_indicators`.
+    `requirements` (e.g. from `signal_generator.strategy_requirements`) adds
+    tuned indicators under ``indicators['tuned']``.
+    With a `symbol` the result is memoised per bar (see `indicator_cache_key`),
+    so repeated requests within a bar are served from `indicator_cache`.
     """
     try:
-        if not ohlcv_data or len(ohlcv_data) < 50:
+        if ohlcv_data is None or len(ohlcv_data) < 50:
             logger.warning("Insufficient data for indicators calculation")
             return None
         
-        # Convert to DataFrame
-        df = pd.DataFrame(ohlcv_data)
-        
-        # Ensure proper column names (lowercase)
-        df.columns = [col.lower() for col in df.columns]
-        
-        # FIX: Ensure numeric types for calculation
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # FIX: Ensure DatetimeIndex for indicators like VWAP
-        if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df.set_index('timestamp', inplace=True)
-            
-        # Get closing prices
-        closes = df['close']
-        
-        # Calculate all indicators
-        indicators = {
-            'rsi': calculate_rsi(closes),
-            'macd': calculate_macd(closes),
-            'ema20': calculate_ema(closes, 20),
-            'ema50': calculate_ema(closes, 50),
-            'sma200': calculate_sma(closes, 200) if len(closes) >= 200 else closes.iloc[-1],
-            'bollingerBands': calculate_bollinger_bands(closes),
-            'vwap': calculate_vwap(df),
-            'atr': calculate_atr(df),
-            'volumeSpike': detect_volume_spike(df['volume'])
-        }
+        bars = ohlcv_data if isinstance(ohlcv_data, OHLCVBars) else OHLCVBars.from_records(ohlcv_data)
+
+        requirements = set(requirements)
+        params = indicator_params(requirements)
+        key = indicator_cache_key(symbol, bars, timeframe, exchange, params) if symbol else None
+        if key is not None:
+            cached = indicator_cache.get(key)
+            if cached is not None:
+                # Copies, so callers can annotate their result freely
+                return copy.deepcopy(cached)
+
+        # One pass over the columns; the summary is the last bar of each series
+        indicators = compute_indicators(bars, requirements).latest()
         
         # FIX: Convert to native types for JSON serialization
-        return convert_to_native(indicators)
+        indicators = convert_to_native(indicators)
+        if key is not None:
+            remember_indicators(key, indicators)
+        return indicators
     except Exception as e:
         logger.error(f"Error calculating indicators: {e}")
         return None
@@ -242,8 +317,11 @@ def get_indicator_signals(indicators: Dict) -> List[str]:
     signals = []
     
     try:
-        rsi = indicators.get('rsi', 50)
-        macd = indicators.get('macd', {})
+        # Values are None where the history is too short to compute them
+        rsi = indicators.get('rsi')
+        if rsi is None:
+            rsi = 50
+        macd = indicators.get('macd') or {}
         bbands = indicators.get('bollingerBands', {})
         volume_spike = indicators.get('volumeSpike', False)
         
@@ -258,7 +336,7 @@ def get_indicator_signals(indicators: Dict) -> List[str]:
             signals.append("RSI approaching overbought")
         
         # MACD signals
-        if macd.get('histogram', 0) > 0:
+        if (macd.get('histogram') or 0) > 0:
             signals.append("MACD bullish (histogram positive)")
         else:
             signals.append("MACD bearish (histogram negative)")
@@ -0,0 +1,151 @@
+"""
+Memory-mapped, append-only intraday bar archive.
+
+One file per (exchange, symbol, timeframe) at
+``<root>/<EXCHANGE>/<SYMBOL>_<timeframe>.bars``: a 64-byte header followed
+by fixed-width 48-byte records (timestamp, open, high, low, close, volume)
+in timestamp order. The timestamp column of the mapped records doubles as
+the index: a date-range lookup is two binary searches, and the returned
+bars are views into the mapping, so only the touched pages are read.
+"""
+import os
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from services.ohlcv import OHLCVBars
+
+logger = logging.getLogger(__name__)
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+])
+HEADER_SIZE = 64
+MAGIC = b'OHLCVARC'
+VERSION = 1
+
+
+def _header() -> bytes:
+    header = MAGIC + np.array([VERSION, RECORD_DTYPE.itemsize], dtype='<u4').tobytes()
+    return header.ljust(HEADER_SIZE, b'\0')
+
+
+def _check_header(raw: bytes, path: str) -> None:
+    if raw[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not an OHLCV archive")
+    version, record_size = np.frombuffer(raw[len(MAGIC):len(MAGIC) + 8], dtype='<u4')
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: unsupported archive version {version} / record size {record_size}")
+
+
+def _bars_view(records: np.ndarray) -> OHLCVBars:
+    """OHLCVBars whose columns are strided views into `records` (no copy)."""
+    return OHLCVBars(*(records[col] for col in RECORD_DTYPE.names))
+
+
+class IntradayArchive:
+    """
+    Append-only archive of completed bars.
+    Readers share one read-only mapping per file, re-mapped when the file
+    has grown since it was mapped.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._maps: Dict[str, Tuple[int, np.memmap]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, symbol: str, timeframe: str = '1m', exchange: str = 'NSE') -> str:
+        return os.path.join(self.root, exchange.upper(), f"{symbol.upper()}_{timeframe}.bars")
+
+    def records(self, symbol: str, timeframe: str = '1m', exchange: str = 'NSE') -> Optional[np.ndarray]:
+        """All archived records as a read-only memory map, or None if none exist."""
+        path = self.path(symbol, timeframe, exchange)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        count = (size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count <= 0:
+            return None
+
+        with self._lock:
+            cached = self._maps.get(path)
+            if cached is not None and cached[0] == count:
+                return cached[1]
+            with open(path, 'rb') as fh:
+                _check_header(fh.read(HEADER_SIZE), path)
+            records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+            self._maps[path] = (count, records)
+            return records
+
+    def last_timestamp(self, symbol: str, timeframe: str = '1m', exchange: str = 'NSE') -> Optional[int]:
+        records = self.records(symbol, timeframe, exchange)
+        return None if records is None else int(records['timestamp'][-1])
+
+    def range(
+        self,
+        symbol: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        timeframe: str = '1m',
+        exchange: str = 'NSE',
+        lookback: int = 0
+    ) -> Optional[OHLCVBars]:
+        """
+        Bars with start <= timestamp <= end (UTC ns), as zero-copy views,
+        preceded by up to `lookback` earlier bars (e.g. indicator warm-up).
+        """
+        records = self.records(symbol, timeframe, exchange)
+        if records is None:
+            return None
+        ts = records['timestamp']
+        lo = 0 if start is None else max(int(np.searchsorted(ts, start, side='left')) - lookback, 0)
+        hi = len(records) if end is None else int(np.searchsorted(ts, end, side='right'))
+        return _bars_view(records[lo:hi])
+
+    def append(self, symbol: str, bars: OHLCVBars, timeframe: str = '1m', exchange: str = 'NSE') -> int:
+        """
+        Append bars newer than the last archived one; older or duplicate bars
+        are skipped since the archive never rewrites records. Returns the
+        number of bars written.
+        """
+        if len(bars) == 0:
+            return 0
+        path = self.path(symbol, timeframe, exchange)
+        with self._lock:
+            last = None
+            if os.path.exists(path) and os.path.getsize(path) > HEADER_SIZE:
+                with open(path, 'rb') as fh:
+                    _check_header(fh.read(HEADER_SIZE), path)
+                    fh.seek(-RECORD_DTYPE.itemsize, os.SEEK_END)
+                    last = int(np.frombuffer(fh.read(RECORD_DTYPE.itemsize), dtype=RECORD_DTYPE)['timestamp'][0])
+
+            ts = bars.timestamp
+            if not np.all(ts[1:] > ts[:-1]):
+                raise ValueError("bars must be strictly increasing in timestamp")
+            keep = ts > last if last is not None else np.ones(len(ts), dtype=bool)
+
+            records = np.empty(int(keep.sum()), dtype=RECORD_DTYPE)
+            for col in RECORD_DTYPE.names:
+                records[col] = getattr(bars, col)[keep]
+            if len(records) == 0:
+                return 0
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            new_file = not os.path.exists(path)
+            with open(path, 'ab') as fh:
+                if new_file or fh.tell() == 0:
+                    fh.write(_header())
+                fh.write(records.tobytes())
+            return len(records)
+
+    def stats(self) -> Dict[str, int]:
+        return {'mapped_files': len(self._maps)}
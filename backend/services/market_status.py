@@ -2,7 +2,7 @@
 Market status and trading hours management for NSE/BSE.
 Handles IST timezone, market hours (9:15 AM - 3:30 PM), and holidays.
 """
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from typing import Dict
 import pytz
 
@@ -81,6 +81,16 @@ def is_trading_day(date: datetime = None) -> bool:
     return not is_holiday(date)
 
 
+def last_market_close(now: datetime = None) -> datetime:
+    """The most recent session close (3:30 PM IST of a trading day) at or before `now`."""
+    if now is None:
+        now = get_current_ist_time()
+    day = now if now.time() >= MARKET_CLOSE_TIME else now - timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return IST.localize(datetime.combine(day.date(), MARKET_CLOSE_TIME))
+
+
 def get_market_session() -> str:
     """
     Get current market session.
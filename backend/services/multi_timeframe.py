@@ -0,0 +1,167 @@
+"""
+Multi-timeframe indicators.
+Fetches a symbol's finest requested timeframe once and derives the coarser
+ones with the local resampler, so an indicator bundle for e.g. 15m, 1h and
+1d costs one provider call instead of one per timeframe. The coarser
+summaries are attached under ``indicators['mtf']``, where `SignalGenerator`
+reads them for higher-timeframe confirmation. `attach_confirmations` does
+that for the timeframe a strategy config confirms against, and
+`higher_timeframe_trend` gives backtests the same check at every bar.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.data_provider import INTERVAL_LOOKBACK, PERIOD_DELTAS
+from services.indicator_engine import ema
+from services.indicators import calculate_all_indicators
+from services.ohlcv import OHLCVBars
+from services.quote_stream import get_live_ohlcv
+from services.resampler import NS_PER_MINUTE, TIMEFRAME_MINUTES, resample
+from services.signal_batch import BUY, HOLD, NO_TREND, SELL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEFRAMES = ('15m', '1h', '1d')
+
+# Bars calculate_all_indicators needs before it returns a summary
+MIN_BARS = 50
+
+# History fetched to summarise a timeframe on its own: comfortably over
+# MIN_BARS, within what the provider serves at that interval
+TIMEFRAME_PERIODS = {'1m': '5d', '5m': '1mo', '15m': '1mo', '1h': '3mo', '1d': '6mo'}
+
+
+def order_timeframes(timeframes: Iterable[str]) -> List[str]:
+    """Distinct timeframes, finest first; raises ValueError for unknown ones."""
+    unknown = [tf for tf in timeframes if tf not in TIMEFRAME_MINUTES]
+    if unknown:
+        raise ValueError(f"Unsupported timeframes: {', '.join(unknown)}")
+    return sorted(set(timeframes), key=TIMEFRAME_MINUTES.get)
+
+
+def fetch_period(timeframe: str, period: str) -> str:
+    """`period`, or `TIMEFRAME_PERIODS[timeframe]` when the provider does not serve that much."""
+    limit = INTERVAL_LOOKBACK.get(timeframe)
+    delta = PERIOD_DELTAS.get(period)
+    if limit is not None and (delta is None or delta > limit):
+        return TIMEFRAME_PERIODS[timeframe]
+    return period
+
+
+def derive_timeframes(bars: OHLCVBars, base: str, timeframes: Iterable[str]) -> Dict[str, OHLCVBars]:
+    """
+    Bars for each of `timeframes` resampled from `base`-timeframe `bars`.
+    The leading bucket of a derived series is dropped, since the fetched
+    window usually starts partway through it.
+    """
+    derived = {}
+    for timeframe in timeframes:
+        if timeframe == base:
+            derived[timeframe] = bars
+            continue
+        resampled = resample(bars, timeframe)
+        derived[timeframe] = resampled.slice(int(resampled.timestamp[1]), None) if len(resampled) > 1 else resampled
+    return derived
+
+
+def get_multi_timeframe_indicators(
+    symbol: str,
+    timeframes: Iterable[str] = DEFAULT_TIMEFRAMES,
+    exchange: str = 'NSE',
+    period: str = '3mo',
+    requirements: Iterable[tuple] = ()
+) -> Tuple[Optional[Dict], Dict[str, str]]:
+    """
+    Indicators of the finest of `timeframes`, with every coarser timeframe's
+    summary under ``['mtf'][timeframe]`` (None when unavailable).
+    Coarser timeframes are resampled from the one fetch of the finest; one
+    whose derived history is too short for the indicators (e.g. 1d from
+    60 days of 15m bars) is fetched on its own instead.
+    Returns the indicators and how each timeframe was sourced
+    ('fetched' or 'resampled'). Only provider bars are used: without them
+    there are no indicators, rather than indicators of mock bars.
+    """
+    ordered = order_timeframes(timeframes)
+    base = ordered[0]
+    bars = get_live_ohlcv(symbol, base, fetch_period(base, period), exchange, mock_fallback=False)
+    if bars is None or len(bars) == 0:
+        return None, {}
+
+    sources = {}
+    summaries = {}
+    for timeframe, derived in derive_timeframes(bars, base, ordered).items():
+        source = 'fetched' if timeframe == base else 'resampled'
+        if len(derived) < MIN_BARS and timeframe != base:
+            logger.info(f"{len(derived)} {timeframe} bars derived for {symbol}; fetching {timeframe} directly")
+            longest = max(period, TIMEFRAME_PERIODS[timeframe], key=lambda p: PERIOD_DELTAS.get(p, PERIOD_DELTAS['1d']))
+            derived = get_live_ohlcv(symbol, timeframe, fetch_period(timeframe, longest), exchange, mock_fallback=False)
+            source = 'fetched'
+        sources[timeframe] = source
+        summaries[timeframe] = calculate_all_indicators(derived, symbol, timeframe, exchange, requirements) if derived else None
+
+    indicators = summaries.pop(base)
+    if indicators is None:
+        return None, sources
+    indicators['mtf'] = summaries
+    return indicators, sources
+
+
+def confirm_timeframe(config: Optional[Dict], strategy: str = 'combined') -> Optional[str]:
+    """The `confirm_timeframe` set in `strategy`'s parameters, if a supported one."""
+    timeframe = ((config or {}).get(strategy) or {}).get('confirm_timeframe')
+    if timeframe and timeframe not in TIMEFRAME_MINUTES:
+        logger.warning(f"Ignoring unsupported confirm_timeframe {timeframe!r} for {strategy}")
+        return None
+    return timeframe
+
+
+def attach_confirmations(
+    indicators: Dict,
+    symbol: str,
+    timeframe: str,
+    config: Optional[Dict],
+    strategy: str = 'combined',
+    exchange: str = 'NSE'
+) -> Dict:
+    """
+    Add the summary `strategy` confirms against to ``indicators['mtf']``.
+    `indicators` (of `timeframe`) serve their own timeframe; another one
+    is fetched through `get_multi_timeframe_indicators`.
+    """
+    wanted = confirm_timeframe(config, strategy)
+    mtf = indicators.get('mtf') or {}
+    if not wanted or mtf.get(wanted):
+        return indicators
+    if wanted == timeframe:
+        summary = {k: v for k, v in indicators.items() if k != 'mtf'}
+    else:
+        summary, _ = get_multi_timeframe_indicators(symbol, [wanted], exchange, TIMEFRAME_PERIODS[wanted])
+        if summary is not None:
+            summary.pop('mtf', None)
+    indicators['mtf'] = {**mtf, wanted: summary}
+    return indicators
+
+
+def higher_timeframe_trend(bars: OHLCVBars, timeframe: str, higher: OHLCVBars, higher_timeframe: str) -> np.ndarray:
+    """
+    Trend code (BUY/SELL/HOLD from the rounded EMA20/50, as
+    `SignalGenerator._confirm_higher_timeframe` reads it) at every bar of
+    `bars`, taken from the last `higher` bar completed by that bar's end,
+    so a backtest never looks ahead. NO_TREND until `higher` has MIN_BARS.
+    """
+    trend = np.full(len(bars), NO_TREND, dtype=np.int64)
+    if len(higher) < MIN_BARS or len(bars) == 0:
+        return trend
+
+    def rounded(values):
+        return np.array([round(v, 2) for v in values.tolist()], dtype=np.float64)
+
+    ema20, ema50 = rounded(ema(higher.close, 20)), rounded(ema(higher.close, 50))
+    codes = np.select([ema20 > ema50, ema20 < ema50], [BUY, SELL], HOLD)
+    codes[:MIN_BARS - 1] = NO_TREND
+
+    ends = higher.timestamp + TIMEFRAME_MINUTES[higher_timeframe] * NS_PER_MINUTE
+    seen = np.searchsorted(ends, bars.timestamp + TIMEFRAME_MINUTES[timeframe] * NS_PER_MINUTE, side='right') - 1
+    return np.where(seen >= 0, codes[np.maximum(seen, 0)], NO_TREND)
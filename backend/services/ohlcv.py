@@ -0,0 +1,230 @@
+"""
+In-memory OHLCV containers shared by the data provider, scanner and routes.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.market_status import IST
+
+OHLCV_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+def columns_to_records(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Convert OHLCV columns into the list-of-dicts shape returned by the API."""
+    index = pd.to_datetime(columns['timestamp'], unit='ns', utc=True).tz_convert(IST)
+    return [
+        {
+            'timestamp': ts.isoformat(),
+            'open': round(o, 2),
+            'high': round(h, 2),
+            'low': round(l, 2),
+            'close': round(c, 2),
+            'volume': int(v)
+        }
+        for ts, o, h, l, c, v in zip(
+            index,
+            columns['open'].tolist(),
+            columns['high'].tolist(),
+            columns['low'].tolist(),
+            columns['close'].tolist(),
+            columns['volume'].tolist()
+        )
+    ]
+
+
+class OHLCVBars:
+    """
+    Columnar OHLCV series for one symbol.
+    Timestamps are int64 UTC nanoseconds, prices float64 and volume int64.
+    This is what the data provider returns and what indicators and the
+    backtest consume; records are only built at the JSON edge.
+    """
+
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray
+    ):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.int64)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> 'OHLCVBars':
+        return cls(*(columns[col] for col in OHLCV_COLUMNS))
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'OHLCVBars':
+        """Build bars from API-shaped records (ISO or datetime timestamps; 'date' is accepted too)."""
+        if not records:
+            return cls.empty()
+        key = 'timestamp' if 'timestamp' in records[0] else 'date'
+        index = pd.DatetimeIndex(pd.to_datetime([r[key] for r in records]))
+        if index.tz is None:
+            index = index.tz_localize(IST)
+        return cls(
+            index.as_unit('ns').asi8,
+            *(np.array([r[col] for r in records], dtype=np.float64) for col in OHLCV_COLUMNS[1:])
+        )
+
+    @classmethod
+    def empty(cls) -> 'OHLCVBars':
+        return cls(*(np.empty(0) for _ in OHLCV_COLUMNS))
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The arrays as a column dict (no copy), e.g. for the OHLCV store."""
+        return {col: getattr(self, col) for col in OHLCV_COLUMNS}
+
+    def slice(self, start: Optional[int] = None, stop: Optional[int] = None) -> 'OHLCVBars':
+        """Bars with start <= timestamp <= stop (UTC ns); views, not copies."""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamp, start, side='left'))
+        hi = len(self) if stop is None else int(np.searchsorted(self.timestamp, stop, side='right'))
+        return OHLCVBars(*(getattr(self, col)[lo:hi] for col in OHLCV_COLUMNS))
+
+    def tail(self, n: int) -> 'OHLCVBars':
+        return OHLCVBars(*(getattr(self, col)[-n:] if n else getattr(self, col)[:0] for col in OHLCV_COLUMNS))
+
+    def index(self) -> pd.DatetimeIndex:
+        """Timestamps as an IST DatetimeIndex."""
+        return pd.to_datetime(self.timestamp, unit='ns', utc=True).tz_convert(IST)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view with an IST DatetimeIndex, for pandas-based indicators."""
+        return pd.DataFrame(
+            {col: getattr(self, col) for col in OHLCV_COLUMNS[1:]},
+            index=self.index(),
+            copy=False
+        )
+
+    def to_records(self) -> List[Dict]:
+        """The list-of-dicts shape returned by the API."""
+        return columns_to_records(self.columns())
+
+
+class OHLCVPanel:
+    """
+    Aligned multi-symbol OHLCV data.
+    Price/volume arrays are 2D (symbols x timestamps); a symbol without a bar
+    at a given timestamp holds NaN there.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        timestamps: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        exchange: str = 'NSE'
+    ):
+        self.symbols = list(symbols)
+        self.timestamps = timestamps
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.exchange = exchange
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_series(cls, series: Dict[str, Dict[str, np.ndarray]], exchange: str = 'NSE') -> 'OHLCVPanel':
+        """Align per-symbol OHLCV columns on the union of their timestamps."""
+        symbols = [s for s, cols in series.items() if cols is not None and len(cols['timestamp'])]
+        if symbols:
+            timestamps = np.unique(np.concatenate([series[s]['timestamp'] for s in symbols]))
+        else:
+            timestamps = np.empty(0, dtype=np.int64)
+
+        shape = (len(symbols), len(timestamps))
+        arrays = {col: np.full(shape, np.nan) for col in OHLCV_COLUMNS[1:]}
+        for row, symbol in enumerate(symbols):
+            cols = series[symbol]
+            positions = np.searchsorted(timestamps, cols['timestamp'])
+            for col in OHLCV_COLUMNS[1:]:
+                arrays[col][row, positions] = cols[col]
+
+        return cls(symbols, timestamps, exchange=exchange, **arrays)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def columns(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """OHLCV columns for one symbol, with the padding bars dropped."""
+        row = self._rows.get(symbol)
+        if row is None:
+            return None
+        valid = ~np.isnan(self.close[row])
+        return {
+            'timestamp': self.timestamps[valid],
+            'open': self.open[row, valid],
+            'high': self.high[row, valid],
+            'low': self.low[row, valid],
+            'close': self.close[row, valid],
+            'volume': np.nan_to_num(self.volume[row, valid]).astype(np.int64),
+        }
+
+    def ohlcv(self, symbol: str) -> Optional[OHLCVBars]:
+        """Bars for one symbol, in the `get_ohlcv_data` shape."""
+        cols = self.columns(symbol)
+        if cols is None or len(cols['timestamp']) == 0:
+            return None
+        return OHLCVBars.from_columns(cols)
+
+    def quote(self, symbol: str) -> Optional[Dict]:
+        """
+        Last quote for one symbol derived from its latest bars,
+        in the `get_stock_info` shape.
+        """
+        cols = self.columns(symbol)
+        if cols is None or len(cols['close']) == 0:
+            return None
+
+        closes = cols['close']
+        current_price = float(closes[-1])
+        previous_close = float(closes[-2]) if len(closes) > 1 else current_price
+        change = current_price - previous_close
+        change_percent = (change / previous_close * 100) if previous_close else 0
+
+        return {
+            'symbol': symbol,
+            'name': symbol,
+            'exchange': self.exchange,
+            'sector': 'Unknown',
+            'currentPrice': round(current_price, 2),
+            'change': round(change, 2),
+            'changePercent': round(change_percent, 2),
+            'volume': int(cols['volume'][-1]),
+            'volumeReported': True,
+            'avgVolume': int(cols['volume'].mean()),
+            'marketCap': 0,
+            'previousClose': round(previous_close, 2)
+        }
+
+    def quotes(self) -> Dict[str, Dict]:
+        """Last quotes for every symbol in the panel."""
+        result = {}
+        for symbol in self.symbols:
+            quote = self.quote(symbol)
+            if quote:
+                result[symbol] = quote
+        return result
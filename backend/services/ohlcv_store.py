@@ -0,0 +1,157 @@
+"""
+Persistent on-disk OHLCV store.
+Keeps one columnar file per (exchange, symbol, timeframe) so that repeated
+fetches only need to ask the provider for bars newer than the last stored one.
+"""
+import os
+import threading
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Column layout of every stored series. Timestamps are UTC epoch nanoseconds.
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+COLUMN_DTYPES = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.int64,
+}
+
+
+def frame_to_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Convert a yfinance history DataFrame into store columns.
+    Rows with missing prices are dropped.
+    """
+    df = df.dropna(subset=['Open', 'High', 'Low', 'Close'])
+    index = df.index
+    if index.tz is None:
+        index = index.tz_localize('Asia/Kolkata')
+    return {
+        'timestamp': index.tz_convert('UTC').as_unit('ns').asi8.astype(np.int64),
+        'open': df['Open'].to_numpy(dtype=np.float64),
+        'high': df['High'].to_numpy(dtype=np.float64),
+        'low': df['Low'].to_numpy(dtype=np.float64),
+        'close': df['Close'].to_numpy(dtype=np.float64),
+        'volume': df['Volume'].fillna(0).to_numpy(dtype=np.int64),
+    }
+
+
+class OHLCVStore:
+    """
+    Columnar OHLCV store backed by one .npz file per series.
+
+    Each file holds the six OHLCV columns plus ``covered_from``: the earliest
+    timestamp the provider was asked for, so a later request for a longer
+    period can tell whether the store actually covers it.
+    Recently used series are also kept in memory, so hot series are served
+    without touching the disk.
+    """
+
+    def __init__(self, root: str, cache_size: int = 256):
+        self.root = root
+        self._hot = LRUCache(cache_size)
+        self._locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._locks_guard = threading.Lock()
+
+    def _path(self, symbol: str, timeframe: str, exchange: str) -> str:
+        return os.path.join(self.root, exchange.upper(), f"{symbol.upper()}_{timeframe}.npz")
+
+    def _lock(self, path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks[path]
+
+    def load(self, symbol: str, timeframe: str, exchange: str = 'NSE') -> Optional[Dict[str, np.ndarray]]:
+        """Load a stored series, or None if nothing is stored yet."""
+        path = self._path(symbol, timeframe, exchange)
+        columns = self._hot.get(path)
+        if columns is not None:
+            return columns
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                columns = {col: data[col] for col in COLUMNS}
+                columns['covered_from'] = int(data['covered_from'])
+            self._hot.put(path, columns)
+            return columns
+        except Exception as e:
+            logger.warning(f"Corrupt OHLCV store file {path}, ignoring: {e}")
+            return None
+
+    def save(self, symbol: str, timeframe: str, exchange: str, columns: Dict[str, np.ndarray]) -> None:
+        """Atomically write a series (temp file + rename)."""
+        path = self._path(symbol, timeframe, exchange)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        arrays = {col: np.asarray(columns[col], dtype=COLUMN_DTYPES[col]) for col in COLUMNS}
+        arrays['covered_from'] = np.int64(columns['covered_from'])
+        with open(tmp_path, 'wb') as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp_path, path)
+        self._hot.put(path, {**arrays, 'covered_from': int(columns['covered_from'])})
+
+    def merge(
+        self,
+        symbol: str,
+        timeframe: str,
+        exchange: str,
+        new_columns: Dict[str, np.ndarray],
+        covered_from: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Upsert freshly fetched bars into the stored series and persist it.
+        Bars with an existing timestamp are replaced by the new values, so a
+        still-forming last bar gets refreshed on every top-up.
+        """
+        path = self._path(symbol, timeframe, exchange)
+        with self._lock(path):
+            stored = self.load(symbol, timeframe, exchange)
+            if stored is None:
+                merged = {col: np.asarray(new_columns[col], dtype=COLUMN_DTYPES[col]) for col in COLUMNS}
+                merged_from = covered_from
+            else:
+                merged = {
+                    col: np.concatenate([stored[col], np.asarray(new_columns[col], dtype=COLUMN_DTYPES[col])])
+                    for col in COLUMNS
+                }
+                merged_from = stored['covered_from']
+                if covered_from is not None:
+                    merged_from = min(merged_from, covered_from)
+
+            # Stable sort keeps stored rows ahead of new ones for equal timestamps,
+            # then keep the last row of each timestamp run (the newest fetch).
+            order = np.argsort(merged['timestamp'], kind='stable')
+            merged = {col: merged[col][order] for col in COLUMNS}
+            ts = merged['timestamp']
+            keep = np.ones(len(ts), dtype=bool)
+            if len(ts) > 1:
+                keep[:-1] = ts[1:] != ts[:-1]
+            merged = {col: merged[col][keep] for col in COLUMNS}
+
+            if merged_from is None:
+                merged_from = int(merged['timestamp'][0]) if len(merged['timestamp']) else 0
+            merged['covered_from'] = int(merged_from)
+
+            self.save(symbol, timeframe, exchange, merged)
+            return merged
+
+    def last_timestamp(self, symbol: str, timeframe: str, exchange: str = 'NSE') -> Optional[int]:
+        """Timestamp (UTC ns) of the newest stored bar."""
+        stored = self.load(symbol, timeframe, exchange)
+        if stored is None or len(stored['timestamp']) == 0:
+            return None
+        return int(stored['timestamp'][-1])
+
+    def stats(self) -> Dict[str, int]:
+        return self._hot.stats()
@@ -0,0 +1,364 @@
+"""
+Live quote ingestion.
+A quote source (the Google scraper polled in a loop, or a replay feed of
+stored 1m bars standing in for it) produces ticks, and `BarAggregator`
+folds them into 1m bars per symbol in memory. Completed bars are merged
+into the OHLCV store and the intraday archive; the still-forming bar is
+kept in memory and appended by `get_live_ohlcv`, so intraday indicators
+and signals follow every tick without downloading history again. Each
+streamed symbol also keeps an incremental indicator state that advances
+by one completed bar at a time.
+
+A tick is a ``(symbol, timestamp_ns, price, cumulative_volume)`` tuple.
+Volume is the session total reported by the quote; a bar's volume is the
+increase seen while it was forming. Sources that report no volume (the
+Google quote page) tick with None, and their bars keep a None volume:
+those bars are never written to the store or the archive, whose provider
+bars carry the real volume for the same minutes.
+"""
+import asyncio
+import time
+import logging
+from itertools import groupby
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from services import data_provider
+from services.market_status import is_market_open
+from services.ohlcv import OHLCV_COLUMNS, OHLCVBars
+from services.incremental_indicators import NAN, IndicatorState, load_states, save_states
+from services.resampler import NS_PER_MINUTE, RESAMPLED_TIMEFRAMES, bucket_starts, resample
+from services.rate_limiter import request_priority, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+Tick = Tuple[str, int, float, Optional[float]]
+
+STREAM_TIMEFRAME = '1m'
+
+# Longest period the provider serves 1m bars for (see data_provider.MAX_1M_LOOKBACK)
+MAX_1M_PERIOD = '7d'
+
+
+class BarAggregator:
+    """Builds 1m bars per symbol from ticks; bars close when their minute has passed."""
+
+    def __init__(self):
+        self._forming: Dict[str, Dict[str, Any]] = {}
+        self._last_volume: Dict[str, float] = {}
+        self.ticks = 0
+        self.late_ticks = 0
+
+    def update(self, symbol: str, timestamp: int, price: float, volume: Optional[float] = None) -> Optional[Dict]:
+        """Apply one tick; returns the bar it completed, if any."""
+        start = int(bucket_starts(np.array([timestamp], dtype='int64'), STREAM_TIMEFRAME)[0])
+        bar = self._forming.get(symbol)
+        if bar is not None and start < bar['timestamp']:
+            # Ticks for a minute already closed cannot change stored bars
+            self.late_ticks += 1
+            return None
+        self.ticks += 1
+
+        traded = None
+        if volume is not None:
+            previous = self._last_volume.get(symbol)
+            # No baseline yet, or the session total reset (new day)
+            traded = 0 if previous is None else (volume - previous if volume >= previous else volume)
+            self._last_volume[symbol] = volume
+
+        completed = None
+        if bar is not None and start > bar['timestamp']:
+            completed = self._forming.pop(symbol)
+            bar = None
+        if bar is None:
+            self._forming[symbol] = {
+                'timestamp': start, 'open': price, 'high': price, 'low': price, 'close': price, 'volume': traded
+            }
+        else:
+            bar['high'] = max(bar['high'], price)
+            bar['low'] = min(bar['low'], price)
+            bar['close'] = price
+            if traded is not None:
+                bar['volume'] = (bar['volume'] or 0) + traded
+        return completed
+
+    def close_due(self, now_ns: int) -> List[Tuple[str, Dict]]:
+        """Close bars whose minute ended by `now_ns` (symbols that stopped ticking)."""
+        due = [s for s, bar in self._forming.items() if bar['timestamp'] + NS_PER_MINUTE <= now_ns]
+        return [(s, self._forming.pop(s)) for s in due]
+
+    def forming(self, symbol: str) -> Optional[Dict]:
+        bar = self._forming.get(symbol)
+        return dict(bar) if bar else None
+
+    def symbols(self) -> List[str]:
+        return list(self._forming)
+
+
+def _bars_columns(bars: List[Dict]) -> Dict[str, np.ndarray]:
+    """Column arrays of bars; an unknown volume counts as nothing traded (in memory only)."""
+    columns = {col: np.array([bar[col] for bar in bars]) for col in OHLCV_COLUMNS[:-1]}
+    columns['volume'] = np.array([bar['volume'] or 0 for bar in bars], dtype=np.int64)
+    return columns
+
+
+class PollingQuoteSource:
+    """Polls live quotes for `symbols` every `interval` seconds during market hours."""
+
+    def __init__(self, symbols: List[str], interval: float = 5.0, exchange: str = 'NSE'):
+        self.symbols = symbols
+        self.interval = interval
+        self.exchange = exchange
+
+    async def ticks(self) -> AsyncIterator[List[Tick]]:
+        from services.async_quotes import fetch_stock_info_async
+
+        while True:
+            if is_market_open():
+                with request_priority(PRIORITY_BACKGROUND):
+                    quotes = await asyncio.gather(
+                        *(fetch_stock_info_async(s, self.exchange) for s in self.symbols),
+                        return_exceptions=True
+                    )
+                now_ns = pd.Timestamp.now(tz='UTC').value
+                yield [
+                    (s, now_ns, float(q['currentPrice']), data_provider.reported_volume(q))
+                    for s, q in zip(self.symbols, quotes)
+                    if isinstance(q, dict) and q.get('currentPrice')
+                ]
+            await asyncio.sleep(self.interval)
+
+
+class ReplayQuoteSource:
+    """
+    Replays stored 1m bars as ticks (open, high, low, close within each
+    minute), one minute of every symbol per batch, pausing `pace` seconds
+    between batches. Stands in for the live feed offline.
+    """
+
+    def __init__(self, bars: Dict[str, OHLCVBars], pace: float = 0.0):
+        self.bars = bars
+        self.pace = pace
+
+    @classmethod
+    def from_replay(cls, provider, symbols: List[str], exchange: str = 'NSE', pace: float = 0.0) -> 'ReplayQuoteSource':
+        loaded = {s: provider.load(s, STREAM_TIMEFRAME, exchange) for s in symbols}
+        return cls({s: bars for s, bars in loaded.items() if bars is not None and len(bars)}, pace)
+
+    def batches(self) -> Iterable[List[Tick]]:
+        ticks = []
+        for symbol, bars in self.bars.items():
+            total = np.cumsum(bars.volume)
+            before = total - bars.volume
+            for offset, prices, volumes in (
+                (0, bars.open, before), (15, bars.high, before), (30, bars.low, before), (45, bars.close, total)
+            ):
+                stamps = bars.timestamp + offset * 10**9
+                ticks.extend(zip([symbol] * len(bars), stamps.tolist(), prices.tolist(), volumes.tolist()))
+        ticks.sort(key=lambda tick: tick[1])
+        for _, batch in groupby(ticks, key=lambda tick: tick[1] // NS_PER_MINUTE):
+            yield list(batch)
+
+    async def ticks(self) -> AsyncIterator[List[Tick]]:
+        for batch in self.batches():
+            yield batch
+            await asyncio.sleep(self.pace)
+
+
+class QuoteStream:
+    """Feeds ticks from a source through a `BarAggregator` into the OHLCV store."""
+
+    def __init__(self, source, exchange: str = 'NSE'):
+        self.source = source
+        self.exchange = exchange
+        self.aggregator = BarAggregator()
+        self.indicators: Dict[str, IndicatorState] = {}
+        self.bars_completed = 0
+        self.last_tick_at: Optional[float] = None
+
+    def ingest(self, ticks: List[Tick], now_ns: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        Apply a batch of ticks and persist the bars it completed.
+        `now_ns` defaults to the newest tick, so replayed feeds close bars on
+        their own clock. Returns the completed bars per symbol.
+        """
+        completed: Dict[str, List[Dict]] = {}
+        for symbol, timestamp, price, volume in ticks:
+            bar = self.aggregator.update(symbol, timestamp, price, volume)
+            if bar:
+                completed.setdefault(symbol, []).append(bar)
+        if ticks:
+            self.last_tick_at = time.time()
+            now_ns = now_ns if now_ns is not None else max(tick[1] for tick in ticks)
+        if now_ns is not None:
+            for symbol, bar in self.aggregator.close_due(now_ns):
+                completed.setdefault(symbol, []).append(bar)
+
+        for symbol, bars in completed.items():
+            self._persist(symbol, bars, now_ns)
+        return completed
+
+    def _persist(self, symbol: str, bars: List[Dict], now_ns: int) -> None:
+        """
+        Append completed bars with a known volume after the last stored one.
+        Stored bars are never replaced: at an equal timestamp the provider's
+        bar (with its real volume) wins over the streamed one.
+        """
+        try:
+            last = data_provider.ohlcv_store.last_timestamp(symbol, STREAM_TIMEFRAME, self.exchange) if settings.ohlcv_store_enabled else None
+            new = [bar for bar in bars if bar['volume'] is not None and (last is None or bar['timestamp'] > last)]
+            if new:
+                columns = _bars_columns(new)
+                if settings.ohlcv_store_enabled:
+                    data_provider.ohlcv_store.merge(symbol, STREAM_TIMEFRAME, self.exchange, columns)
+                data_provider._archive_completed(symbol, STREAM_TIMEFRAME, self.exchange, columns, now_ns)
+        except Exception as e:
+            logger.error(f"Failed to store streamed bars for {symbol}: {e}")
+        self.bars_completed += len(bars)
+        self._advance_indicators(symbol, bars)
+
+    def _advance_indicators(self, symbol: str, bars: List[Dict]) -> None:
+        """Feed completed bars to the symbol's indicator state, priming it from the store once."""
+        state = self.indicators.get(symbol)
+        if state is None:
+            stored = data_provider.ohlcv_store.load(symbol, STREAM_TIMEFRAME, self.exchange) if settings.ohlcv_store_enabled else None
+            state = IndicatorState.from_bars(OHLCVBars.from_columns(stored)) if stored else IndicatorState()
+            self.indicators[symbol] = state
+        for bar in bars:
+            if state.timestamp is None or bar['timestamp'] > state.timestamp:
+                volume = NAN if bar['volume'] is None else bar['volume']
+                state.update(bar['timestamp'], bar['open'], bar['high'], bar['low'], bar['close'], volume)
+
+    def latest_indicators(self, symbol: str) -> Optional[Dict]:
+        """Indicator summary as of the symbol's last completed bar."""
+        state = self.indicators.get(symbol)
+        return state.latest() if state and state.bars else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'source': type(self.source).__name__,
+            'symbols': len(self.aggregator.symbols()),
+            'ticks': self.aggregator.ticks,
+            'late_ticks': self.aggregator.late_ticks,
+            'bars_completed': self.bars_completed,
+            'last_tick_at': self.last_tick_at,
+        }
+
+
+# The running stream, if enabled
+quote_stream: Optional[QuoteStream] = None
+
+
+async def run_quote_stream(stream: QuoteStream) -> None:
+    """Consume the stream's source, broadcasting each completed bar to websocket clients."""
+    from services.websocket_manager import manager
+
+    try:
+        async for ticks in stream.source.ticks():
+            completed = await asyncio.to_thread(stream.ingest, ticks)
+            for symbol, bars in completed.items():
+                await manager.broadcast({
+                    "type": "NEW_BAR",
+                    "symbol": symbol,
+                    "timeframe": STREAM_TIMEFRAME,
+                    "bars": bars,
+                    "indicators": stream.latest_indicators(symbol),
+                })
+    except Exception as e:
+        logger.error(f"Quote stream stopped: {e}")
+
+
+def start_quote_stream() -> Optional[QuoteStream]:
+    """Start streaming the scan universe when enabled; the source follows DATA_PROVIDER."""
+    global quote_stream
+    if not settings.quote_stream_enabled:
+        return None
+    from services.symbol_universe import get_universe
+
+    symbols = get_universe().symbols(settings.scan_universe_tag)
+    replay = data_provider.replay_provider()
+    if replay:
+        source = ReplayQuoteSource.from_replay(replay, symbols, pace=settings.quote_stream_interval)
+    else:
+        source = PollingQuoteSource(symbols, settings.quote_stream_interval)
+    quote_stream = QuoteStream(source)
+    quote_stream.indicators = load_states(settings.indicator_state_path)
+    asyncio.get_running_loop().create_task(run_quote_stream(quote_stream))
+    logger.info(f"Quote stream started for {len(symbols)} symbols ({type(source).__name__})")
+    return quote_stream
+
+
+def save_stream_state() -> int:
+    """Persist the running stream's indicator states (called on shutdown)."""
+    if quote_stream is None:
+        return 0
+    return save_states(quote_stream.indicators, settings.indicator_state_path)
+
+
+def _with_forming(bars: Optional[OHLCVBars], forming: Dict, timeframe: str) -> OHLCVBars:
+    """
+    `timeframe` bars with the forming 1m bar folded into its bucket.
+    At 1m the forming bar supersedes a stored bar for its minute (e.g. a
+    provider's partial bar); a coarser partial bucket keeps its open and
+    volume and takes the forming bar's range and close.
+    """
+    start = int(bucket_starts(np.array([forming['timestamp']], dtype='int64'), timeframe)[0])
+    bar = dict(forming, timestamp=start, volume=forming['volume'] or 0)
+    if bars is None or len(bars) == 0:
+        return OHLCVBars.from_columns(_bars_columns([bar]))
+
+    partial = bars.slice(start, None)
+    if timeframe != STREAM_TIMEFRAME and len(partial):
+        bar['open'] = float(partial.open[0])
+        bar['high'] = max(float(partial.high.max()), bar['high'])
+        bar['low'] = min(float(partial.low.min()), bar['low'])
+        bar['volume'] = int(partial.volume.sum())
+    kept = bars.slice(None, start - 1).columns()
+    return OHLCVBars.from_columns({
+        col: np.concatenate([kept[col], np.array([bar[col]], dtype=kept[col].dtype)])
+        for col in OHLCV_COLUMNS
+    })
+
+
+def get_live_ohlcv(
+    symbol: str,
+    timeframe: str = '1m',
+    period: str = '1d',
+    exchange: str = 'NSE',
+    mock_fallback: bool = True
+) -> Optional[OHLCVBars]:
+    """
+    Intraday bars including the forming bar of a streamed symbol.
+    The completed bars come from the store the stream keeps current; other
+    symbols and timeframes go through `get_ohlcv_data` unchanged. Periods
+    longer than the provider serves 1m bars for are fetched at `timeframe`
+    itself (1m requests are cut to that range). `mock_fallback` is passed
+    to `get_ohlcv_data`.
+    """
+    stream = quote_stream
+    forming = stream.aggregator.forming(symbol) if stream and stream.exchange == exchange else None
+    if forming is None or (timeframe != STREAM_TIMEFRAME and timeframe not in RESAMPLED_TIMEFRAMES):
+        return data_provider.get_ohlcv_data(symbol, timeframe, period, exchange, mock_fallback=mock_fallback)
+
+    period_delta = data_provider.PERIOD_DELTAS.get(period)
+    if period_delta is None or period_delta > data_provider.MAX_1M_LOOKBACK:
+        if timeframe != STREAM_TIMEFRAME:
+            return _with_forming(data_provider.get_ohlcv_data(symbol, timeframe, period, exchange, mock_fallback=mock_fallback), forming, timeframe)
+        period, period_delta = MAX_1M_PERIOD, data_provider.PERIOD_DELTAS[MAX_1M_PERIOD]
+
+    # The store serves the window only when it reaches the minute before the
+    # forming bar (polled bars are not persisted); otherwise the fetch tops it up
+    stored = data_provider.ohlcv_store.load(symbol, STREAM_TIMEFRAME, exchange)
+    if (
+        data_provider._store_covers(stored, period_delta, forming['timestamp'])
+        and stored['timestamp'][-1] >= forming['timestamp'] - NS_PER_MINUTE
+    ):
+        base = OHLCVBars.from_columns(data_provider._window(stored, period_delta))
+    else:
+        base = data_provider.get_ohlcv_data(symbol, STREAM_TIMEFRAME, period, exchange, mock_fallback=mock_fallback)
+
+    bars = _with_forming(base, forming, STREAM_TIMEFRAME)
+    return bars if timeframe == STREAM_TIMEFRAME else resample(bars, timeframe)
@@ -0,0 +1,187 @@
+"""
+Process-wide rate limiting for upstream data providers.
+One token bucket per provider (Yahoo, Google) sized from
+settings.rate_limit_requests / settings.rate_limit_period. Waiting callers
+are served by priority, so user-facing requests go ahead of background
+scanner fetches.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 10
+
+_priority: contextvars.ContextVar = contextvars.ContextVar('provider_priority', default=PRIORITY_USER)
+
+
+def current_priority() -> int:
+    """Priority of provider calls made from the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Run provider calls inside the block at the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def at_priority(priority: int, fn: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a zero-argument callable so it runs at the given priority."""
+    def wrapper():
+        with request_priority(priority):
+            return fn()
+    return wrapper
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with a priority wait queue.
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._stats = {'calls': 0, 'waited': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+        self._by_priority: Dict[int, Dict[str, float]] = {}
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _record(self, priority: int, waited: float) -> None:
+        self._stats['calls'] += 1
+        self._stats['total_wait'] += waited
+        self._stats['max_wait'] = max(self._stats['max_wait'], waited)
+        if waited > 0.001:
+            self._stats['waited'] += 1
+        bucket = self._by_priority.setdefault(priority, {'calls': 0, 'total_wait': 0.0})
+        bucket['calls'] += 1
+        bucket['total_wait'] += waited
+
+    def acquire(self, tokens: float = 1, priority: Optional[int] = None) -> float:
+        """
+        Block until `tokens` are available and this caller is first in line.
+        A charge above `capacity` is paid in capacity-sized chunks, so it
+        waits for its full cost. Returns the time spent waiting, in seconds.
+        """
+        priority = current_priority() if priority is None else priority
+        remaining = tokens
+        start = time.monotonic()
+
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == entry:
+                        chunk = min(remaining, self.capacity)
+                        if self.tokens >= chunk:
+                            self.tokens -= chunk
+                            remaining -= chunk
+                            if remaining <= 0:
+                                break
+                            continue
+                        timeout = (chunk - self.tokens) / self.rate
+                    else:
+                        timeout = None
+                    self._cond.wait(timeout)
+                heapq.heappop(self._waiters)
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                raise
+            finally:
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self._record(priority, waited)
+        return waited
+
+    async def acquire_async(self, tokens: float = 1, priority: Optional[int] = None) -> float:
+        """
+        Event-loop friendly acquire: sleeps with asyncio instead of blocking.
+        Yields only to queued callers of equal or higher priority. Charges
+        above `capacity` are paid in chunks, as in `acquire`.
+        """
+        priority = current_priority() if priority is None else priority
+        remaining = tokens
+        start = time.monotonic()
+
+        while True:
+            with self._cond:
+                self._refill()
+                ahead = bool(self._waiters) and self._waiters[0][0] <= priority
+                chunk = min(remaining, self.capacity)
+                if not ahead and self.tokens >= chunk:
+                    self.tokens -= chunk
+                    remaining -= chunk
+                    if remaining <= 0:
+                        waited = time.monotonic() - start
+                        self._record(priority, waited)
+                        return waited
+                    continue
+                delay = max((chunk - self.tokens) / self.rate, 0.01)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill()
+            return {
+                **self._stats,
+                'available': round(self.tokens, 2),
+                'queued': len(self._waiters),
+                'by_priority': {str(p): dict(s) for p, s in self._by_priority.items()},
+            }
+
+
+def _new_bucket(name: str) -> TokenBucket:
+    return TokenBucket(
+        name,
+        rate=settings.rate_limit_requests / settings.rate_limit_period,
+        capacity=settings.rate_limit_burst
+    )
+
+
+limiters: Dict[str, TokenBucket] = {
+    'yahoo': _new_bucket('yahoo'),
+    'google': _new_bucket('google'),
+}
+
+
+def throttle(provider: str, tokens: float = 1) -> float:
+    """Wait for a slot on the provider's bucket before calling it."""
+    return limiters[provider].acquire(tokens)
+
+
+async def throttle_async(provider: str, tokens: float = 1) -> float:
+    """Async variant of `throttle`."""
+    return await limiters[provider].acquire_async(tokens)
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: bucket.stats() for name, bucket in limiters.items()}
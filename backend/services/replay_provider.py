@@ -0,0 +1,170 @@
+"""
+Offline replay data provider.
+Serves quotes and OHLCV from local fixture files instead of Yahoo/Google, so
+backtests, the scanner and benchmarks run without network access and give
+the same results on every run.
+
+Fixtures live at ``<root>/<EXCHANGE>/<SYMBOL>_<timeframe>.csv`` (or
+``.parquet``) with the columns timestamp, open, high, low, close, volume.
+Naive timestamps are taken as IST. Indices use the ``INDEX`` exchange
+directory, e.g. ``<root>/INDEX/NIFTY_1d.csv``.
+"""
+import os
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.cache import LRUCache
+from services.market_status import IST
+from services.ohlcv import OHLCV_COLUMNS, OHLCVBars, OHLCVPanel
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_EXTENSIONS = ('.parquet', '.csv')
+INDEX_EXCHANGE = 'INDEX'
+
+
+def _to_ns(value) -> int:
+    ts = pd.Timestamp(value)
+    if ts.tz is None:
+        ts = ts.tz_localize(IST)
+    return ts.value
+
+
+def read_fixture(path: str) -> OHLCVBars:
+    """Read one fixture file into bars sorted by timestamp."""
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df.columns = [col.lower() for col in df.columns]
+
+    index = pd.DatetimeIndex(pd.to_datetime(df['timestamp']))
+    if index.tz is None:
+        index = index.tz_localize(IST)
+    timestamps = index.as_unit('ns').asi8
+    order = np.argsort(timestamps, kind='stable')
+    return OHLCVBars(
+        timestamps[order],
+        *(df[col].to_numpy(dtype=np.float64)[order] for col in OHLCV_COLUMNS[1:5]),
+        df['volume'].fillna(0).to_numpy(dtype=np.int64)[order]
+    )
+
+
+class ReplayDataProvider:
+    """
+    Drop-in replacement for `DataProvider` backed by fixture files.
+
+    `as_of` pins the replay clock: bars after it are hidden, so quotes and
+    period windows are computed as they would have been at that time.
+    Missing fixtures return None rather than random mock data.
+    """
+
+    # Fixtures reach back as far as they were recorded, at every interval
+    interval_lookback: Dict[str, timedelta] = {}
+
+    def __init__(self, root: str, as_of=None, cache_size: int = 512):
+        self.root = root
+        self.as_of = None if as_of is None else _to_ns(as_of)
+        self._series = LRUCache(maxsize=cache_size)
+
+    def fixture_path(self, symbol: str, timeframe: str, exchange: str = 'NSE') -> Optional[str]:
+        base = os.path.join(self.root, exchange.upper(), f"{symbol.upper()}_{timeframe}")
+        for ext in FIXTURE_EXTENSIONS:
+            if os.path.exists(base + ext):
+                return base + ext
+        return None
+
+    def load(self, symbol: str, timeframe: str = '1d', exchange: str = 'NSE') -> Optional[OHLCVBars]:
+        """The full fixture series up to the replay clock (cached in memory)."""
+        key = (symbol, timeframe, exchange)
+        bars = self._series.get(key)
+        if bars is None:
+            path = self.fixture_path(symbol, timeframe, exchange)
+            if path is None:
+                return None
+            try:
+                bars = read_fixture(path)
+            except Exception as e:
+                logger.error(f"Failed to read replay fixture {path}: {e}")
+                return None
+            self._series.put(key, bars)
+
+        if self.as_of is not None:
+            bars = bars.slice(None, self.as_of)
+        return bars if len(bars) else None
+
+    def record(self, symbol: str, timeframe: str, bars: OHLCVBars, exchange: str = 'NSE') -> str:
+        """Write bars as a CSV fixture, e.g. to capture live data for later replay."""
+        path = os.path.join(self.root, exchange.upper(), f"{symbol.upper()}_{timeframe}.csv")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame = bars.to_frame()
+        frame.index.name = 'timestamp'
+        frame.to_csv(path)
+        self._series.pop((symbol, timeframe, exchange))
+        return path
+
+    def get_ohlcv_data(
+        self,
+        symbol: str,
+        period: str = '1mo',
+        interval: str = '1d',
+        exchange: str = 'NSE',
+        mock_fallback: bool = True
+    ) -> Optional[OHLCVBars]:
+        """Fixture bars for the last `period`, anchored on the newest bar (never mocked)."""
+        from services.data_provider import PERIOD_DELTAS
+
+        bars = self.load(symbol, interval, exchange)
+        if bars is None:
+            return None
+        delta = PERIOD_DELTAS.get(period)
+        if delta is None:
+            return bars
+        return bars.slice(int(bars.timestamp[-1]) - int(delta.total_seconds() * 1e9), None)
+
+    def get_ohlcv_panel(
+        self,
+        symbols: List[str],
+        period: str = '3mo',
+        interval: str = '1d',
+        exchange: str = 'NSE'
+    ) -> OHLCVPanel:
+        series = {}
+        for symbol in symbols:
+            bars = self.get_ohlcv_data(symbol, period, interval, exchange)
+            if bars is not None:
+                series[symbol] = bars.columns()
+        return OHLCVPanel.from_series(series, exchange=exchange)
+
+    def get_bulk_quotes(self, symbols: List[str], exchange: str = 'NSE') -> Dict[str, Dict]:
+        """Quotes derived from the last two daily bars of each fixture."""
+        series = {}
+        for symbol in symbols:
+            bars = self.load(symbol, '1d', exchange)
+            if bars is not None:
+                series[symbol] = bars.tail(2).columns()
+        return OHLCVPanel.from_series(series, exchange=exchange).quotes()
+
+    def get_stock_info(self, symbol: str, exchange: str = 'NSE') -> Optional[Dict]:
+        return self.get_bulk_quotes([symbol], exchange).get(symbol)
+
+    def get_all_nifty50_stocks(self) -> List[Dict]:
+        from services.data_provider import NIFTY_50_SYMBOLS
+
+        quotes = self.get_bulk_quotes(NIFTY_50_SYMBOLS)
+        return [quotes[symbol] for symbol in NIFTY_50_SYMBOLS if symbol in quotes]
+
+    def get_index_value(self, index: str = 'NIFTY') -> Optional[Dict]:
+        quote = self.get_stock_info(index.upper(), INDEX_EXCHANGE)
+        if quote is None:
+            return None
+        return {
+            'name': index.upper(),
+            'value': quote['currentPrice'],
+            'change': quote['change'],
+            'changePercent': quote['changePercent']
+        }
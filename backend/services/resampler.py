@@ -0,0 +1,68 @@
+"""
+Local OHLCV resampling.
+Builds higher timeframes from finer bars (typically stored 1m bars) with
+vectorised group-reduce operations. Intraday buckets are aligned to the
+session open (MARKET_OPEN_TIME, 9:15 IST) like the provider's own bars, so
+a derived 1h series has bars at 9:15, 10:15, ..., 15:15.
+"""
+from typing import Optional
+
+import numpy as np
+
+from services.market_status import MARKET_OPEN_TIME
+from services.ohlcv import OHLCVBars
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+# IST has no DST, so a fixed offset converts UTC ns to IST wall-clock ns
+IST_OFFSET_NS = (5 * 60 + 30) * NS_PER_MINUTE
+SESSION_OPEN_NS = (MARKET_OPEN_TIME.hour * 60 + MARKET_OPEN_TIME.minute) * NS_PER_MINUTE
+
+TIMEFRAME_MINUTES = {'1m': 1, '5m': 5, '15m': 15, '1h': 60, '1d': 24 * 60}
+
+# Timeframes get_ohlcv_data derives from stored 1m bars
+RESAMPLED_TIMEFRAMES = ('5m', '15m', '1h')
+
+
+def bucket_starts(timestamps: np.ndarray, timeframe: str) -> np.ndarray:
+    """
+    Start (UTC ns) of the `timeframe` bucket each timestamp falls into.
+    Daily buckets start at IST midnight; intraday ones are counted from the
+    session open, with pre-open ticks folded into the first bucket.
+    """
+    local = timestamps + IST_OFFSET_NS
+    day = local - local % NS_PER_DAY
+    if timeframe == '1d':
+        return day - IST_OFFSET_NS
+    step = TIMEFRAME_MINUTES[timeframe] * NS_PER_MINUTE
+    since_open = np.maximum(local - day - SESSION_OPEN_NS, 0)
+    return day + SESSION_OPEN_NS + since_open - since_open % step - IST_OFFSET_NS
+
+
+def resample(bars: OHLCVBars, timeframe: str) -> OHLCVBars:
+    """
+    Aggregate time-sorted bars into `timeframe` bars: first open, max high,
+    min low, last close and summed volume per bucket. The last bucket may
+    be partial (still forming), as with the provider's own intraday bars.
+    """
+    if timeframe not in TIMEFRAME_MINUTES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    if len(bars) == 0:
+        return bars
+
+    keys = bucket_starts(bars.timestamp, timeframe)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    return OHLCVBars(
+        keys[starts],
+        bars.open[starts],
+        np.maximum.reduceat(bars.high, starts),
+        np.minimum.reduceat(bars.low, starts),
+        bars.close[ends],
+        np.add.reduceat(bars.volume, starts)
+    )
+
+
+def finest_source(timeframe: str) -> Optional[str]:
+    """The stored timeframe `timeframe` is derived from, or None if fetched directly."""
+    return '1m' if timeframe in RESAMPLED_TIMEFRAMES else None
@@ -0,0 +1,382 @@
+"""
+Batch signal scoring.
+Scores N symbols at once with the rules of `SignalGenerator`, as NumPy
+operations over arrays of indicator values instead of four strategy
+method calls per symbol. Results are arrays (signal codes, confidence,
+entry/stop/target, risk-reward); `BatchSignals.record` builds the same
+dict `generate_signal` returns for one symbol, so only the symbols a
+caller keeps pay for a dict, reasoning text and timestamp.
+
+`signal_series` applies the same scoring along time: every bar of one
+symbol's history, as if `generate_signal` had run at each bar's close.
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.indicator_engine import BASE_REQUIREMENTS, IndicatorSeries, compute_indicators, requirement_key
+from services.indicators import convert_to_native
+from services.ohlcv import OHLCVBars
+from services.signal_generator import (
+    SignalGenerator, _indicator, indicator_requirements, strategy_params, strategy_requirements
+)
+
+HOLD, BUY, SELL = 0, 1, 2
+SIGNAL_NAMES = np.array(['HOLD', 'BUY', 'SELL'])
+# Trend code for "no higher-timeframe indicators to confirm against"
+NO_TREND = -1
+
+STRATEGIES = ('rsi_macd', 'bb_volume', 'ema_crossover', 'vwap_reversal')
+COMBINED_WEIGHTS = (0.35, 0.25, 0.25, 0.15)
+
+_generator = SignalGenerator()
+
+
+class SignalInputs:
+    """
+    Per-symbol strategy inputs as aligned arrays, read from indicator dicts
+    with the same lookups and fallbacks as the per-symbol strategies.
+    """
+
+    __slots__ = (
+        'price', 'rsi', 'macd_histogram', 'volume_spike', 'bb_upper', 'bb_middle', 'bb_lower',
+        'ema_fast', 'ema_slow', 'vwap', 'vwap_rsi', 'atr', 'trend',
+    )
+
+    def __init__(self, **arrays: np.ndarray):
+        for name in self.__slots__:
+            setattr(self, name, arrays[name])
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    @classmethod
+    def from_indicators(
+        cls,
+        prices: Sequence[float],
+        indicators: Sequence[Dict],
+        config: Optional[Dict] = None,
+        strategy: str = 'combined'
+    ) -> 'SignalInputs':
+        """Inputs for `indicators[i]` at `prices[i]` under `config` (as for `generate_signal`)."""
+        rsi_macd = indicator_requirements('rsi_macd', config)
+        bands = indicator_requirements('bb_volume', config)['bands']
+        crossover = indicator_requirements('ema_crossover', config)
+        vwap_rsi = indicator_requirements('vwap_reversal', config)['rsi']
+        confirm_timeframe = ((config or {}).get(strategy) or {}).get('confirm_timeframe')
+
+        rows = []
+        for price, ind in zip(prices, indicators):
+            macd = _indicator(ind, rsi_macd['macd'], ind.get('macd', {}))
+            bb = _indicator(ind, bands, ind.get('bollingerBands', {}))
+            higher = (ind.get('mtf') or {}).get(confirm_timeframe) if confirm_timeframe else None
+            if not higher:
+                trend = NO_TREND
+            elif higher['ema20'] > higher['ema50']:
+                trend = BUY
+            elif higher['ema20'] < higher['ema50']:
+                trend = SELL
+            else:
+                trend = HOLD
+            rows.append((
+                price,
+                _indicator(ind, rsi_macd['rsi'], ind.get('rsi', 50)),
+                macd.get('histogram') or 0,
+                ind.get('volumeSpike', False),
+                bb.get('upper') or price * 1.02,
+                bb.get('middle') or price,
+                bb.get('lower') or price * 0.98,
+                _indicator(ind, crossover['fast'], ind.get('ema20', price)),
+                _indicator(ind, crossover['slow'], ind.get('ema50', price)),
+                ind.get('vwap', price),
+                _indicator(ind, vwap_rsi, ind.get('rsi', 50)),
+                ind.get('atr', price * 0.02),
+                trend,
+            ))
+        columns = list(zip(*rows)) if rows else [()] * len(cls.__slots__)
+        arrays = {name: np.array(column, dtype=np.float64) for name, column in zip(cls.__slots__, columns)}
+        arrays['volume_spike'] = arrays['volume_spike'].astype(bool)
+        arrays['trend'] = arrays['trend'].astype(np.int64)
+        return cls(**arrays)
+
+    @classmethod
+    def from_series(cls, series: IndicatorSeries, config: Optional[Dict] = None) -> 'SignalInputs':
+        """
+        Inputs at every bar of `series`, priced at each bar's close. Values
+        go through the same rounding and warm-up fallbacks as the summary
+        dict (`IndicatorSeries.latest`), so bar i scores as
+        ``generate_signal(close[i], convert_to_native(series.latest(i)))``.
+        """
+        close = series.close.astype(np.float64)
+        bars = np.arange(1, len(series) + 1)
+
+        def rounded(values):
+            # Python's round, as the summary uses, not np.round
+            return np.array([round(v, 2) for v in np.asarray(values, dtype=np.float64).tolist()], dtype=np.float64)
+
+        def summary(name, default):
+            values = rounded(series[name])
+            return np.where(np.isnan(values), default, values)
+
+        def tuned(requirement, part, default):
+            # A requirement the summary covers reads the standard value
+            if requirement in BASE_REQUIREMENTS:
+                return default
+            values = rounded(series.tuned[requirement_key(requirement)][part])
+            return np.where(np.isnan(values), default, values)
+
+        rsi_macd = indicator_requirements('rsi_macd', config)
+        bands = indicator_requirements('bb_volume', config)['bands']
+        crossover = indicator_requirements('ema_crossover', config)
+        vwap_rsi = indicator_requirements('vwap_reversal', config)['rsi']
+
+        rsi = summary('rsi', 50.0)
+        # MACD parts are 0 before 26 bars; undefined values read as 0 (None or 0)
+        histogram = np.where(bars >= 26, summary('macd_hist', 0.0), 0.0)
+        if rsi_macd['macd'] not in BASE_REQUIREMENTS:
+            histogram = tuned(rsi_macd['macd'], 'histogram', 0.0)
+        band_values = {}
+        for part, fallback in (('upper', close * 1.02), ('middle', close), ('lower', close * 0.98)):
+            standard = np.where(bars >= 20, summary(f'bb_{part}', np.nan), close)
+            values = tuned(bands, part, np.nan) if bands not in BASE_REQUIREMENTS else standard
+            # bb.get(part) or fallback
+            band_values[part] = np.where(np.isnan(values) | (values == 0), fallback, values)
+        ema20, ema50 = summary('ema20', close), summary('ema50', close)
+
+        return cls(
+            price=close,
+            rsi=tuned(rsi_macd['rsi'], 'value', rsi),
+            macd_histogram=histogram,
+            volume_spike=np.asarray(series['volume_spike'], dtype=bool),
+            bb_upper=band_values['upper'],
+            bb_middle=band_values['middle'],
+            bb_lower=band_values['lower'],
+            ema_fast=tuned(crossover['fast'], 'value', ema20),
+            ema_slow=tuned(crossover['slow'], 'value', ema50),
+            vwap=summary('vwap', close),
+            vwap_rsi=tuned(vwap_rsi, 'value', rsi),
+            atr=summary('atr', 0.0),
+            trend=np.full(len(series), NO_TREND, dtype=np.int64),
+        )
+
+
+def _rsi_macd(x: SignalInputs, oversold: float, overbought: float):
+    rsi = x.rsi
+    conditions = [rsi < oversold, rsi < (oversold + 10), rsi > overbought, rsi > (overbought - 10)]
+    signal = np.select(conditions, [BUY, BUY, SELL, SELL], HOLD)
+    confidence = np.select(conditions, [70, 60, 70, 60], 40)
+
+    histogram = x.macd_histogram
+    confirmed = ((histogram > 0) & (signal == BUY)) | ((histogram < 0) & (signal == SELL))
+    confidence = np.where(
+        confirmed, confidence + 15,
+        np.where(np.abs(histogram) < 1, np.maximum(confidence - 10, 30), confidence)
+    )
+    confidence = np.where(x.volume_spike & (signal != HOLD), confidence + 10, confidence)
+    return signal, np.minimum(confidence, 100)
+
+
+def _bollinger_volume(x: SignalInputs):
+    price = x.price
+    conditions = [price <= x.bb_lower, price < x.bb_middle, price >= x.bb_upper, price > x.bb_middle]
+    signal = np.select(conditions, [BUY, BUY, SELL, SELL], HOLD)
+    confidence = np.select(conditions, [70, 55, 70, 55], 40)
+    confidence = np.where(x.volume_spike & (signal != HOLD), confidence + 15, confidence)
+    return signal, np.minimum(confidence, 100)
+
+
+def _ema_crossover(x: SignalInputs):
+    fast, slow, price = x.ema_fast, x.ema_slow, x.price
+    conditions = [(fast > slow) & (price > fast), fast > slow, (fast < slow) & (price < fast), fast < slow]
+    signal = np.select(conditions, [BUY, BUY, SELL, SELL], HOLD)
+    confidence = np.select(conditions, [70, 60, 70, 60], 45)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        separation = np.abs(fast - slow) / slow * 100
+    confidence = np.where(
+        separation > 2, confidence + 10,
+        np.where(separation < 0.5, np.maximum(confidence - 15, 30), confidence)
+    )
+    return signal, np.minimum(confidence, 100)
+
+
+def _vwap_reversal(x: SignalInputs):
+    price, vwap, rsi = x.price, x.vwap, x.vwap_rsi
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distance = (price - vwap) / vwap * 100
+    conditions = [(distance < -2) & (rsi < 45), price < vwap, (distance > 2) & (rsi > 55), price > vwap]
+    signal = np.select(conditions, [BUY, BUY, SELL, SELL], HOLD)
+    confidence = np.select(conditions, [70, 58, 70, 58], 40)
+    return signal, np.minimum(confidence, 100)
+
+
+def _combined(results):
+    """Weighted vote of the four strategies, as in `_combined_strategy`."""
+    scores = {}
+    for code in (BUY, SELL, HOLD):
+        total = 0
+        for (signal, confidence), weight in zip(results, COMBINED_WEIGHTS):
+            total = total + np.where(signal == code, confidence * weight, 0.0)
+        scores[code] = total
+    buy, sell, hold = scores[BUY], scores[SELL], scores[HOLD]
+    best = np.maximum(np.maximum(buy, sell), hold)
+
+    conditions = [best < 40, buy == best, sell == best]
+    signal = np.select(conditions, [HOLD, BUY, SELL], HOLD)
+    confidence = np.select(
+        conditions,
+        [np.where(hold > 0, hold, 30), np.minimum(buy, 100), np.minimum(sell, 100)],
+        best
+    )
+    # int() truncation; scores are never negative
+    return signal, np.trunc(confidence).astype(np.int64)
+
+
+def _prices(price: np.ndarray, signal: np.ndarray, atr: np.ndarray):
+    """Entry, stop loss, target and risk-reward, as `_calculate_prices` / `_calculate_risk_reward`."""
+    entry = price
+    stop_loss = np.select([signal == BUY, signal == SELL], [entry - (2 * atr), entry + (2 * atr)], price - (1.5 * atr))
+    target = np.select([signal == BUY, signal == SELL], [entry + (3 * atr), entry - (3 * atr)], price + (1.5 * atr))
+    risk = np.where(signal == BUY, entry - stop_loss, stop_loss - entry)
+    reward = np.where(signal == BUY, target - entry, entry - target)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        risk_reward = np.where(risk > 0, reward / risk, 0.0)
+    return entry, stop_loss, target, np.where(signal == HOLD, 1.0, risk_reward)
+
+
+class BatchSignals:
+    """Scores for a batch of symbols; arrays are aligned with the inputs."""
+
+    def __init__(
+        self,
+        strategy: str,
+        timeframe: Optional[str],
+        inputs: SignalInputs,
+        signal,
+        confidence,
+        vetoed,
+        indicators_at: Optional[Callable[[int], Dict]] = None
+    ):
+        self.strategy = strategy
+        self.indicators_at = indicators_at
+        self.timeframe = timeframe
+        self.inputs = inputs
+        self.signal = signal
+        self.confidence = confidence
+        self.vetoed = vetoed
+        self.entry, self.stop_loss, self.target, self.risk_reward = _prices(inputs.price, signal, inputs.atr)
+
+    def __len__(self) -> int:
+        return len(self.signal)
+
+    @property
+    def signals(self) -> np.ndarray:
+        return SIGNAL_NAMES[self.signal]
+
+    def record(self, i: int, symbol: str, indicators: Optional[Dict] = None) -> Dict:
+        """
+        The `generate_signal` result for the i-th symbol (or bar); the
+        indicators default to those the batch was scored from, if known.
+        """
+        if indicators is None:
+            indicators = self.indicators_at(i)
+        signal = str(SIGNAL_NAMES[self.signal[i]])
+        prices = (float(self.entry[i]), float(self.stop_loss[i]), float(self.target[i]), float(self.risk_reward[i]))
+        rounded = self.strategy == 'combined' or self.vetoed[i]
+        entry, stop_loss, target, risk_reward = (round(v, 2) for v in prices) if rounded else prices
+        result = {
+            'symbol': symbol,
+            'signal': signal,
+            'confidence': int(self.confidence[i]),
+            'entry_price': entry,
+            'stop_loss': stop_loss,
+            'target': target,
+            'risk_reward': risk_reward,
+        }
+        if self.strategy == 'combined':
+            if self.vetoed[i]:
+                reasoning = f"Not confirmed by the {self.timeframe} trend. Wait for alignment"
+            else:
+                reasoning = _generator._generate_reasoning(signal, indicators, float(self.inputs.price[i]))
+            result['reasoning'] = reasoning
+        result['timestamp'] = datetime.now().isoformat()
+        if self.strategy == 'combined':
+            result['timeframe'] = '1d'
+        if self.inputs.trend[i] != NO_TREND and (signal != 'HOLD' or self.vetoed[i]):
+            result['confirmation'] = {'timeframe': self.timeframe, 'trend': str(SIGNAL_NAMES[self.inputs.trend[i]])}
+        return result
+
+
+def score_signals(
+    prices: Sequence[float],
+    indicators: Sequence[Dict],
+    strategy: str = 'combined',
+    config: Optional[Dict] = None
+) -> BatchSignals:
+    """
+    Score every symbol at once; `generate_signal(symbol, prices[i],
+    indicators[i], strategy, config)` equals `record(i, symbol, indicators[i])`
+    apart from the timestamp.
+    """
+    if strategy != 'combined' and strategy not in STRATEGIES:
+        strategy = 'combined'
+    inputs = SignalInputs.from_indicators(prices, indicators, config, strategy)
+    return _score(inputs, strategy, config, lambda i: indicators[i])
+
+
+def signal_series(
+    bars: OHLCVBars,
+    strategy: str = 'combined',
+    config: Optional[Dict] = None,
+    series: Optional[IndicatorSeries] = None,
+    trend: Optional[np.ndarray] = None
+) -> BatchSignals:
+    """
+    Strategy output at every bar of `bars` in one vectorised pass: bar i
+    scores as `generate_signal` would on the indicators of bars[:i + 1],
+    priced at its close. Bars still warming up score on the summary
+    fallbacks, as live signals do. `series` may pass indicators already
+    computed with `strategy_requirements(config)`; `trend` the per-bar
+    trend codes of the config's confirm_timeframe (see
+    `multi_timeframe.higher_timeframe_trend`), without which nothing is
+    confirmed.
+    """
+    if strategy != 'combined' and strategy not in STRATEGIES:
+        strategy = 'combined'
+    if series is None:
+        series = compute_indicators(bars, strategy_requirements(config))
+    inputs = SignalInputs.from_series(series, config)
+    if trend is not None:
+        inputs.trend = np.asarray(trend, dtype=np.int64)
+    return _score(inputs, strategy, config, lambda i: convert_to_native(series.latest(i)))
+
+
+def _score(
+    inputs: SignalInputs,
+    strategy: str,
+    config: Optional[Dict],
+    indicators_at: Callable[[int], Dict]
+) -> BatchSignals:
+    params = strategy_params('rsi_macd', config)
+    oversold, overbought = params.get('rsi_oversold', 30), params.get('rsi_overbought', 70)
+    scorers = {
+        'rsi_macd': lambda: _rsi_macd(inputs, oversold, overbought),
+        'bb_volume': lambda: _bollinger_volume(inputs),
+        'ema_crossover': lambda: _ema_crossover(inputs),
+        'vwap_reversal': lambda: _vwap_reversal(inputs),
+    }
+    if strategy == 'combined':
+        signal, confidence = _combined([scorers[name]() for name in STRATEGIES])
+    else:
+        signal, confidence = scorers[strategy]()
+
+    # Higher-timeframe confirmation (see SignalGenerator._confirm_higher_timeframe)
+    timeframe = ((config or {}).get(strategy) or {}).get('confirm_timeframe')
+    checked = (inputs.trend != NO_TREND) & (signal != HOLD)
+    agreed = checked & (inputs.trend == signal)
+    vetoed = checked & ~agreed
+    confidence = np.where(agreed, np.minimum(confidence + 10, 100), confidence)
+    confidence = np.where(vetoed, np.minimum(confidence, 40), confidence)
+    signal = np.where(vetoed, HOLD, signal)
+    return BatchSignals(strategy, timeframe, inputs, signal, confidence, vetoed, indicators_at)
@@ -2,14 +2,73 @@
 Signal Generation Service
 Generates BUY/SELL/HOLD trading signals based on technical indicators.
 """
-from typing import Dict, List, Optional, Literal
+from typing import Dict, List, Optional, Literal, Set
 from datetime import datetime
 import logging
 
+from services.indicator_engine import BASE_REQUIREMENTS, requirement_key
+
 logger = logging.getLogger(__name__)
 
 SignalType = Literal['BUY', 'SELL', 'HOLD']
 
+# Indicator periods each strategy reads from its StrategyConfig parameters
+STRATEGY_DEFAULTS = {
+    'rsi_macd': {'rsi_period': 14, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9},
+    'bb_volume': {'bb_period': 20, 'bb_std': 2.0},
+    'ema_crossover': {'fast_period': 20, 'slow_period': 50},
+    'vwap_reversal': {'rsi_period': 14},
+}
+
+
+def strategy_params(strategy: str, config: Optional[Dict] = None) -> Dict:
+    """A strategy's parameters from `config`, over its defaults."""
+    params = (config or {}).get(strategy) or {}
+    return {**STRATEGY_DEFAULTS.get(strategy, {}), **params}
+
+
+def indicator_requirements(strategy: str, config: Optional[Dict] = None) -> Dict[str, tuple]:
+    """The (indicator, *params) requirements one strategy reads, by role."""
+    p = strategy_params(strategy, config)
+    if strategy == 'rsi_macd':
+        return {
+            'rsi': ('rsi', int(p['rsi_period'])),
+            'macd': ('macd', int(p['macd_fast']), int(p['macd_slow']), int(p['macd_signal'])),
+        }
+    if strategy == 'bb_volume':
+        return {'bands': ('bbands', int(p['bb_period']), float(p['bb_std']))}
+    if strategy == 'ema_crossover':
+        return {'fast': ('ema', int(p['fast_period'])), 'slow': ('ema', int(p['slow_period']))}
+    if strategy == 'vwap_reversal':
+        return {'rsi': ('rsi', int(p['rsi_period']))}
+    return {}
+
+
+def strategy_requirements(config: Optional[Dict] = None) -> Set[tuple]:
+    """
+    Union of every strategy's requirements under `config` (the strategy
+    name -> parameters dict of the active StrategyConfigs). Strategies
+    sharing a (indicator, params) pair share one computation.
+    """
+    requirements = set()
+    for strategy in STRATEGY_DEFAULTS:
+        requirements.update(indicator_requirements(strategy, config).values())
+    return requirements
+
+
+def _indicator(indicators: Dict, requirement: tuple, default):
+    """
+    Value of `requirement`: `default` (the standard summary value) for the
+    standard parameters, else the tuned value computed for it.
+    """
+    if requirement in BASE_REQUIREMENTS:
+        return default
+    value = indicators.get('tuned', {}).get(requirement_key(requirement))
+    if value is None:
+        logger.debug(f"No tuned value for {requirement_key(requirement)}, using the standard indicator")
+        return default
+    return value
+
 
 class SignalGenerator:
     """
@@ -43,14 +102,60 @@ class SignalGenerator:
         - target: float
         - risk_reward: float
         - reasoning: str
+        
+        A strategy whose parameters set `confirm_timeframe` (e.g. '1h') also
+        needs that timeframe's trend, from ``indicators['mtf']``, to agree;
+        `multi_timeframe.attach_confirmations` fills that in for callers.
         """
         if strategy == 'combined':
-            return self._combined_strategy(symbol, current_price, indicators, config)
+            result = self._combined_strategy(symbol, current_price, indicators, config)
         elif strategy in self.strategies:
-            return self.strategies[strategy](symbol, current_price, indicators, config)
+            result = self.strategies[strategy](symbol, current_price, indicators, config)
         else:
             logger.warning(f"Unknown strategy: {strategy}, using combined")
-            return self._combined_strategy(symbol, current_price, indicators, config)
+            strategy = 'combined'
+            result = self._combined_strategy(symbol, current_price, indicators, config)
+        
+        confirm_timeframe = ((config or {}).get(strategy) or {}).get('confirm_timeframe')
+        if confirm_timeframe:
+            result = self._confirm_higher_timeframe(result, current_price, indicators, confirm_timeframe)
+        return result
+    
+    def _confirm_higher_timeframe(self, result: Dict, current_price: float, indicators: Dict, timeframe: str) -> Dict:
+        """
+        Check a BUY/SELL against the EMA20/50 trend of a higher timeframe.
+        Agreement adds confidence; disagreement downgrades the signal to HOLD.
+        Left unchanged when that timeframe's indicators are not available.
+        """
+        higher = (indicators.get('mtf') or {}).get(timeframe)
+        if not higher or result['signal'] == 'HOLD':
+            return result
+        
+        if higher['ema20'] > higher['ema50']:
+            trend = 'BUY'
+        elif higher['ema20'] < higher['ema50']:
+            trend = 'SELL'
+        else:
+            trend = 'HOLD'
+        
+        if trend == result['signal']:
+            result['confidence'] = min(result['confidence'] + 10, 100)
+        else:
+            entry, stop_loss, target = self._calculate_prices(
+                current_price, 'HOLD', indicators.get('atr', current_price * 0.02)
+            )
+            result.update({
+                'signal': 'HOLD',
+                'confidence': min(result['confidence'], 40),
+                'entry_price': round(entry, 2),
+                'stop_loss': round(stop_loss, 2),
+                'target': round(target, 2),
+                'risk_reward': 1.0,
+            })
+            if 'reasoning' in result:
+                result['reasoning'] = f"Not confirmed by the {timeframe} trend. Wait for alignment"
+        result['confirmation'] = {'timeframe': timeframe, 'trend': trend}
+        return result
     
     def _combined_strategy(self, symbol: str, current_price: float, indicators: Dict, config: Optional[Dict] = None) -> Dict:
         """
@@ -122,13 +227,13 @@ class SignalGenerator:
         """
         # Load params
         params = config.get('rsi_macd', {}) if config else {}
-        rsi_period = params.get('rsi_period', 14) 
         rsi_overbought = params.get('rsi_overbought', 70)
         rsi_oversold = params.get('rsi_oversold', 30)
+        requirements = indicator_requirements('rsi_macd', config)
 
-        rsi = indicators.get('rsi', 50)
-        macd = indicators.get('macd', {})
-        macd_histogram = macd.get('histogram', 0)
+        rsi = _indicator(indicators, requirements['rsi'], indicators.get('rsi', 50))
+        macd = _indicator(indicators, requirements['macd'], indicators.get('macd', {}))
+        macd_histogram = macd.get('histogram') or 0
         volume_spike = indicators.get('volumeSpike', False)
         
         confidence = 50  # Base confidence
@@ -183,10 +288,11 @@ class SignalGenerator:
         """
         Bollinger Bands + Volume spike strategy.
         """
-        bb = indicators.get('bollingerBands', {})
-        upper = bb.get('upper', current_price * 1.02)
-        lower = bb.get('lower', current_price * 0.98)
-        middle = bb.get('middle', current_price)
+        requirements = indicator_requirements('bb_volume', config)
+        bb = _indicator(indicators, requirements['bands'], indicators.get('bollingerBands', {}))
+        upper = bb.get('upper') or current_price * 1.02
+        lower = bb.get('lower') or current_price * 0.98
+        middle = bb.get('middle') or current_price
         volume_spike = indicators.get('volumeSpike', False)
         
         confidence = 50
@@ -231,10 +337,11 @@ class SignalGenerator:
     
     def _ema_crossover_strategy(self, symbol: str, current_price: float, indicators: Dict, config: Optional[Dict] = None) -> Dict:
         """
-        EMA 20/50 crossover strategy.
+        EMA crossover strategy (20/50 unless tuned).
         """
-        ema20 = indicators.get('ema20', current_price)
-        ema50 = indicators.get('ema50', current_price)
+        requirements = indicator_requirements('ema_crossover', config)
+        ema20 = _indicator(indicators, requirements['fast'], indicators.get('ema20', current_price))
+        ema50 = _indicator(indicators, requirements['slow'], indicators.get('ema50', current_price))
         
         confidence = 50
         
@@ -283,8 +390,9 @@ class SignalGenerator:
         """
         VWAP-based reversal strategy.
         """
+        requirements = indicator_requirements('vwap_reversal', config)
         vwap = indicators.get('vwap', current_price)
-        rsi = indicators.get('rsi', 50)
+        rsi = _indicator(indicators, requirements['rsi'], indicators.get('rsi', 50))
         
         confidence = 50
         
@@ -369,7 +477,8 @@ class SignalGenerator:
         
         rsi = indicators.get('rsi', 50)
         macd = indicators.get('macd', {})
-        macd_histogram = macd.get('histogram', 0)
+        # None while the signal line warms up
+        macd_histogram = macd.get('histogram') or 0
         vwap = indicators.get('vwap', current_price)
         volume_spike = indicators.get('volumeSpike', False)
         bb = indicators.get('bollingerBands', {})
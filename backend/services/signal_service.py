@@ -1,57 +1,142 @@
 import logging
+import contextvars
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from services.signal_generator import generate_signal
-from services.data_provider import get_stock_info, get_ohlcv_data, NIFTY_50_SYMBOLS
-from services.indicators import calculate_all_indicators
+from services.signal_generator import strategy_requirements
+from services.signal_batch import HOLD, score_signals
+from services.data_provider import get_stock_info, get_ohlcv_data, get_ohlcv_panel, NIFTY_50_SYMBOLS
+from services.indicators import (
+    calculate_all_indicators, convert_to_native, indicator_cache_key, indicator_params, remember_indicators
+)
+from services.indicator_engine import compute_panel_indicators
+from services.multi_timeframe import attach_confirmations
+from services.symbol_universe import get_universe
+from config import settings
 from services.websocket_manager import manager
 from models.admin_models import StrategyConfig
 import models
 import asyncio
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
-def scan_market_and_save_signals(db: Session, symbols: Optional[List[str]] = None, min_confidence: int = 60):
+# Timings of the most recent scan, exposed via /api/admin/scanner
+last_scan_report: Dict = {}
+
+
+def _shards(symbols: List[str], size: int) -> List[List[str]]:
+    size = max(1, size)
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+def _scan_shard(shard: List[str], config_dict: Dict, min_confidence: int, executor: ThreadPoolExecutor) -> Dict:
+    """Fetch one shard as a panel and evaluate its symbols on the shared executor."""
+    started = time.perf_counter()
+    # One batched download per shard; per-symbol fetches only for gaps
+    panel = get_ohlcv_panel(shard, '1d', '3mo')
+    fetched = time.perf_counter()
+    # Indicators for the whole shard in one vectorised pass, including the
+    # periods tuned in the active strategy configs (each distinct one once)
+    requirements = strategy_requirements(config_dict)
+    params = indicator_params(requirements)
+    panel_indicators = compute_panel_indicators(panel, requirements)
+    computed = time.perf_counter()
+
+    def _process_symbol(symbol):
+        try:
+            stock_data = panel.quote(symbol) or get_stock_info(symbol)
+            if not stock_data: return None
+            
+            if symbol in panel_indicators:
+                if panel_indicators.bars(symbol) < 50: return None
+                indicators = convert_to_native(panel_indicators.latest(symbol))
+                # Seed the memo so routes asking for the same bars reuse this result
+                remember_indicators(indicator_cache_key(symbol, panel.ohlcv(symbol), '1d', params=params), indicators)
+            else:
+                # Missing from the batched download: per-symbol fallback
+                ohlcv = get_ohlcv_data(symbol, '1d', '3mo')
+                if not ohlcv or len(ohlcv) < 50: return None
+                indicators = calculate_all_indicators(ohlcv, symbol, '1d', requirements=requirements)
+            if not indicators: return None
+            # Higher-timeframe summary the combined config confirms against, if any
+            attach_confirmations(indicators, symbol, '1d', config_dict)
+            return symbol, stock_data['currentPrice'], indicators
+        except Exception as e:
+            logger.warning(f"Failed to prepare {symbol} for scoring: {e}")
+            return None
+
+    # Copy the context so worker threads keep the caller's provider priority
+    futures = [executor.submit(contextvars.copy_context().run, _process_symbol, s) for s in shard]
+    ready = [res for res in (future.result() for future in as_completed(futures)) if res]
+    gathered = time.perf_counter()
+
+    # Score the whole shard at once; only interesting signals become records
+    symbols, prices, indicator_rows = zip(*ready) if ready else ((), (), ())
+    scored = score_signals(prices, indicator_rows, config=config_dict)
+    keep = (scored.confidence >= min_confidence) & (scored.signal != HOLD)
+    signals = [scored.record(i, symbols[i], indicator_rows[i]) for i in np.flatnonzero(keep)]
+    done = time.perf_counter()
+
+    return {
+        'signals': signals,
+        'timing': {
+            'symbols': len(shard),
+            'fetched': len(panel),
+            'fetch_seconds': round(fetched - started, 3),
+            'indicator_seconds': round(computed - fetched, 3),
+            'score_seconds': round(done - gathered, 3),
+            'compute_seconds': round(done - fetched, 3),
+            'total_seconds': round(done - started, 3),
+            'signals': len(signals),
+        }
+    }
+
+
+def scan_market_and_save_signals(
+    db: Session,
+    symbols: Optional[List[str]] = None,
+    min_confidence: int = 60,
+    universe_tag: Optional[str] = None
+):
     """
     Scans the market (or provided symbols) for trading signals and saves them to the DB.
+    Without explicit symbols the universe tagged `universe_tag`
+    (settings.scan_universe_tag by default) is scanned in shards of
+    settings.scan_shard_size, one after another, each evaluated with
+    settings.scan_max_workers threads.
     """
-    target_symbols = symbols if symbols else NIFTY_50_SYMBOLS
+    if symbols:
+        target_symbols = symbols
+    else:
+        target_symbols = get_universe().symbols(universe_tag or settings.scan_universe_tag) or NIFTY_50_SYMBOLS
     active_signals = []
     
     # Load Strategy Config
     configs = db.query(StrategyConfig).filter(StrategyConfig.is_active == True).all()
     config_dict = {c.strategy_name: c.parameters for c in configs}
     
-    def _process_symbol(symbol):
-        try:
-            stock_data = get_stock_info(symbol)
-            if not stock_data: return None
-            
-            ohlcv = get_ohlcv_data(symbol, '1d', '3mo')
-            if not ohlcv or len(ohlcv) < 50: return None
-            
-            indicators = calculate_all_indicators(ohlcv)
-            if not indicators: return None
-            
-            signal = generate_signal(symbol, stock_data['currentPrice'], indicators, config=config_dict)
-            
-            if signal['confidence'] >= min_confidence:
-                return signal
-            return None
-        except Exception as e:
-            logger.warning(f"Failed to generate signal for {symbol}: {e}")
-            return None
+    scan_started = time.perf_counter()
+    shard_timings = []
+    with ThreadPoolExecutor(max_workers=settings.scan_max_workers) as executor:
+        for index, shard in enumerate(_shards(target_symbols, settings.scan_shard_size)):
+            result = _scan_shard(shard, config_dict, min_confidence, executor)
+            active_signals.extend(result['signals'])
+            shard_timings.append({'shard': index, **result['timing']})
+            logger.info(f"Scan shard {index}: {result['timing']}")
 
-    # Scan in parallel
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_symbol = {executor.submit(_process_symbol, s): s for s in target_symbols}
-        for future in as_completed(future_to_symbol):
-            res = future.result()
-            if res and res['signal'] in ['BUY', 'SELL']: # Only interesting signals
-                active_signals.append(res)
+    last_scan_report.clear()
+    last_scan_report.update({
+        'finished_at': datetime.now().isoformat(),
+        'symbols': len(target_symbols),
+        'shard_size': settings.scan_shard_size,
+        'max_workers': settings.scan_max_workers,
+        'total_seconds': round(time.perf_counter() - scan_started, 3),
+        'shards': shard_timings,
+    })
     
     # Save to Database
     saved_count = 0
@@ -124,7 +209,13 @@ class SignalService:
     def __init__(self):
         pass
     
-    def scan_market_and_save_signals(self, db: Session, symbols: Optional[List[str]] = None, min_confidence: int = 60):
+    def scan_market_and_save_signals(
+        self,
+        db: Session,
+        symbols: Optional[List[str]] = None,
+        min_confidence: int = 60,
+        universe_tag: Optional[str] = None
+    ):
         """Scan market and save signals"""
-        return scan_market_and_save_signals(db, symbols, min_confidence)
+        return scan_market_and_save_signals(db, symbols, min_confidence, universe_tag)
 
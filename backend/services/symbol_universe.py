@@ -0,0 +1,123 @@
+"""
+Symbol universe registry.
+Loads the tradable symbols with their index-membership tags (NIFTY50,
+NIFTY500, FNO, ...) from a CSV file so the scanner can cover more than the
+built-in NIFTY 50 list.
+
+File format (header required; tags separated by '|' or ';'):
+
+    symbol,exchange,name,tags
+    RELIANCE,NSE,Reliance Industries,NIFTY50|NIFTY500|FNO
+"""
+import csv
+import os
+import threading
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+BUILTIN_TAG = 'NIFTY50'
+
+
+def _parse_tags(raw: str) -> List[str]:
+    return [t.strip().upper() for t in raw.replace(';', '|').split('|') if t.strip()]
+
+
+class SymbolUniverse:
+    """In-memory registry of symbols keyed by symbol name, in file order."""
+
+    def __init__(self, entries: Iterable[Dict]):
+        self._entries: Dict[str, Dict] = {}
+        for entry in entries:
+            symbol = entry['symbol'].strip().upper()
+            if not symbol:
+                continue
+            existing = self._entries.get(symbol)
+            if existing:
+                # A symbol listed twice keeps the union of its tags
+                existing['tags'] = sorted(set(existing['tags']) | set(entry.get('tags', [])))
+                continue
+            self._entries[symbol] = {
+                'symbol': symbol,
+                'exchange': (entry.get('exchange') or 'NSE').upper(),
+                'name': entry.get('name') or symbol,
+                'tags': sorted(set(entry.get('tags', []))),
+            }
+
+    @classmethod
+    def builtin(cls) -> 'SymbolUniverse':
+        """The hard-coded NIFTY 50 list, used when no universe file exists."""
+        from services.data_provider import NIFTY_50_SYMBOLS
+        return cls({'symbol': s, 'tags': [BUILTIN_TAG]} for s in NIFTY_50_SYMBOLS)
+
+    @classmethod
+    def load(cls, path: str) -> 'SymbolUniverse':
+        """Read a universe CSV; falls back to the built-in list if it is missing or unreadable."""
+        if not path or not os.path.exists(path):
+            return cls.builtin()
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = [
+                    {
+                        'symbol': row.get('symbol', ''),
+                        'exchange': row.get('exchange'),
+                        'name': row.get('name'),
+                        'tags': _parse_tags(row.get('tags') or ''),
+                    }
+                    for row in csv.DictReader(f)
+                ]
+        except Exception as e:
+            logger.error(f"Failed to read symbol universe {path}: {e}")
+            return cls.builtin()
+        universe = cls(rows)
+        logger.info(f"Loaded {len(universe)} symbols from {path}")
+        return universe if len(universe) else cls.builtin()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._entries
+
+    def info(self, symbol: str) -> Optional[Dict]:
+        return self._entries.get(symbol.upper())
+
+    def symbols(self, tag: Optional[str] = None, exchange: Optional[str] = None) -> List[str]:
+        """Symbols carrying `tag` (all symbols if None), optionally on one exchange."""
+        tag = tag.upper() if tag else None
+        return [
+            e['symbol'] for e in self._entries.values()
+            if (tag is None or tag in e['tags']) and (exchange is None or e['exchange'] == exchange.upper())
+        ]
+
+    def tags(self) -> Dict[str, int]:
+        """Number of symbols per tag."""
+        counts: Dict[str, int] = {}
+        for entry in self._entries.values():
+            for tag in entry['tags']:
+                counts[tag] = counts.get(tag, 0) + 1
+        return counts
+
+
+_universe: Optional[SymbolUniverse] = None
+_universe_lock = threading.Lock()
+
+
+def get_universe() -> SymbolUniverse:
+    """The process-wide universe, loaded from settings.symbol_universe_file on first use."""
+    global _universe
+    with _universe_lock:
+        if _universe is None:
+            _universe = SymbolUniverse.load(settings.symbol_universe_file)
+        return _universe
+
+
+def reload_universe() -> SymbolUniverse:
+    """Re-read the universe file (e.g. after it was edited)."""
+    global _universe
+    with _universe_lock:
+        _universe = SymbolUniverse.load(settings.symbol_universe_file)
+        return _universe
@@ -0,0 +1,257 @@
+"""
+Seeded synthetic OHLCV generator for load tests and the offline fallback.
+
+Prices follow a geometric Brownian motion whose volatility clusters across
+sessions (an AR(1) log-volatility regime, generated with an FFT convolution)
+and follows the intraday U-shape. Sessions open with overnight gaps and
+occasional jumps. Volume follows the same profile and has decaying bursts.
+Everything is vectorised over (symbols x bars), so large universes are
+produced chunk by chunk with `iter_panels`.
+"""
+import os
+import zlib
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from services.market_status import IST
+from services.ohlcv import OHLCVBars, OHLCVPanel
+
+# Bars per NSE session (09:15-15:30) for each supported timeframe
+BARS_PER_SESSION = {'1m': 375, '5m': 75, '15m': 25, '1h': 7, '1d': 1}
+BAR_MINUTES = {'1m': 1, '5m': 5, '15m': 15, '1h': 60, '1d': 0}
+SESSION_OPEN_MINUTES = 9 * 60 + 15
+
+TRADING_DAYS_PER_YEAR = 252
+VOLUME_BURST_DECAY = 0.8
+VOLUME_BURST_LENGTH = 20
+
+
+def trading_days(
+    periods: int,
+    start: Optional[Union[str, pd.Timestamp]] = None,
+    end: Optional[Union[str, pd.Timestamp]] = None
+) -> pd.DatetimeIndex:
+    """`periods` weekdays starting at `start` (or ending at `end`), as naive dates."""
+    if start is not None:
+        return pd.bdate_range(start=pd.Timestamp(start).normalize(), periods=periods)
+    end = pd.Timestamp.now(tz=IST).tz_localize(None) if end is None else pd.Timestamp(end)
+    return pd.bdate_range(end=end.normalize(), periods=periods)
+
+
+def session_timestamps(days: pd.DatetimeIndex, timeframe: str = '1m') -> np.ndarray:
+    """Bar open times (UTC ns) for every session in `days`."""
+    midnights = days.tz_localize(IST).as_unit('ns').asi8
+    if timeframe == '1d':
+        return midnights.astype(np.int64)
+    offsets = (SESSION_OPEN_MINUTES + BAR_MINUTES[timeframe] * np.arange(BARS_PER_SESSION[timeframe])) * 60 * 10**9
+    return (midnights[:, None] + offsets[None, :]).ravel().astype(np.int64)
+
+
+def _ar1_fft(noise: np.ndarray, phi: float) -> np.ndarray:
+    """AR(1) filter x_t = phi * x_{t-1} + e_t along the last axis via FFT convolution."""
+    n = noise.shape[-1]
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    kernel = phi ** np.arange(n)
+    out = np.fft.irfft(np.fft.rfft(noise, size) * np.fft.rfft(kernel, size), size)
+    return out[..., :n]
+
+
+def _intraday_profile(bars_per_session: int, depth: float = 0.6) -> np.ndarray:
+    """U-shaped activity over a session, normalised to mean 1."""
+    if bars_per_session == 1:
+        return np.ones(1)
+    x = np.linspace(-1.0, 1.0, bars_per_session)
+    profile = 1.0 + depth * x ** 2
+    return profile / profile.mean()
+
+
+def _simulate(
+    rng: np.random.Generator,
+    n_series: int,
+    n_sessions: int,
+    timeframe: str,
+    base_prices: np.ndarray,
+    annual_vol: float,
+    annual_drift: float,
+    vol_of_vol: float,
+    vol_persistence: float,
+    gap_vol: float,
+    jump_prob: float,
+    base_volume: float,
+    burst_prob: float
+) -> dict:
+    """Simulate (n_series x n_bars) OHLCV arrays."""
+    per_session = BARS_PER_SESSION[timeframe]
+    n_bars = n_sessions * per_session
+    bar_vol = annual_vol / np.sqrt(TRADING_DAYS_PER_YEAR * per_session)
+    bar_drift = annual_drift / (TRADING_DAYS_PER_YEAR * per_session)
+
+    # Session-level volatility regime: stationary AR(1) in log-vol,
+    # rescaled so the mean variance stays at bar_vol**2
+    log_vol = _ar1_fft(rng.standard_normal((n_series, n_sessions)), vol_persistence)
+    log_vol *= vol_of_vol * np.sqrt(1 - vol_persistence ** 2)
+    regime = np.exp(log_vol - vol_of_vol ** 2)
+
+    profile = _intraday_profile(per_session)
+    vol = (regime[:, :, None] * np.sqrt(profile)[None, None, :]).reshape(n_series, n_bars) * bar_vol
+
+    # Volume bursts: sparse impulses with an exponentially decaying tail
+    burst = np.zeros(n_series * n_bars)
+    starts = rng.integers(0, burst.size, rng.binomial(burst.size, burst_prob))
+    starts = starts[starts % n_bars < n_bars - VOLUME_BURST_LENGTH]
+    for lag in range(VOLUME_BURST_LENGTH):
+        np.add.at(burst, starts + lag, 4.0 * VOLUME_BURST_DECAY ** lag)
+    burst = burst.reshape(n_series, n_bars)
+    vol *= np.sqrt(1.0 + 0.25 * burst)
+
+    returns = bar_drift - 0.5 * vol ** 2 + vol * rng.standard_normal((n_series, n_bars))
+
+    # Overnight gaps (and rare jumps) land on each session's first bar
+    gaps = gap_vol * rng.standard_normal((n_series, n_sessions))
+    jumps = rng.random((n_series, n_sessions)) < jump_prob
+    gaps += jumps * rng.standard_t(3, (n_series, n_sessions)) * 4 * gap_vol
+    gaps[:, 0] = 0.0
+    gap_bars = np.zeros((n_series, n_bars))
+    gap_bars[:, ::per_session] = gaps
+
+    log_close = np.log(base_prices)[:, None] + np.cumsum(returns + gap_bars, axis=1)
+    prev_close = np.concatenate([np.log(base_prices)[:, None], log_close[:, :-1]], axis=1)
+    log_open = prev_close + gap_bars
+
+    close = np.exp(log_close)
+    open_ = np.exp(log_open)
+    wick = np.abs(rng.standard_normal((2, n_series, n_bars))) * vol * 0.5
+    high = np.maximum(open_, close) * np.exp(wick[0])
+    low = np.minimum(open_, close) * np.exp(-wick[1])
+
+    volume_profile = np.tile(profile, n_sessions)[None, :]
+    volume = (
+        base_volume / per_session
+        * volume_profile
+        * regime.repeat(per_session, axis=1)
+        * (1.0 + burst)
+        * rng.lognormal(0.0, 0.3, (n_series, n_bars))
+    )
+
+    return {
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': np.rint(volume),
+    }
+
+
+def _panel(
+    symbols: List[str],
+    days: pd.DatetimeIndex,
+    timeframe: str,
+    rng: np.random.Generator,
+    base_price: Union[float, Sequence[float], None],
+    **params
+) -> OHLCVPanel:
+    n = len(symbols)
+    if base_price is None:
+        base_prices = np.exp(rng.uniform(np.log(100), np.log(3000), n))
+    else:
+        base_prices = np.broadcast_to(np.asarray(base_price, dtype=np.float64), (n,)).copy()
+    arrays = _simulate(rng, n, len(days), timeframe, base_prices, **params)
+    return OHLCVPanel(symbols, session_timestamps(days, timeframe), **arrays)
+
+
+DEFAULT_PARAMS = {
+    'annual_vol': 0.25,
+    'annual_drift': 0.08,
+    'vol_of_vol': 0.35,
+    'vol_persistence': 0.9,
+    'gap_vol': 0.006,
+    'jump_prob': 0.01,
+    'base_volume': 2_000_000,
+    'burst_prob': 0.002,
+}
+
+
+def generate_panel(
+    symbols: Union[int, List[str]],
+    days: int = TRADING_DAYS_PER_YEAR,
+    timeframe: str = '1d',
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    seed: Optional[int] = None,
+    base_price: Union[float, Sequence[float], None] = None,
+    **params
+) -> OHLCVPanel:
+    """
+    Synthetic OHLCV panel for `symbols` (a list, or a count for SYN00000...).
+    The same seed and arguments always give the same panel.
+    """
+    if isinstance(symbols, int):
+        symbols = [f"SYN{i:05d}" for i in range(symbols)]
+    rng = np.random.default_rng(seed)
+    sessions = trading_days(days, start=start, end=end)
+    return _panel(list(symbols), sessions, timeframe, rng, base_price, **{**DEFAULT_PARAMS, **params})
+
+
+def iter_panels(
+    n_symbols: int,
+    chunk_size: int = 100,
+    days: int = TRADING_DAYS_PER_YEAR,
+    timeframe: str = '1m',
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    seed: Optional[int] = None,
+    **params
+) -> Iterator[OHLCVPanel]:
+    """
+    Yield panels of up to `chunk_size` symbols covering `n_symbols` in total,
+    so universes too large for memory can be streamed. Each chunk draws from
+    its own child seed, making the output reproducible for a given chunk size.
+    """
+    sessions = trading_days(days, start=start, end=end)
+    children = np.random.SeedSequence(seed).spawn((n_symbols + chunk_size - 1) // chunk_size)
+    for chunk, child in enumerate(children):
+        first = chunk * chunk_size
+        symbols = [f"SYN{i:05d}" for i in range(first, min(first + chunk_size, n_symbols))]
+        yield _panel(symbols, sessions, timeframe, np.random.default_rng(child), None, **{**DEFAULT_PARAMS, **params})
+
+
+def generate_bars(
+    symbol: str,
+    n_bars: int,
+    timeframe: str = '1d',
+    base_price: Optional[float] = None,
+    seed: Optional[int] = None,
+    end: Optional[str] = None
+) -> OHLCVBars:
+    """
+    The last `n_bars` bars of a synthetic series ending at the latest session.
+    Without a seed, the symbol name seeds the generator so repeated calls agree.
+    """
+    if seed is None:
+        seed = zlib.crc32(f"{symbol}:{timeframe}".encode())
+    sessions = -(-n_bars // BARS_PER_SESSION[timeframe])
+    panel = generate_panel([symbol], days=sessions, timeframe=timeframe, end=end, seed=seed, base_price=base_price)
+    return panel.ohlcv(symbol).tail(n_bars)
+
+
+def write_replay_fixtures(
+    root: str,
+    n_symbols: int,
+    days: int = TRADING_DAYS_PER_YEAR,
+    timeframe: str = '1d',
+    seed: Optional[int] = None,
+    chunk_size: int = 100
+) -> List[str]:
+    """Write a synthetic universe as replay fixtures (see `ReplayDataProvider`)."""
+    from services.replay_provider import ReplayDataProvider
+
+    replay = ReplayDataProvider(root)
+    os.makedirs(root, exist_ok=True)
+    symbols = []
+    for panel in iter_panels(n_symbols, chunk_size, days=days, timeframe=timeframe, seed=seed):
+        for symbol in panel.symbols:
+            replay.record(symbol, timeframe, panel.ohlcv(symbol))
+            symbols.append(symbol)
+    return symbols
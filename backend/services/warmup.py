@@ -0,0 +1,123 @@
+"""
+Startup warm-up.
+Restores the quote cache from the snapshot written at the last shutdown,
+pulls the scan universe's stored OHLCV series into memory, and then
+prefetches whatever is still missing at background priority, so the first
+dashboard load after a deploy is served from cache.
+"""
+import asyncio
+import json
+import os
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from config import settings
+from services.rate_limiter import at_priority, PRIORITY_BACKGROUND
+from services import data_provider
+from services.symbol_universe import get_universe
+
+logger = logging.getLogger(__name__)
+
+# Readiness reported by GET /ready
+warmup_status: Dict[str, Any] = {'state': 'pending'}
+
+
+def save_quote_snapshot(path: str = None) -> int:
+    """Write every cached quote to disk (called on shutdown). Returns the count."""
+    path = path or settings.quote_snapshot_path
+    entries = [
+        {'symbol': key[0], 'exchange': key[1], 'quote': quote, 'age': age}
+        for key, quote, age in data_provider.quote_cache.items()
+    ]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump({'saved_at': time.time(), 'quotes': entries}, fh, default=str)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved {len(entries)} quotes to {path}")
+    return len(entries)
+
+
+def load_quote_snapshot(path: str = None) -> int:
+    """
+    Restore quotes saved by `save_quote_snapshot`. Entries keep their age
+    (including the downtime), so during market hours they are served stale
+    and refreshed in the background on first use.
+    """
+    path = path or settings.quote_snapshot_path
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(path, encoding='utf-8') as fh:
+            snapshot = json.load(fh)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable quote snapshot {path}: {e}")
+        return 0
+
+    downtime = max(time.time() - snapshot.get('saved_at', time.time()), 0.0)
+    for entry in snapshot.get('quotes', []):
+        data_provider.quote_cache.put(
+            (entry['symbol'], entry['exchange']),
+            entry['quote'],
+            age=entry.get('age', 0.0) + downtime
+        )
+    return len(snapshot.get('quotes', []))
+
+
+def preload_series(symbols: List[str], timeframe: str = '1d', exchange: str = 'NSE') -> List[str]:
+    """Pull stored series into the store's memory cache; returns the symbols not stored yet."""
+    return [s for s in symbols if data_provider.ohlcv_store.load(s, timeframe, exchange) is None]
+
+
+def prefetch(symbols: List[str], missing_series: List[str]) -> Dict[str, int]:
+    """Fetch quotes and daily series missing from the caches, in batched downloads."""
+    missing_quotes = [s for s in symbols if data_provider.quote_cache.lookup((s, 'NSE')) is None]
+    quotes = data_provider.get_bulk_quotes(missing_quotes) if missing_quotes else {}
+    for symbol, quote in quotes.items():
+        data_provider.quote_cache.put((symbol, 'NSE'), quote)
+
+    series = 0
+    if missing_series:
+        # The scanner's panel request, so its first run finds the store filled
+        series = len(data_provider.get_ohlcv_panel(missing_series, '1d', '3mo'))
+    return {'quotes_prefetched': len(quotes), 'series_prefetched': series}
+
+
+def run_warmup() -> Dict[str, Any]:
+    """Blocking warm-up; updates and returns `warmup_status`."""
+    started = time.perf_counter()
+    warmup_status.clear()
+    warmup_status.update({'state': 'warming', 'started_at': datetime.now().isoformat()})
+    try:
+        symbols = get_universe().symbols(settings.scan_universe_tag)
+        warmup_status['quotes_loaded'] = load_quote_snapshot()
+        missing_series = preload_series(symbols)
+        warmup_status['series_loaded'] = len(symbols) - len(missing_series)
+
+        if data_provider.replay_provider() is None:
+            warmup_status.update(at_priority(PRIORITY_BACKGROUND, lambda: prefetch(symbols, missing_series))())
+        warmup_status['state'] = 'ready'
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        # Serving continues cold; readiness only reports the failure
+        warmup_status.update({'state': 'failed', 'error': str(e)})
+    warmup_status['seconds'] = round(time.perf_counter() - started, 3)
+    warmup_status['finished_at'] = datetime.now().isoformat()
+    logger.info(f"Warm-up finished: {warmup_status}")
+    return warmup_status
+
+
+def start_warmup() -> None:
+    """Run the warm-up in a worker thread without delaying application startup."""
+    if not settings.warmup_enabled:
+        warmup_status.update({'state': 'ready', 'skipped': True})
+        return
+    loop = asyncio.get_running_loop()
+    loop.run_in_executor(None, run_warmup)
+
+
+def is_ready() -> bool:
+    """Ready once warm-up finished; a failed warm-up does not hold back traffic."""
+    return warmup_status.get('state') in ('ready', 'failed')
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from aiohttp import web
+from services import async_quotes
+from services.async_quotes import AsyncQuoteClient
+from services.cache import TTLCache
+from services.data_provider import NIFTY_50_SYMBOLS, parse_google_quote
+
+QUOTE_HTML = (
+    '<div class="zzDege">Reliance Industries</div>'
+    '<div class="YMlKec fxKbKc">₹2,950.50</div>'
+    '<div jsname="V679Bc">+12.50</div>'
+    '<span jsname="m69M9d">(+0.43%)</span>'
+)
+
+
+def test_parse_google_quote():
+    quote = parse_google_quote(QUOTE_HTML, "RELIANCE")
+    assert quote["name"] == "Reliance Industries"
+    assert quote["currentPrice"] == 2950.5
+    assert quote["change"] == 12.5
+    assert quote["previousClose"] == 2938.0
+    assert parse_google_quote("<html></html>", "RELIANCE") is None
+
+
+def test_client_limits_concurrency():
+    async def scenario():
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return web.Response(text=QUOTE_HTML)
+
+        app = web.Application()
+        app.router.add_get("/quote", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        client = AsyncQuoteClient(max_concurrency=3, timeout=5)
+        try:
+            pages = await asyncio.gather(*(client.fetch_text(f"http://127.0.0.1:{port}/quote") for _ in range(10)))
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return pages, peak
+
+    pages, peak = asyncio.run(scenario())
+    assert all(page == (200, QUOTE_HTML) for page in pages)
+    assert peak <= 3
+
+
+def test_session_from_a_finished_loop_is_closed():
+    client = AsyncQuoteClient(max_concurrency=3, timeout=5)
+    first = asyncio.run(client._ensure_session())
+    second = asyncio.run(client._ensure_session())
+    assert second is not first
+    assert first.closed and not second.closed
+    asyncio.run(client.close())
+
+
+def test_all_stocks_async_fills_gaps_from_bulk(monkeypatch):
+    async def fake_google(symbol, exchange="NSE"):
+        return None if symbol == "TCS" else parse_google_quote(QUOTE_HTML, symbol)
+
+    bulk_calls = []
+
+    def fake_bulk(symbols, exchange="NSE"):
+        bulk_calls.append(symbols)
+        return {s: {"symbol": s, "currentPrice": 1.0} for s in symbols}
+
+    monkeypatch.setattr(async_quotes, "get_stock_info_google_async", fake_google)
+    monkeypatch.setattr(async_quotes, "get_bulk_quotes", fake_bulk)
+    monkeypatch.setattr(async_quotes, "quote_cache", TTLCache(maxsize=100, ttl=lambda: 60))
+
+    stocks = asyncio.run(async_quotes.get_all_nifty50_stocks_async())
+    assert [s["symbol"] for s in stocks] == NIFTY_50_SYMBOLS
+    assert bulk_calls == [["TCS"]]
+
+    # Second call is served entirely from the quote cache
+    asyncio.run(async_quotes.get_all_nifty50_stocks_async())
+    assert bulk_calls == [["TCS"]]
@@ -0,0 +1,109 @@
+import pytest
+from services.backtest_engine import BacktestEngine
+from services.data_provider import INTERVAL_LOOKBACK
+from services.resampler import resample
+from services.signal_batch import signal_series
+from services.synthetic_data import generate_bars
+
+
+class FakeProvider:
+    interval_lookback = INTERVAL_LOOKBACK
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.calls = []
+
+    def get_ohlcv_data(self, symbol, period="1mo", interval="1d", exchange="NSE", mock_fallback=True):
+        self.calls.append((period, interval, mock_fallback))
+        return self.bars
+
+
+@pytest.fixture
+def bars():
+    return generate_bars("TCS", 300, "1d", end="2024-06-28")
+
+
+def run(bars, strategy, start="2023-11-01", config=None):
+    engine = BacktestEngine("TCS", strategy, start, "2024-06-28", config=config)
+    engine.data_provider = FakeProvider(bars)
+    return engine, engine.run()
+
+
+def test_trades_follow_strategy_signals(bars):
+    engine, result = run(bars, "RSI+MACD")
+    assert result["status"] == "completed" and result["trades"]
+
+    signals = signal_series(bars, "rsi_macd")
+    dates = [ts.isoformat() for ts in bars.index()]
+    first = result["trades"][0]
+    bar = dates.index(first["entry_date"])
+    # The first entry is the first BUY/SELL bar in the range
+    start = min(i for i, d in enumerate(dates) if d >= "2023-11-01")
+    expected = next(i for i in range(start, len(bars)) if signals.signals[i] != "HOLD")
+    assert bar == expected
+    assert first["position_type"] == ("LONG" if signals.signals[bar] == "BUY" else "SHORT")
+    assert first["stop_loss"] == pytest.approx(float(signals.stop_loss[bar]))
+    assert first["target"] == pytest.approx(float(signals.target[bar]))
+
+
+def test_no_signals_without_history(bars):
+    # Every bar is inside the range: nothing trades before 50 bars of history
+    _, result = run(bars.tail(60), "EMA Crossover", start="2000-01-01")
+    entries = [t["entry_date"] for t in result["trades"]]
+    warmup_end = bars.tail(60).index()[48].isoformat()
+    assert all(entry > warmup_end for entry in entries)
+
+
+def test_unknown_strategy_does_not_trade(bars):
+    _, result = run(bars, "Moon Phase")
+    assert result["status"] == "completed" and result["trades"] == []
+
+
+def test_intraday_archive_runs_warm_up_before_start(tmp_path, monkeypatch):
+    from services import backtest_engine
+    from services.intraday_archive import IntradayArchive
+
+    # Only 1m bars are archived; the 5m run resamples them
+    minutes = generate_bars("TCS", 3000, "1m", end="2024-06-28")
+    archive = IntradayArchive(str(tmp_path))
+    archive.append("TCS", minutes)
+    bars = resample(minutes, "5m")
+    monkeypatch.setattr(backtest_engine, "intraday_archive", archive)
+
+    start = bars.index()[300]
+    engine = BacktestEngine("TCS", "RSI+MACD", start.isoformat(), "2024-06-28", timeframe="5m")
+    engine.data_provider = None  # the archive covers the range
+    result = engine.run()
+    assert result["status"] == "completed"
+
+    warmup = backtest_engine.warmup_bars("rsi_macd")
+    assert len(engine.signals) == len(bars) - 300 + warmup
+    assert result["equity_curve"][0]["date"] == start.isoformat()
+    # Signals in range are those of the full history: the first bar can trade
+    signals = signal_series(bars, "rsi_macd")
+    first = next(i for i in range(300, len(bars)) if signals.signals[i] != "HOLD")
+    assert result["trades"][0]["entry_date"] == bars.index()[first].isoformat()
+
+
+def test_intraday_fallback_stays_within_provider_limits(tmp_path, monkeypatch):
+    import pandas as pd
+    from services import backtest_engine
+    from services.intraday_archive import IntradayArchive
+
+    monkeypatch.setattr(backtest_engine, "intraday_archive", IntradayArchive(str(tmp_path)))
+    today = pd.Timestamp.now(tz="Asia/Kolkata").normalize()
+
+    engine = BacktestEngine("TCS", "RSI+MACD", (today - pd.Timedelta(days=20)).date().isoformat(),
+                            today.date().isoformat(), timeframe="5m")
+    engine.data_provider = FakeProvider(None)
+    result = engine.run()
+    # A period Yahoo serves at 5m, and no mock bars when it has nothing
+    assert engine.data_provider.calls == [("1mo", "5m", False)]
+    assert result["status"] == "failed" and "No historical data" in result["error"]
+
+    engine = BacktestEngine("TCS", "RSI+MACD", (today - pd.Timedelta(days=200)).date().isoformat(),
+                            today.date().isoformat(), timeframe="5m")
+    engine.data_provider = FakeProvider(None)
+    result = engine.run()
+    assert engine.data_provider.calls == []
+    assert result["status"] == "failed" and "60 days" in result["error"]
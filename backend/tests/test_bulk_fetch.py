@@ -0,0 +1,74 @@
+import pytest
+import pandas as pd
+import numpy as np
+from services.ohlcv import OHLCVBars, OHLCVPanel
+from services.ohlcv_store import OHLCVStore, frame_to_columns
+from services import data_provider
+from tests.test_ohlcv_store import make_history
+
+
+def test_panel_aligns_symbols_on_union_of_timestamps():
+    panel = OHLCVPanel.from_series({
+        "RELIANCE": frame_to_columns(make_history("2024-01-01", 5)),
+        "TCS": frame_to_columns(make_history("2024-01-03", 5, base=200.0)),
+    })
+
+    assert panel.close.shape == (2, 7)
+    assert np.isnan(panel.close[1, :2]).all()
+    assert len(panel.ohlcv("TCS")) == 5
+
+    quote = panel.quote("TCS")
+    assert quote["currentPrice"] == 204.0
+    assert quote["previousClose"] == 203.0
+    assert quote["change"] == 1.0
+    assert data_provider.reported_volume(quote) == quote["volume"]
+    assert panel.quote("INFY") is None
+
+
+def test_bars_roundtrip_through_records():
+    bars = OHLCVBars.from_columns(frame_to_columns(make_history("2024-01-01", 5)))
+    assert bars.timestamp.dtype == np.int64 and bars.volume.dtype == np.int64
+    assert bars.close.dtype == np.float64
+
+    records = bars.to_records()
+    assert records[0]["timestamp"] == "2024-01-01T00:00:00+05:30"
+    assert records[-1]["close"] == 104.0
+
+    back = OHLCVBars.from_records(records)
+    np.testing.assert_array_equal(back.timestamp, bars.timestamp)
+    np.testing.assert_array_equal(back.close, bars.close)
+
+
+def test_bars_slice_and_frame():
+    bars = OHLCVBars.from_columns(frame_to_columns(make_history("2024-01-01", 10)))
+    start = pd.Timestamp("2024-01-03", tz="Asia/Kolkata").value
+    stop = pd.Timestamp("2024-01-05", tz="Asia/Kolkata").value
+
+    window = bars.slice(start, stop)
+    assert len(window) == 3
+    assert np.shares_memory(window.close, bars.close)
+    assert bars.tail(2).close.tolist() == [108.0, 109.0]
+
+    frame = bars.to_frame()
+    assert str(frame.index.tz) == "Asia/Kolkata"
+    assert frame["close"].iloc[-1] == 109.0
+
+
+def test_get_ohlcv_panel_batches_downloads(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append(list(tickers))
+        frames = {t: make_history(str(pd.Timestamp.now().date() - pd.Timedelta(days=9)), 10) for t in tickers}
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(data_provider, "ohlcv_store", OHLCVStore(str(tmp_path)))
+    monkeypatch.setattr(data_provider.yf, "download", fake_download)
+    monkeypatch.setattr(data_provider, "BULK_BATCH_SIZE", 2)
+
+    symbols = ["RELIANCE", "TCS", "INFY"]
+    panel = data_provider.get_ohlcv_panel(symbols, "1d", "5d")
+
+    assert calls == [["RELIANCE.NS", "TCS.NS"], ["INFY.NS"]]
+    assert panel.symbols == symbols
+    assert set(data_provider.get_bulk_quotes(symbols)) == set(symbols)
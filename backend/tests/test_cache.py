@@ -0,0 +1,120 @@
+import threading
+import time
+import pytest
+from services.cache import LRUCache, TTLCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_serves_stale_and_refreshes_in_background():
+    ttl = {"value": 60.0}
+    cache = TTLCache(maxsize=10, ttl=lambda: ttl["value"])
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return len(calls)
+
+    assert cache.get_or_fetch("RELIANCE", fetch) == 1
+    assert cache.get_or_fetch("RELIANCE", fetch) == 1
+    assert len(calls) == 1
+
+    # Expire the entry: the stale value comes back immediately
+    ttl["value"] = 0.0
+    assert cache.get_or_fetch("RELIANCE", fetch) == 1
+    assert cache.get_or_fetch("RELIANCE", fetch) == 1  # refresh already running
+    release.set()
+    cache._executor.shutdown(wait=True)
+
+    assert len(calls) == 2
+    assert cache.lookup("RELIANCE")[0] == 2
+
+
+def test_quotes_fetched_before_the_close_expire_after_it(monkeypatch):
+    from datetime import datetime
+    from services import data_provider
+    from services.market_status import IST, last_market_close
+
+    # Friday 2026-10-16 closed at 15:30; on Saturday morning that is still the last close
+    saturday = IST.localize(datetime(2026, 10, 17, 10, 0))
+    assert last_market_close(saturday) == IST.localize(datetime(2026, 10, 16, 15, 30))
+    assert last_market_close(IST.localize(datetime(2026, 10, 16, 12, 0))).day == 15
+
+    monkeypatch.setattr(data_provider, "get_current_ist_time", lambda: saturday)
+    monkeypatch.setattr(data_provider, "is_market_open", lambda: False)
+    cache = TTLCache(maxsize=10, ttl=data_provider._quote_ttl, fresh_since=data_provider._fresh_since)
+    cache.put("TCS", 1, age=(saturday - IST.localize(datetime(2026, 10, 16, 15, 0))).total_seconds())
+    cache.put("INFY", 2, age=(saturday - IST.localize(datetime(2026, 10, 16, 16, 0))).total_seconds())
+    assert cache.lookup("TCS") == (1, False)
+    assert cache.lookup("INFY") == (2, True)
+
+
+def test_ttl_cache_does_not_store_failed_fetch():
+    cache = TTLCache(maxsize=10, ttl=lambda: 60)
+    assert cache.get_or_fetch("RELIANCE", lambda: None) is None
+    assert len(cache) == 0
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    from services.data_provider import SingleFlight
+
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"close": 100.0}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("RELIANCE", fetch)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("RELIANCE", fetch))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    deadline = time.monotonic() + 5
+    while flight.shared < 4 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "shared": 4}
+
+    # The key is released once the call returns
+    flight.do("RELIANCE", fetch)
+    assert len(calls) == 2
+
+
+def test_single_flight_shares_exceptions():
+    from services.data_provider import SingleFlight
+
+    flight = SingleFlight()
+
+    def boom():
+        raise ValueError("provider down")
+
+    with pytest.raises(ValueError):
+        flight.do("TCS", boom)
+    assert flight.stats()["in_flight"] == 0
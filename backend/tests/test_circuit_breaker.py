@@ -0,0 +1,138 @@
+import time
+import pytest
+from services import data_provider
+from services.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, window=60, cooldown=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(False)
+    assert breaker.state == CLOSED
+
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2, slow_call_seconds=0.5)
+    breaker.record(True, latency=1.0)
+    breaker.record(True, latency=0.1)
+    assert breaker.state == CLOSED
+    breaker.record(True, latency=2.0)
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0.05)
+    breaker.record(False)
+    assert not breaker.allow()
+    time.sleep(0.06)
+
+    # Only one probe goes through while half-open
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True, latency=0.01)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_open_google_circuit_fails_over_to_yahoo(monkeypatch):
+    google = CircuitBreaker("google_quote", failure_threshold=2, cooldown=60)
+    monkeypatch.setitem(data_provider.breakers, "google_quote", google)
+    calls = []
+
+    def failing_get(url, timeout=None):
+        calls.append(url)
+        raise TimeoutError("google timed out")
+
+    monkeypatch.setattr(data_provider.session, "get", failing_get)
+    monkeypatch.setattr(
+        data_provider, "get_stock_info_yahoo",
+        lambda symbol, exchange="NSE": {"symbol": symbol, "currentPrice": 1.0}
+    )
+
+    for symbol in ["TCS", "INFY", "SBIN", "ITC"]:
+        assert data_provider.fetch_stock_info(symbol)["currentPrice"] == 1.0
+
+    # Google is only tried until the breaker opens
+    assert len(calls) == 2
+    assert google.state == OPEN
+
+
+def test_breakers_count_status_not_symbol_misses(monkeypatch):
+    import asyncio
+    from services import async_quotes
+
+    google = CircuitBreaker("google_quote", failure_threshold=2, cooldown=60)
+    monkeypatch.setitem(data_provider.breakers, "google_quote", google)
+    monkeypatch.setattr(async_quotes, "throttle_async", lambda provider: asyncio.sleep(0))
+    status = 404
+
+    async def fake_fetch(url):
+        return status, None
+
+    monkeypatch.setattr(async_quotes.quote_client, "fetch_text", fake_fetch)
+    # Unknown symbols are per-symbol misses, not an upstream outage
+    for symbol in ["NOPE1", "NOPE2", "NOPE3"]:
+        assert asyncio.run(async_quotes.get_stock_info_google_async(symbol)) is None
+    assert google.state == CLOSED
+
+    status = 503
+    for symbol in ["TCS", "INFY"]:
+        asyncio.run(async_quotes.get_stock_info_google_async(symbol))
+    assert google.state == OPEN
+
+
+def test_sync_index_fallback_records_throttling(monkeypatch):
+    class Response:
+        status_code = 429
+        text = ""
+
+    google = CircuitBreaker("google_quote", failure_threshold=2, cooldown=60)
+    monkeypatch.setitem(data_provider.breakers, "google_quote", google)
+    monkeypatch.setattr(data_provider, "get_index_value_yahoo", lambda index="NIFTY": None)
+    monkeypatch.setattr(data_provider, "throttle", lambda provider: 0.0)
+    monkeypatch.setattr(data_provider.session, "get", lambda url, timeout=None: Response())
+
+    data_provider.get_index_value("NIFTY")
+    data_provider.get_index_value("NIFTY")
+    assert google.state == OPEN
+
+
+def test_empty_yahoo_history_counts_as_failure(tmp_path, monkeypatch):
+    import pandas as pd
+    from services.ohlcv_store import OHLCVStore
+
+    history = CircuitBreaker("yahoo_history", failure_threshold=2, cooldown=60)
+    monkeypatch.setitem(data_provider.breakers, "yahoo_history", history)
+    monkeypatch.setattr(data_provider, "ohlcv_store", OHLCVStore(str(tmp_path)))
+    monkeypatch.setattr(data_provider, "throttle", lambda provider, tokens=1: 0.0)
+
+    # yfinance swallows an outage and hands back an empty frame
+    class EmptyTicker:
+        def __init__(self, symbol, session=None):
+            pass
+
+        def history(self, **kwargs):
+            return pd.DataFrame()
+
+    monkeypatch.setattr(data_provider.yf, "Ticker", EmptyTicker)
+    for symbol in ["TCS", "INFY"]:
+        assert data_provider._fetch_ohlcv_data(symbol, "1d", "1mo", "NSE", mock_fallback=False) is None
+    assert history.state == OPEN
+
+    bulk = CircuitBreaker("yahoo_history", failure_threshold=1, cooldown=60)
+    monkeypatch.setitem(data_provider.breakers, "yahoo_history", bulk)
+    monkeypatch.setattr(data_provider.yf, "download", lambda tickers, **kwargs: pd.DataFrame())
+    assert data_provider._download_history(["TCS", "INFY"], "1d", period="5d") == {}
+    assert bulk.state == OPEN
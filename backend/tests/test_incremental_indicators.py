@@ -0,0 +1,61 @@
+import json
+import numpy as np
+import pytest
+from services import data_provider
+from services.incremental_indicators import IndicatorState, load_states, save_states
+from services.indicator_engine import compute_indicators
+from services.intraday_archive import IntradayArchive
+from services.ohlcv_store import OHLCVStore
+from services.quote_stream import QuoteStream, ReplayQuoteSource
+from services.synthetic_data import generate_bars
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+def same(a, b):
+    # NaN-aware comparison of summary dicts
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+def test_matches_batch_engine_at_every_bar():
+    bars = generate_bars("TCS", 600, "5m", end="2024-06-28")
+    batch = compute_indicators(bars)
+    state = IndicatorState()
+
+    for i, bar in enumerate(zip(*(getattr(bars, c).tolist() for c in COLUMNS))):
+        values = state.update(*bar).values()
+        for name, value in values.items():
+            assert np.isclose(value, batch[name][i], equal_nan=True, rtol=1e-9, atol=1e-9), (name, i)
+        assert same(state.latest(), batch.latest(i)), i
+
+
+def test_state_survives_serialisation(tmp_path):
+    bars = generate_bars("INFY", 300, "1m", end="2024-06-28")
+    head, tail = bars.slice(None, int(bars.timestamp[249])), bars.slice(int(bars.timestamp[250]), None)
+
+    state = IndicatorState.from_bars(head)
+    restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+    for bar in zip(*(getattr(tail, c).tolist() for c in COLUMNS)):
+        state.update(*bar)
+        restored.update(*bar)
+    assert restored.latest() == state.latest() == compute_indicators(bars).latest()
+
+    path = str(tmp_path / "state.json")
+    assert save_states({"INFY": state}, path) == 1
+    assert load_states(path)["INFY"].latest() == state.latest()
+    assert load_states(str(tmp_path / "missing.json")) == {}
+
+
+def test_quote_stream_advances_indicator_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_provider, "ohlcv_store", OHLCVStore(str(tmp_path / "ohlcv")))
+    monkeypatch.setattr(data_provider, "intraday_archive", IntradayArchive(str(tmp_path / "archive")))
+    bars = generate_bars("TCS", 120, "1m", end="2024-06-28")
+    stream = QuoteStream(ReplayQuoteSource({"TCS": bars}))
+    for batch in stream.source.batches():
+        stream.ingest(batch)
+
+    # The last minute is still forming
+    completed = bars.slice(None, int(bars.timestamp[-2]))
+    assert stream.indicators["TCS"].bars == len(completed)
+    assert stream.latest_indicators("TCS") == compute_indicators(completed).latest()
+    assert stream.latest_indicators("INFY") is None
@@ -0,0 +1,34 @@
+import pytest
+from services import indicators
+from services.cache import LRUCache
+from services.synthetic_data import generate_bars
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = LRUCache(maxsize=2)
+    monkeypatch.setattr(indicators, "indicator_cache", cache)
+    return cache
+
+
+def test_memoised_per_bar(cache, monkeypatch):
+    bars = generate_bars("TCS", 120, "1d", end="2024-06-28")
+    first = indicators.calculate_all_indicators(bars, "TCS")
+    first["annotated"] = True
+    again = indicators.calculate_all_indicators(bars, "TCS")
+    assert "annotated" not in again and again == indicators.calculate_all_indicators(bars)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A forming bar that moved, another timeframe or another window is recomputed
+    moved = generate_bars("TCS", 120, "1d", end="2024-06-28")
+    moved.close[-1] += 1.0
+    indicators.calculate_all_indicators(moved, "TCS")
+    indicators.calculate_all_indicators(bars, "TCS", timeframe="1h")
+    indicators.calculate_all_indicators(bars.tail(60), "TCS")
+    assert cache.misses == 4 and cache.stats()["evictions"] == 2
+
+
+def test_uncached_without_symbol(cache):
+    bars = generate_bars("TCS", 60, "1d", end="2024-06-28")
+    indicators.calculate_all_indicators(bars)
+    assert len(cache) == 0
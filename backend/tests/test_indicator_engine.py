@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services import indicator_engine as engine
+from services.synthetic_data import generate_bars
+
+
+@pytest.fixture
+def bars():
+    return generate_bars("TCS", 400, "15m", end="2024-06-28")
+
+
+def reference_ema(close: pd.Series, length: int) -> pd.Series:
+    # pandas_ta's ema: SMA seed, then ewm(span, adjust=False)
+    close = close.loc[close.first_valid_index():].copy()
+    seed = close.iloc[:length].mean()
+    close.iloc[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def reference_rma(x: pd.Series, length: int) -> pd.Series:
+    return x.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+def test_linear_scan_matches_recurrence():
+    x = np.random.default_rng(0).normal(size=300)
+    expected, s = np.empty_like(x), 5.0
+    for i, value in enumerate(x):
+        s = 0.8 * s + value
+        expected[i] = s
+    assert np.allclose(engine.linear_scan(x, 0.8, carry=5.0), expected)
+
+
+def test_series_match_pandas_definitions(bars):
+    frame = bars.to_frame()
+    close = frame["close"]
+    series = engine.compute_indicators(bars)
+
+    change = close.diff()
+    gains = reference_rma(change.clip(lower=0).where(change.notna()), 14)
+    losses = reference_rma((-change).clip(lower=0).where(change.notna()), 14)
+    assert np.allclose(series["rsi"], 100 * gains / (gains + losses), equal_nan=True)
+
+    for length in (20, 50):
+        assert np.allclose(series[f"ema{length}"], reference_ema(close, length), equal_nan=True)
+    assert np.allclose(series["sma200"], close.rolling(200).mean(), equal_nan=True)
+
+    line = reference_ema(close, 12) - reference_ema(close, 26)
+    signal = reference_ema(line, 9).reindex(close.index)
+    assert np.allclose(series["macd"], line, equal_nan=True)
+    assert np.allclose(series["macd_signal"], signal, equal_nan=True)
+    assert np.allclose(series["macd_hist"], line - signal, equal_nan=True)
+
+    middle = close.rolling(20).mean()
+    std = close.rolling(20).std(ddof=0)
+    assert np.allclose(series["bb_middle"], middle, equal_nan=True)
+    assert np.allclose(series["bb_upper"], middle + 2 * std, equal_nan=True)
+    assert np.allclose(series["bb_lower"], middle - 2 * std, equal_nan=True)
+
+    previous = close.shift()
+    tr = pd.concat([frame["high"] - frame["low"], (frame["high"] - previous).abs(), (previous - frame["low"]).abs()], axis=1).max(axis=1)
+    tr.iloc[0] = np.nan
+    assert np.allclose(series["atr"], reference_rma(tr, 14), equal_nan=True)
+
+    typical = (frame["high"] + frame["low"] + close) / 3
+    day = frame.index.date
+    vwap = (typical * frame["volume"]).groupby(day).cumsum() / frame["volume"].groupby(day).cumsum()
+    assert np.allclose(series["vwap"], vwap)
+
+    volume = frame["volume"].astype(float)
+    assert np.array_equal(series["volume_spike"], (volume > volume.rolling(20).mean() * 1.5).to_numpy())
+
+
+def reference_supertrend(frame: pd.DataFrame, length: int = 7, multiplier: float = 3.0) -> pd.Series:
+    # pandas_ta's supertrend loop
+    ranges = pd.concat([
+        frame["high"] - frame["low"],
+        (frame["high"] - frame["close"].shift()).abs(),
+        (frame["low"] - frame["close"].shift()).abs(),
+    ], axis=1).max(axis=1).where(frame["close"].shift().notna())
+    width = multiplier * reference_rma(ranges, length)
+    upper = np.array((frame["high"] + frame["low"]) / 2 + width)
+    lower = np.array((frame["high"] + frame["low"]) / 2 - width)
+    close, trend, up = frame["close"].to_numpy(), np.full(len(frame), np.nan), 1
+    for i in range(1, len(frame)):
+        if close[i] > upper[i - 1]:
+            up = 1
+        elif close[i] < lower[i - 1]:
+            up = -1
+        else:
+            if up > 0 and lower[i] < lower[i - 1]:
+                lower[i] = lower[i - 1]
+            if up < 0 and upper[i] > upper[i - 1]:
+                upper[i] = upper[i - 1]
+        trend[i] = lower[i] if up > 0 else upper[i]
+    return trend
+
+
+def test_rolling_extremes_match_pandas():
+    x = np.random.default_rng(1).normal(size=(3, 250))
+    x[1, 100] = np.nan
+    for length in (1, 3, 20, 249, 250, 251):
+        frame = pd.DataFrame(x.T)
+        assert np.allclose(engine.rolling_max(x, length), frame.rolling(length).max().to_numpy().T, equal_nan=True)
+        assert np.allclose(engine.rolling_min(x, length), frame.rolling(length).min().to_numpy().T, equal_nan=True)
+
+
+def test_extended_series_match_pandas_definitions(bars):
+    frame = bars.to_frame()
+    high, low, close = frame["high"], frame["low"], frame["close"]
+    series = engine.compute_indicators(bars)
+
+    lowest, highest = low.rolling(14).min(), high.rolling(14).max()
+    stoch_k = (100 * (close - lowest) / (highest - lowest)).rolling(3).mean()
+    assert np.allclose(series["stoch_k"], stoch_k, equal_nan=True)
+    assert np.allclose(series["stoch_d"], stoch_k.rolling(3).mean(), equal_nan=True)
+
+    assert np.allclose(series["donchian_upper"], high.rolling(20).max(), equal_nan=True)
+    assert np.allclose(series["donchian_lower"], low.rolling(20).min(), equal_nan=True)
+    assert np.allclose(series["obv"], (np.sign(close.diff()).fillna(1) * frame["volume"]).cumsum())
+
+    up, down = high.diff(), -low.diff()
+    plus = up.where((up > down) & (up > 0), 0.0).where(up.notna())
+    minus = down.where((down > up) & (down > 0), 0.0).where(up.notna())
+    atr = pd.Series(series["atr"], index=frame.index)
+    plus_di = 100 * reference_rma(plus, 14) / atr
+    minus_di = 100 * reference_rma(minus, 14) / atr
+    adx = reference_rma(100 * (plus_di - minus_di).abs() / (plus_di + minus_di), 14)
+    assert np.allclose(series["plus_di"], plus_di, equal_nan=True)
+    assert np.allclose(series["adx"], adx, equal_nan=True)
+
+    assert np.allclose(series["supertrend"], reference_supertrend(frame), equal_nan=True)
+    direction = np.where(close > series["supertrend"], 1.0, -1.0)
+    assert np.array_equal(series["supertrend_direction"][20:], direction[20:])
+
+
+def test_latest_matches_prefix_and_fallbacks(bars):
+    series = engine.compute_indicators(bars)
+    assert series.latest(299) == engine.compute_indicators(bars.slice(None, int(bars.timestamp[299]))).latest()
+
+    short = engine.compute_indicators(bars.tail(15)).latest()
+    close = float(bars.close[-1])
+    assert short["macd"] == {"value": 0.0, "signal": 0.0, "histogram": 0.0}
+    assert short["bollingerBands"] == {"upper": close, "middle": close, "lower": close}
+    assert short["ema20"] == close and short["sma200"] == close
+    assert short["volumeSpike"] is False
+    assert short["donchianChannels"]["upper"] is None and short["adx"]["value"] is None
+
+
+def test_matches_pandas_ta(bars):
+    # Cross-check against pandas_ta where it is installed (optional dependency)
+    ta = pytest.importorskip("pandas_ta")
+    frame = bars.to_frame()
+    close, high, low, volume = frame["close"], frame["high"], frame["low"], frame["volume"]
+    series = engine.compute_indicators(bars)
+    macd = ta.macd(close, fast=12, slow=26, signal=9)
+    bands = ta.bbands(close, length=20, std=2)
+    expected = {
+        "rsi": ta.rsi(close, length=14),
+        "macd": macd["MACD_12_26_9"],
+        "macd_signal": macd["MACDs_12_26_9"],
+        "macd_hist": macd["MACDh_12_26_9"],
+        "ema20": ta.ema(close, length=20),
+        "ema50": ta.ema(close, length=50),
+        "sma200": ta.sma(close, length=200),
+        "bb_upper": bands["BBU_20_2.0"],
+        "bb_middle": bands["BBM_20_2.0"],
+        "bb_lower": bands["BBL_20_2.0"],
+        "vwap": ta.vwap(high, low, close, volume),
+        "atr": ta.atr(high, low, close, length=14),
+        "adx": ta.adx(high, low, close, length=14)["ADX_14"],
+        "stoch_k": ta.stoch(high, low, close)["STOCHk_14_3_3"],
+        "stoch_d": ta.stoch(high, low, close)["STOCHd_14_3_3"],
+        "supertrend": ta.supertrend(high, low, close, length=7, multiplier=3.0)["SUPERT_7_3.0"],
+        "obv": ta.obv(close, volume),
+        "donchian_upper": ta.donchian(high, low)["DCU_20_20"],
+        "donchian_lower": ta.donchian(high, low)["DCL_20_20"],
+    }
+    for name, values in expected.items():
+        assert np.allclose(series[name], values.to_numpy(dtype=float), rtol=1e-9, atol=1e-8, equal_nan=True), name
+
+
+def test_panel_matches_per_symbol_engine(bars):
+    from services.ohlcv import OHLCVPanel
+
+    gappy = bars.columns()
+    keep = np.ones(len(bars), dtype=bool)
+    keep[[50, 51, 200]] = False
+    series = {
+        "TCS": bars.columns(),
+        "INFY": bars.tail(120).columns(),
+        "SBIN": {col: values[keep] for col, values in gappy.items()},
+        "NEW": bars.tail(10).columns(),
+    }
+    panel = OHLCVPanel.from_series(series)
+    result = engine.compute_panel_indicators(panel)
+
+    for symbol in series:
+        expected = engine.compute_indicators(panel.ohlcv(symbol))
+        got = result.series(symbol)
+        assert result.bars(symbol) == len(expected)
+        assert np.array_equal(got.timestamp, expected.timestamp)
+        for name in expected.values:
+            assert np.allclose(got[name], expected[name], equal_nan=True), (symbol, name)
+        assert repr(result.latest(symbol)) == repr(expected.latest())
+    assert result.latest("WIPRO") is None
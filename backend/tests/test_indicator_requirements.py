@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from services import indicator_engine as engine
+from services.indicators import calculate_all_indicators, indicator_cache
+from services.signal_generator import generate_signal, strategy_requirements
+from services.synthetic_data import generate_bars
+
+
+@pytest.fixture
+def bars():
+    return generate_bars("TCS", 300, "1d", end="2024-06-28")
+
+
+def test_requirements_gathered_from_configs():
+    assert strategy_requirements({}) <= engine.BASE_REQUIREMENTS
+    config = {"rsi_macd": {"rsi_period": 9}, "vwap_reversal": {"rsi_period": 9},
+              "ema_crossover": {"fast_period": 12, "slow_period": 26}}
+    requirements = strategy_requirements(config)
+    # Shared pairs appear once, whichever strategies declare them
+    assert sorted(r for r in requirements if r[0] == "rsi") == [("rsi", 9)]
+    assert {("ema", 12), ("ema", 26), ("macd", 12, 26, 9)} <= requirements
+
+
+def test_shared_intermediates_computed_once(bars, monkeypatch):
+    calls = []
+    real_ema = engine.ema
+    monkeypatch.setattr(engine, "ema", lambda x, n: calls.append(n) or real_ema(x, n))
+    tuned = engine.compute_requirements(
+        bars.high, bars.low, bars.close, {("ema", 12), ("ema", 26), ("macd", 12, 26, 9), ("macd", 12, 26, 5)}
+    )
+    # EMA 12 and 26 serve both crossovers and both MACDs; plus one signal line per MACD
+    assert sorted(calls) == [5, 9, 12, 26]
+    assert np.array_equal(tuned["ema_12"]["value"], real_ema(bars.close, 12), equal_nan=True)
+
+
+def test_tuned_values_match_kernels(bars):
+    requirements = {("rsi", 9), ("bbands", 10, 2.5), ("sma", 30), ("atr", 7)}
+    series = engine.compute_indicators(bars, requirements)
+    close = bars.close
+    assert np.allclose(series.tuned["rsi_9"]["value"], engine.rsi(close - engine.shift(close), 9), equal_nan=True)
+    middle = close.copy()
+    middle[:] = np.nan
+    for i in range(9, len(close)):
+        middle[i] = close[i - 9:i + 1].mean()
+    assert np.allclose(series.tuned["bbands_10_2.5"]["middle"], middle, equal_nan=True)
+    assert np.allclose(series.tuned["sma_30"]["value"], engine.sma(close, 30), equal_nan=True)
+
+    latest = series.latest()
+    assert latest["tuned"]["rsi_9"] == round(float(series.tuned["rsi_9"]["value"][-1]), 2)
+    assert set(latest["tuned"]["bbands_10_2.5"]) == {"upper", "middle", "lower"}
+    # Standard requirements are not duplicated under 'tuned'
+    assert "tuned" not in engine.compute_indicators(bars, engine.BASE_REQUIREMENTS).latest()
+
+
+def test_tuned_rsi_period_changes_strategy_input(bars):
+    config = {"rsi_macd": {"rsi_period": 3, "rsi_oversold": 30, "rsi_overbought": 70}}
+    indicator_cache.clear()
+    indicators = calculate_all_indicators(bars, "TCS", requirements=strategy_requirements(config))
+    fast_rsi = indicators["tuned"]["rsi_3"]
+    assert fast_rsi != indicators["rsi"]
+
+    # Make only the tuned RSI oversold: the strategy must act on it
+    indicators["rsi"], indicators["tuned"]["rsi_3"] = 50.0, 10.0
+    price = float(bars.close[-1])
+    assert generate_signal("TCS", price, indicators, "rsi_macd", config)["signal"] == "BUY"
+    assert generate_signal("TCS", price, indicators, "rsi_macd")["signal"] == "HOLD"
+
+    # Different requirements are memoised separately
+    assert "tuned" not in calculate_all_indicators(bars, "TCS")
+
+
+def test_panel_tuned_matches_per_symbol(bars):
+    from services.ohlcv import OHLCVPanel
+
+    requirements = {("rsi", 9), ("ema", 12), ("macd", 8, 21, 5)}
+    series = {"TCS": bars.columns(), "INFY": bars.tail(120).columns()}
+    panel = OHLCVPanel.from_series(series)
+    result = engine.compute_panel_indicators(panel, requirements)
+    for symbol in series:
+        expected = engine.compute_indicators(panel.ohlcv(symbol), requirements)
+        assert repr(result.latest(symbol)) == repr(expected.latest())
@@ -1,7 +1,7 @@
 import pytest
 import pandas as pd
 import numpy as np
-from services.indicators import calculate_rsi, calculate_macd, calculate_bollinger_bands, calculate_vwap, calculate_all_indicators
+from services.indicators import calculate_rsi, calculate_macd, calculate_bollinger_bands, calculate_vwap, calculate_all_indicators, get_indicator_signals
 
 @pytest.fixture
 def sample_data():
@@ -78,3 +78,16 @@ def test_calculate_all_indicators(sample_data):
     assert 'bollingerBands' in indicators
     assert 'vwap' in indicators
     assert 'ema20' in indicators
+
+
+def test_indicator_signals_with_missing_values():
+    signals = get_indicator_signals({
+        'rsi': 25,
+        'macd': {'macd': None, 'signal': None, 'histogram': None},
+        'volumeSpike': True
+    })
+    assert signals == [
+        "RSI oversold (<30)",
+        "MACD bearish (histogram negative)",
+        "High volume spike detected"
+    ]
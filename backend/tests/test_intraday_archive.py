@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from services import data_provider
+from services.intraday_archive import IntradayArchive, HEADER_SIZE, RECORD_DTYPE
+from services.synthetic_data import generate_bars
+
+
+def test_append_skips_already_archived_bars(tmp_path):
+    archive = IntradayArchive(str(tmp_path))
+    bars = generate_bars("TCS", 300, "1m", end="2024-06-28")
+
+    assert archive.append("TCS", bars.slice(None, int(bars.timestamp[199]))) == 200
+    # Overlapping batch: only the 100 newer bars are written
+    assert archive.append("TCS", bars) == 100
+    assert archive.append("TCS", bars) == 0
+
+    records = archive.records("TCS")
+    assert len(records) == 300
+    assert np.array_equal(records["timestamp"], bars.timestamp)
+    assert np.allclose(records["close"], bars.close)
+    assert archive.last_timestamp("TCS") == int(bars.timestamp[-1])
+    assert archive.records("INFY") is None
+
+
+def test_range_returns_views_into_the_mapping(tmp_path):
+    archive = IntradayArchive(str(tmp_path))
+    bars = generate_bars("TCS", 750, "1m", end="2024-06-28")
+    archive.append("TCS", bars)
+
+    start, end = int(bars.timestamp[100]), int(bars.timestamp[199])
+    window = archive.range("TCS", start, end)
+    assert len(window) == 100
+    assert window.timestamp[0] == start and window.timestamp[-1] == end
+    assert np.shares_memory(window.close, archive.records("TCS"))
+    assert len(archive.range("TCS", end + 1, end + 30)) == 0
+
+
+def test_rejects_unordered_bars_and_foreign_files(tmp_path):
+    archive = IntradayArchive(str(tmp_path))
+    bars = generate_bars("TCS", 10, "1m", end="2024-06-28")
+    reversed_bars = type(bars).from_columns({c: getattr(bars, c)[::-1] for c in RECORD_DTYPE.names})
+    with pytest.raises(ValueError):
+        archive.append("TCS", reversed_bars)
+
+    path = tmp_path / "NSE" / "INFY_1m.bars"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * (HEADER_SIZE + RECORD_DTYPE.itemsize))
+    with pytest.raises(ValueError):
+        archive.records("INFY")
+
+
+def test_only_completed_bars_are_archived(tmp_path, monkeypatch):
+    archive = IntradayArchive(str(tmp_path))
+    monkeypatch.setattr(data_provider, "intraday_archive", archive)
+    bars = generate_bars("TCS", 30, "1m", end="2024-06-28")
+    # "Now" falls inside the last bar, which is still forming
+    now_ns = int(bars.timestamp[-1]) + 30 * 10**9
+
+    data_provider._archive_completed("TCS", "1m", "NSE", bars.columns(), now_ns)
+    assert archive.last_timestamp("TCS") == int(bars.timestamp[-2])
+    data_provider._archive_completed("TCS", "5m", "NSE", bars.columns(), now_ns)
+    assert archive.records("TCS", "5m") is None
@@ -0,0 +1,145 @@
+import pytest
+from services import multi_timeframe
+from services.indicators import calculate_all_indicators
+from services.resampler import resample
+from services.signal_generator import generate_signal
+from services.synthetic_data import generate_bars
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+    periods = []
+    bars = {
+        "15m": generate_bars("TCS", 3000, "15m", end="2024-06-28"),
+        "1d": generate_bars("TCS", 120, "1d", end="2024-06-28"),
+    }
+
+    def fake_live_ohlcv(symbol, timeframe, period, exchange, mock_fallback=True):
+        assert not mock_fallback
+        calls.append(timeframe)
+        periods.append(period)
+        return bars[timeframe]
+
+    monkeypatch.setattr(multi_timeframe, "get_live_ohlcv", fake_live_ohlcv)
+    return calls, bars, periods
+
+
+def test_one_fetch_serves_every_timeframe(fetches):
+    calls, bars, periods = fetches
+    indicators, sources = multi_timeframe.get_multi_timeframe_indicators("TCS", ["1d", "15m", "1h"])
+    assert calls == ["15m"]
+    assert list(sources) == ["15m", "1h", "1d"] and sources["1h"] == "resampled"
+    assert indicators == {**calculate_all_indicators(bars["15m"]), "mtf": indicators["mtf"]}
+
+    hourly = resample(bars["15m"], "1h")
+    expected = calculate_all_indicators(hourly.slice(int(hourly.timestamp[1]), None))
+    assert indicators["mtf"]["1h"] == expected
+    assert set(indicators["mtf"]) == {"1h", "1d"}
+
+
+def test_short_derived_history_is_fetched(fetches):
+    calls, bars, periods = fetches
+    bars["15m"] = bars["15m"].tail(1000)  # 40 sessions: too few daily bars
+    indicators, sources = multi_timeframe.get_multi_timeframe_indicators("TCS", ["15m", "1d"])
+    assert calls == ["15m", "1d"] and sources == {"15m": "fetched", "1d": "fetched"}
+    assert indicators["mtf"]["1d"] == calculate_all_indicators(bars["1d"])
+    # 3mo of 15m bars is past the provider's limit; 1d takes its own period
+    assert periods == ["1mo", "6mo"]
+
+
+def test_no_indicators_without_provider_bars(fetches):
+    calls, bars, periods = fetches
+    bars["15m"] = None
+    assert multi_timeframe.get_multi_timeframe_indicators("TCS", ["15m", "1h"]) == (None, {})
+
+
+def test_unknown_timeframe_rejected():
+    with pytest.raises(ValueError):
+        multi_timeframe.order_timeframes(["15m", "2h"])
+
+
+def test_higher_timeframe_confirmation():
+    indicators = {"rsi": 20, "macd": {"histogram": 2}, "atr": 5.0, "ema20": 100, "ema50": 100,
+                  "mtf": {"1h": {"ema20": 95.0, "ema50": 100.0}}}
+    config = {"rsi_macd": {"confirm_timeframe": "1h"}}
+    assert generate_signal("TCS", 100.0, indicators, "rsi_macd")["signal"] == "BUY"
+
+    vetoed = generate_signal("TCS", 100.0, indicators, "rsi_macd", config)
+    assert vetoed["signal"] == "HOLD" and vetoed["confirmation"] == {"timeframe": "1h", "trend": "SELL"}
+
+    indicators["mtf"]["1h"]["ema20"] = 105.0
+    unconfirmed = generate_signal("TCS", 100.0, indicators, "rsi_macd")
+    confirmed = generate_signal("TCS", 100.0, indicators, "rsi_macd", config)
+    assert confirmed["signal"] == "BUY" and confirmed["confidence"] == min(unconfirmed["confidence"] + 10, 100)
+
+
+def falling_bars(n, timeframe, end="2024-06-28"):
+    from services.ohlcv import OHLCVBars
+    from services.resampler import NS_PER_MINUTE, TIMEFRAME_MINUTES
+    import numpy as np
+
+    step = TIMEFRAME_MINUTES[timeframe] * NS_PER_MINUTE
+    stamps = generate_bars("TCS", n, timeframe, end=end).timestamp
+    close = np.linspace(200.0, 100.0, n)
+    return OHLCVBars(stamps, close, close + 1, close - 1, close, np.full(n, 1000))
+
+
+def test_scanner_vetoes_against_confirm_timeframe(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from services import signal_service
+    from services.synthetic_data import generate_panel
+
+    symbols = [f"SYN{i:05d}" for i in range(40)]
+    panel = generate_panel(symbols, days=80, end="2024-06-28", seed=3)
+    monkeypatch.setattr(signal_service, "get_ohlcv_panel", lambda *args, **kwargs: panel)
+    fetched = []
+
+    def fake_live_ohlcv(symbol, timeframe, period, exchange, mock_fallback=True):
+        fetched.append((symbol, timeframe))
+        return falling_bars(120, timeframe)
+
+    monkeypatch.setattr(multi_timeframe, "get_live_ohlcv", fake_live_ohlcv)
+
+    def scan(config):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return {s["symbol"]: s for s in signal_service._scan_shard(symbols, config, 0, executor)["signals"]}
+
+    plain = scan({})
+    assert fetched == [] and {s["signal"] for s in plain.values()} >= {"BUY", "SELL"}
+
+    confirmed = scan({"combined": {"confirm_timeframe": "1h"}})
+    assert {tf for _, tf in fetched} == {"1h"}
+    # Every 1h trend is down: BUYs are vetoed to HOLD (dropped), SELLs gain confidence
+    assert {s["signal"] for s in confirmed.values()} == {"SELL"}
+    for symbol, signal in confirmed.items():
+        assert signal["confirmation"] == {"timeframe": "1h", "trend": "SELL"}
+        assert signal["confidence"] == min(plain[symbol]["confidence"] + 10, 100)
+
+
+def test_backtest_signals_confirm_per_bar():
+    import numpy as np
+    from services.resampler import resample
+    from services.signal_batch import signal_series
+
+    bars = generate_bars("TCS", 2000, "15m", end="2024-06-28")
+    hourly = resample(bars, "1h")
+    trend = multi_timeframe.higher_timeframe_trend(bars, "15m", hourly, "1h")
+    # A 15m bar only sees 1h bars that have closed by its own close
+    ends = hourly.timestamp + 3600 * 10**9
+    i = 1000
+    seen = np.flatnonzero(ends <= bars.timestamp[i] + 900 * 10**9)[-1]
+    expected = calculate_all_indicators(hourly.slice(None, int(hourly.timestamp[seen])))
+    code = {"BUY": 1, "SELL": 2, "HOLD": 0}
+    direction = "BUY" if expected["ema20"] > expected["ema50"] else "SELL" if expected["ema20"] < expected["ema50"] else "HOLD"
+    assert trend[i] == code[direction]
+    closed = np.searchsorted(ends, bars.timestamp + 900 * 10**9, side="right")
+    assert ((trend == -1) == (closed < 50)).all()
+
+    config = {"rsi_macd": {"confirm_timeframe": "1h"}}
+    plain = signal_series(bars, "rsi_macd")
+    confirmed = signal_series(bars, "rsi_macd", config, trend=trend)
+    disagree = (plain.signal != 0) & (trend != -1) & (trend != plain.signal)
+    assert disagree.any() and (confirmed.signal[disagree] == 0).all()
+    agree = (plain.signal != 0) & (trend == plain.signal)
+    assert (confirmed.confidence[agree] == np.minimum(plain.confidence[agree] + 10, 100)).all()
@@ -0,0 +1,83 @@
+import pytest
+import pandas as pd
+import numpy as np
+from services.ohlcv_store import OHLCVStore, frame_to_columns
+from services import data_provider
+
+
+def make_history(start: str, periods: int, base: float = 100.0) -> pd.DataFrame:
+    """Build a yfinance-shaped daily history frame."""
+    index = pd.date_range(start=start, periods=periods, freq="D", tz="Asia/Kolkata")
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "Open": close - 1,
+        "High": close + 2,
+        "Low": close - 2,
+        "Close": close,
+        "Volume": np.full(periods, 1000),
+    }, index=index)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(str(tmp_path))
+
+
+def test_save_and_load_roundtrip(store):
+    columns = frame_to_columns(make_history("2024-01-01", 5))
+    store.merge("RELIANCE", "1d", "NSE", columns, covered_from=0)
+
+    loaded = store.load("RELIANCE", "1d", "NSE")
+    assert loaded is not None
+    np.testing.assert_array_equal(loaded["timestamp"], columns["timestamp"])
+    np.testing.assert_array_equal(loaded["close"], columns["close"])
+    assert loaded["covered_from"] == 0
+    assert store.load("TCS", "1d", "NSE") is None
+
+
+def test_merge_replaces_overlapping_bars(store):
+    store.merge("RELIANCE", "1d", "NSE", frame_to_columns(make_history("2024-01-01", 5)), covered_from=0)
+
+    # Top-up overlapping the last stored bar with a revised close
+    top_up = make_history("2024-01-05", 3, base=500.0)
+    merged = store.merge("RELIANCE", "1d", "NSE", frame_to_columns(top_up))
+
+    assert len(merged["timestamp"]) == 7
+    assert np.all(np.diff(merged["timestamp"]) > 0)
+    assert merged["close"][4] == 500.0
+    assert merged["covered_from"] == 0
+    assert store.last_timestamp("RELIANCE", "1d", "NSE") == merged["timestamp"][-1]
+
+
+def test_get_ohlcv_data_only_fetches_new_bars(store, monkeypatch):
+    calls = []
+
+    class FakeTicker:
+        def __init__(self, symbol, session=None):
+            pass
+
+        def history(self, period=None, interval=None, start=None):
+            calls.append({"period": period, "start": start})
+            if start is None:
+                return make_history(str(pd.Timestamp.now().date() - pd.Timedelta(days=9)), 10)
+            return make_history(str(start.tz_convert("Asia/Kolkata").date()), 1, base=999.0)
+
+    monkeypatch.setattr(data_provider, "ohlcv_store", store)
+    monkeypatch.setattr(data_provider, "_series_refreshed", {})
+    monkeypatch.setattr(data_provider.yf, "Ticker", FakeTicker)
+
+    # Stored series are always treated as due for a top-up
+    monkeypatch.setattr(data_provider, "_quote_ttl", lambda: 0)
+    first = data_provider.get_ohlcv_data("RELIANCE", "1d", "5d")
+    second = data_provider.get_ohlcv_data("RELIANCE", "1d", "5d")
+
+    assert calls[0]["period"] == "5d"
+    assert calls[1]["period"] is None and calls[1]["start"] is not None
+    assert first.timestamp[-1] == second.timestamp[-1]
+    assert second.close[-1] == 999.0
+
+    # A freshly topped-up series is served without a provider call
+    monkeypatch.setattr(data_provider, "_quote_ttl", lambda: 60)
+    third = data_provider.get_ohlcv_data("RELIANCE", "1d", "5d")
+    assert len(calls) == 2
+    assert third.close[-1] == 999.0
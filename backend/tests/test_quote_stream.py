@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+from services import data_provider, quote_stream
+from services.intraday_archive import IntradayArchive
+from services.ohlcv_store import OHLCVStore
+from services.quote_stream import BarAggregator, QuoteStream, ReplayQuoteSource, get_live_ohlcv
+from services.resampler import resample
+from services.synthetic_data import generate_bars
+
+MINUTE = 60 * 10**9
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_provider, "ohlcv_store", OHLCVStore(str(tmp_path / "ohlcv")))
+    monkeypatch.setattr(data_provider, "intraday_archive", IntradayArchive(str(tmp_path / "archive")))
+    return tmp_path
+
+
+def test_aggregator_builds_minute_bars():
+    bars = generate_bars("TCS", 3, "1m", end="2024-06-28")
+    t0 = int(bars.timestamp[0])
+    agg = BarAggregator()
+
+    assert agg.update("TCS", t0 + 1 * 10**9, 100.0, 1000) is None
+    agg.update("TCS", t0 + 20 * 10**9, 103.0, 1500)
+    agg.update("TCS", t0 + 40 * 10**9, 99.0, 1700)
+    agg.update("TCS", t0 + 59 * 10**9, 101.0, 2000)
+    completed = agg.update("TCS", t0 + MINUTE, 102.0, 2100)
+
+    assert completed == {"timestamp": t0, "open": 100.0, "high": 103.0, "low": 99.0, "close": 101.0, "volume": 1000}
+    assert agg.forming("TCS")["volume"] == 100
+    # A tick for the closed minute is dropped
+    assert agg.update("TCS", t0 + 30 * 10**9, 500.0, 2200) is None and agg.late_ticks == 1
+    assert agg.close_due(t0 + MINUTE + 30 * 10**9) == []
+    assert [s for s, _ in agg.close_due(t0 + 2 * MINUTE)] == ["TCS"]
+
+
+def test_replayed_ticks_rebuild_the_stored_bars(stores):
+    bars = {s: generate_bars(s, 60, "1m", end="2024-06-28") for s in ("TCS", "INFY")}
+    stream = QuoteStream(ReplayQuoteSource(bars))
+    for batch in stream.source.batches():
+        stream.ingest(batch)
+
+    for symbol, expected in bars.items():
+        stored = data_provider.ohlcv_store.load(symbol, "1m", "NSE")
+        # The last minute is still forming on the replay clock
+        assert np.array_equal(stored["timestamp"], expected.timestamp[:-1])
+        for col in ("open", "high", "low", "close"):
+            assert np.allclose(stored[col], getattr(expected, col)[:-1])
+        assert np.array_equal(stored["volume"], expected.volume[:-1])
+        assert stream.aggregator.forming(symbol)["timestamp"] == expected.timestamp[-1]
+        assert len(data_provider.intraday_archive.records(symbol)) == 59
+    assert stream.bars_completed == 118
+
+
+def test_live_ohlcv_appends_forming_bar(stores, monkeypatch):
+    bars = generate_bars("TCS", 45, "1m", end="2024-06-28")
+    stream = QuoteStream(ReplayQuoteSource({"TCS": bars}))
+    for batch in stream.source.batches():
+        stream.ingest(batch)
+    monkeypatch.setattr(quote_stream, "quote_stream", stream)
+    # The first streamed bars fall short of the period, so history is fetched once
+    monkeypatch.setattr(data_provider, "get_ohlcv_data", lambda *args, **kwargs: bars.slice(None, int(bars.timestamp[-2])))
+
+    live = get_live_ohlcv("TCS", "1m", "1d")
+    assert np.array_equal(live.timestamp, bars.timestamp)
+    assert live.close[-1] == pytest.approx(bars.close[-1])
+
+    live_5m = get_live_ohlcv("TCS", "5m", "1d")
+    assert np.allclose(live_5m.close, resample(bars, "5m").close)
+
+
+def test_unreported_volume_is_never_stored(stores):
+    bars = generate_bars("TCS", 5, "1m", end="2024-06-28")
+    t0 = int(bars.timestamp[0])
+    stream = QuoteStream(source=None)
+    for i in range(4):
+        stream.ingest([("TCS", t0 + i * MINUTE + 10**9, 100.0 + i, None)])
+
+    completed = stream.ingest([], now_ns=t0 + 4 * MINUTE)
+    assert completed["TCS"][0]["volume"] is None
+    assert data_provider.ohlcv_store.load("TCS", "1m", "NSE") is None
+    assert data_provider.intraday_archive.records("TCS") is None
+    # Indicators still follow the prices; volume-based ones see no volume
+    state = stream.indicators["TCS"]
+    assert state.bars == 4 and state.close == 103.0 and state.obv.value == 0.0
+
+
+def test_streamed_bars_do_not_replace_stored_bars(stores):
+    bars = generate_bars("TCS", 6, "1m", end="2024-06-28")
+    provider = {col: getattr(bars, col)[:4] for col in ("timestamp", "open", "high", "low", "close", "volume")}
+    data_provider.ohlcv_store.merge("TCS", "1m", "NSE", provider)
+
+    stream = QuoteStream(source=None)
+    ticks = [("TCS", int(ts) + 10**9, 1.0, 5000 + i) for i, ts in enumerate(bars.timestamp)]
+    for tick in ticks:
+        stream.ingest([tick])
+
+    stored = data_provider.ohlcv_store.load("TCS", "1m", "NSE")
+    assert np.array_equal(stored["timestamp"], bars.timestamp[:5])
+    assert np.array_equal(stored["close"][:4], bars.close[:4])
+    assert np.array_equal(stored["volume"][:4], bars.volume[:4])
+    assert stored["close"][4] == 1.0 and stored["volume"][4] == 1
+    assert data_provider.intraday_archive.records("TCS")["timestamp"].tolist() == [bars.timestamp[4]]
+
+
+def test_polled_quotes_only_report_real_volume():
+    assert data_provider.reported_volume({"volume": 1000000, "volumeReported": False}) is None
+    assert data_provider.reported_volume({"volume": 1000000}) is None
+    assert data_provider.reported_volume({"volume": 123456, "volumeReported": True}) == 123456
+
+
+def test_long_periods_are_not_fetched_at_1m(stores, monkeypatch):
+    bars = generate_bars("TCS", 45, "1m", end="2024-06-28")
+    stream = QuoteStream(ReplayQuoteSource({"TCS": bars}))
+    for batch in stream.source.batches():
+        stream.ingest(batch)
+    monkeypatch.setattr(quote_stream, "quote_stream", stream)
+    hourly = resample(bars.slice(None, int(bars.timestamp[-2])), "1h")
+    calls = []
+
+    def fake_ohlcv(symbol, timeframe, period, exchange, mock_fallback=True):
+        calls.append((timeframe, period))
+        return hourly if timeframe == "1h" else bars.slice(None, int(bars.timestamp[-2]))
+
+    monkeypatch.setattr(data_provider, "get_ohlcv_data", fake_ohlcv)
+    live = get_live_ohlcv("TCS", "1h", "3mo")
+    assert calls == [("1h", "3mo")]
+    expected = resample(bars, "1h")
+    assert np.array_equal(live.timestamp, expected.timestamp)
+    for col in ("open", "high", "low", "close"):
+        assert np.allclose(getattr(live, col), getattr(expected, col))
+
+    get_live_ohlcv("TCS", "1m", "3mo")
+    assert calls[-1] == ("1m", "7d")
+
+
+def test_stale_store_is_topped_up_before_the_forming_bar(stores, monkeypatch):
+    bars = generate_bars("TCS", 40, "1m", end="2024-06-28")
+    columns = {col: getattr(bars, col)[:20] for col in ("timestamp", "open", "high", "low", "close", "volume")}
+    data_provider.ohlcv_store.merge("TCS", "1m", "NSE", columns, covered_from=int(bars.timestamp[0]) - 2 * 86400 * 10**9)
+
+    # Polled quotes leave the store behind the forming bar
+    stream = QuoteStream(source=None)
+    stream.ingest([("TCS", int(bars.timestamp[-1]) + 10**9, float(bars.close[-1]), None)])
+    monkeypatch.setattr(quote_stream, "quote_stream", stream)
+    calls = []
+
+    def fake_ohlcv(symbol, timeframe, period, exchange, mock_fallback=True):
+        calls.append((timeframe, period))
+        return bars.slice(None, int(bars.timestamp[-2]))
+
+    monkeypatch.setattr(data_provider, "get_ohlcv_data", fake_ohlcv)
+    live = get_live_ohlcv("TCS", "1m", "1d")
+    assert calls == [("1m", "1d")]
+    assert np.array_equal(live.timestamp, bars.timestamp)
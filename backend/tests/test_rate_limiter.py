@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+import pytest
+from services.rate_limiter import (
+    TokenBucket,
+    PRIORITY_USER,
+    PRIORITY_BACKGROUND,
+    request_priority,
+    current_priority,
+)
+
+
+def test_acquire_waits_for_refill():
+    bucket = TokenBucket("test", rate=50, capacity=2)
+    assert bucket.acquire() < 0.01
+    assert bucket.acquire() < 0.01
+
+    waited = bucket.acquire()
+    assert 0.01 < waited < 0.5
+    stats = bucket.stats()
+    assert stats["calls"] == 3
+    assert stats["waited"] == 1
+    assert stats["max_wait"] == pytest.approx(waited)
+
+
+def test_user_requests_jump_ahead_of_background():
+    bucket = TokenBucket("test", rate=20, capacity=1)
+    bucket.acquire()  # drain the bucket
+    order = []
+
+    def worker(name, priority):
+        bucket.acquire(priority=priority)
+        order.append(name)
+
+    background = [threading.Thread(target=worker, args=(f"bg{i}", PRIORITY_BACKGROUND)) for i in range(3)]
+    for t in background:
+        t.start()
+    while bucket.stats()["queued"] < 3:
+        time.sleep(0.001)
+
+    user = threading.Thread(target=worker, args=("user", PRIORITY_USER))
+    user.start()
+    for t in [*background, user]:
+        t.join(5)
+
+    assert order[0] == "user"
+    assert set(bucket.stats()["by_priority"]) == {str(PRIORITY_USER), str(PRIORITY_BACKGROUND)}
+
+
+def test_async_acquire_and_priority_context():
+    bucket = TokenBucket("test", rate=50, capacity=1)
+    assert current_priority() == PRIORITY_USER
+    with request_priority(PRIORITY_BACKGROUND):
+        assert current_priority() == PRIORITY_BACKGROUND
+        asyncio.run(bucket.acquire_async())
+        waited = asyncio.run(bucket.acquire_async())
+    assert current_priority() == PRIORITY_USER
+    assert waited > 0.005
+    assert bucket.stats()["by_priority"][str(PRIORITY_BACKGROUND)]["calls"] == 2
+
+
+def test_charges_above_capacity_wait_for_full_cost():
+    # A 6-token batch on a 2-token bucket still pays for all 6 tokens
+    bucket = TokenBucket("test", rate=50, capacity=2)
+    waited = bucket.acquire(6)
+    assert waited >= 0.07
+    assert bucket.stats()["available"] < 1
+
+    bucket = TokenBucket("test", rate=50, capacity=2)
+    waited = asyncio.run(bucket.acquire_async(6))
+    assert waited >= 0.07
@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+import pandas as pd
+from services import data_provider
+from services.ohlcv import OHLCVBars
+from services.ohlcv_store import frame_to_columns
+from services.replay_provider import ReplayDataProvider
+from tests.test_ohlcv_store import make_history
+
+
+@pytest.fixture
+def replay(tmp_path):
+    provider = ReplayDataProvider(str(tmp_path))
+    provider.record("RELIANCE", "1d", OHLCVBars.from_columns(frame_to_columns(make_history("2024-01-01", 60))))
+    provider.record("NIFTY", "1d", OHLCVBars.from_columns(frame_to_columns(make_history("2024-01-01", 60, base=21000.0))), exchange="INDEX")
+    return provider
+
+
+def test_replay_serves_fixture_windows(replay):
+    bars = replay.get_ohlcv_data("RELIANCE", period="5d", interval="1d")
+    assert len(bars) == 6  # window anchored on the last bar, inclusive
+    assert bars.close[-1] == 159.0
+    assert replay.get_ohlcv_data("TCS") is None
+
+    quote = replay.get_stock_info("RELIANCE")
+    assert quote["currentPrice"] == 159.0
+    assert quote["previousClose"] == 158.0
+
+    index = replay.get_index_value("NIFTY")
+    assert index["value"] == 21059.0 and index["change"] == 1.0
+
+
+def test_replay_clock_hides_future_bars(replay):
+    pinned = ReplayDataProvider(replay.root, as_of="2024-01-10")
+    bars = pinned.get_ohlcv_data("RELIANCE", period="1y")
+    assert len(bars) == 10
+    assert pinned.get_stock_info("RELIANCE")["currentPrice"] == 109.0
+
+
+def test_replay_reads_naive_csv(tmp_path):
+    (tmp_path / "NSE").mkdir()
+    pd.DataFrame({
+        "timestamp": ["2024-01-02 09:15", "2024-01-01 09:15"],
+        "open": [2.0, 1.0], "high": [2.0, 1.0], "low": [2.0, 1.0],
+        "close": [2.0, 1.0], "volume": [20, 10],
+    }).to_csv(tmp_path / "NSE" / "TCS_1d.csv", index=False)
+
+    bars = ReplayDataProvider(str(tmp_path)).get_ohlcv_data("TCS", period="max")
+    assert bars.close.tolist() == [1.0, 2.0]
+    assert bars.to_records()[0]["timestamp"] == "2024-01-01T09:15:00+05:30"
+
+
+def test_module_functions_delegate_when_replay_selected(replay, monkeypatch):
+    monkeypatch.setattr(data_provider.settings, "data_provider", "replay")
+    monkeypatch.setattr(data_provider, "_replay", replay)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("live provider called in replay mode")
+
+    monkeypatch.setattr(data_provider.yf, "Ticker", no_network)
+    monkeypatch.setattr(data_provider.yf, "download", no_network)
+
+    assert data_provider.get_data_provider() is replay
+    assert len(data_provider.get_ohlcv_data("RELIANCE", "1d", "1mo")) == 31
+    assert data_provider.get_stock_info("RELIANCE")["currentPrice"] == 159.0
+    assert data_provider.get_ohlcv_panel(["RELIANCE", "TCS"], "1d", "3mo").symbols == ["RELIANCE"]
+    assert [s["symbol"] for s in data_provider.get_all_nifty50_stocks()] == ["RELIANCE"]
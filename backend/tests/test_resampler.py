@@ -0,0 +1,64 @@
+import pytest
+import numpy as np
+import pandas as pd
+from services import data_provider
+from services.circuit_breaker import CircuitBreaker
+from services.ohlcv_store import OHLCVStore
+from services.resampler import resample
+from services.synthetic_data import generate_panel
+
+
+def minute_bars(days=3, end="2024-03-08"):
+    return generate_panel(["TEST"], days=days, timeframe="1m", end=end, seed=5).ohlcv("TEST")
+
+
+@pytest.mark.parametrize("timeframe, rule", [("5m", "5min"), ("15m", "15min"), ("1h", "60min")])
+def test_resample_matches_session_aligned_pandas(timeframe, rule):
+    bars = minute_bars()
+    frame = bars.to_frame()
+    expected = frame.resample(rule, offset="15min").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna()
+
+    result = resample(bars, timeframe)
+    assert len(result) == len(expected)
+    np.testing.assert_array_equal(result.index(), expected.index)
+    for col in ("open", "high", "low", "close"):
+        np.testing.assert_allclose(getattr(result, col), expected[col].to_numpy())
+    np.testing.assert_array_equal(result.volume, expected["volume"].to_numpy())
+
+    first = result.index()[0]
+    assert (first.hour, first.minute) == (9, 15)
+
+
+def test_resample_to_daily_uses_ist_midnight():
+    daily = resample(minute_bars(), "1d")
+    assert len(daily) == 3
+    assert daily.to_records()[0]["timestamp"] == "2024-03-06T00:00:00+05:30"
+
+
+def test_intraday_timeframes_share_one_1m_fetch(tmp_path, monkeypatch):
+    calls = []
+    bars = minute_bars(days=5, end=pd.Timestamp.now().date())
+    history = bars.to_frame().rename(columns=str.capitalize)
+
+    class FakeTicker:
+        def __init__(self, symbol, session=None):
+            pass
+
+        def history(self, period=None, interval=None, start=None):
+            calls.append(interval)
+            return history
+
+    monkeypatch.setattr(data_provider, "ohlcv_store", OHLCVStore(str(tmp_path)))
+    monkeypatch.setattr(data_provider, "_series_refreshed", {})
+    monkeypatch.setattr(data_provider, "_quote_ttl", lambda: 60)
+    monkeypatch.setitem(data_provider.breakers, "yahoo_history", CircuitBreaker("yahoo_history"))
+    monkeypatch.setattr(data_provider.yf, "Ticker", FakeTicker)
+
+    five = data_provider.get_ohlcv_data("RELIANCE", "5m", "5d")
+    hourly = data_provider.get_ohlcv_data("RELIANCE", "1h", "5d")
+
+    assert calls == ["1m"]
+    assert five.close[-1] == hourly.close[-1] == bars.close[-1]
+    assert hourly.volume.sum() <= five.volume.sum()
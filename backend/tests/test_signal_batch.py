@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from services.signal_batch import score_signals
+from services.signal_generator import generate_signal
+
+STRATEGIES = ("combined", "rsi_macd", "bb_volume", "ema_crossover", "vwap_reversal")
+
+
+def random_indicators(n, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = np.round(rng.uniform(90, 110, n), 2).tolist()
+    uniform = lambda low, high: float(rng.uniform(low, high))  # native floats, like convert_to_native output
+    rows = []
+    for i, price in enumerate(prices):
+        middle = round(price * uniform(0.97, 1.03), 2)
+        width = round(price * uniform(0.005, 0.04), 2)
+        ind = {
+            "rsi": round(uniform(5, 95), 2),
+            "macd": {"value": 0.0, "signal": 0.0, "histogram": round(float(rng.normal(0, 1.5)), 2)},
+            "ema20": round(price * uniform(0.95, 1.05), 2),
+            "ema50": round(price * uniform(0.95, 1.05), 2),
+            "bollingerBands": {"upper": middle + width, "middle": middle, "lower": middle - width},
+            "vwap": round(price * uniform(0.96, 1.04), 2),
+            "atr": round(price * uniform(0.005, 0.03), 2),
+            "volumeSpike": bool(rng.random() < 0.3),
+            "tuned": {"rsi_9": round(uniform(5, 95), 2), "ema_12": round(price * uniform(0.95, 1.05), 2)},
+            "mtf": {"1h": {"ema20": round(price * uniform(0.98, 1.02), 2), "ema50": price}},
+        }
+        # Edge cases: boundaries, missing values, equal EMAs
+        if i % 17 == 0:
+            ind["rsi"], ind["ema20"], ind["vwap"] = 30, ind["ema50"], price
+        if i % 23 == 0:
+            del ind["atr"], ind["mtf"]
+        rows.append(ind)
+    return prices, rows
+
+
+def strip(result):
+    return {k: v for k, v in result.items() if k != "timestamp"}
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("config", [
+    None,
+    {"rsi_macd": {"rsi_period": 9, "rsi_oversold": 25, "rsi_overbought": 75},
+     "ema_crossover": {"fast_period": 12}},
+    {"combined": {"confirm_timeframe": "1h"}, "rsi_macd": {"confirm_timeframe": "1h"},
+     "bb_volume": {"confirm_timeframe": "1h"}},
+])
+def test_batch_matches_per_symbol(strategy, config):
+    prices, rows = random_indicators(400)
+    batch = score_signals(prices, rows, strategy, config)
+    assert len(batch) == len(prices)
+    for i, (price, ind) in enumerate(zip(prices, rows)):
+        expected = generate_signal(f"S{i}", price, ind, strategy, config)
+        assert strip(batch.record(i, f"S{i}", ind)) == strip(expected), (i, strategy)
+        assert batch.signals[i] == expected["signal"]
+        assert batch.confidence[i] == expected["confidence"]
+
+
+def test_empty_batch():
+    batch = score_signals([], [])
+    assert len(batch) == 0 and batch.signals.tolist() == []
+
+
+def test_scan_shard_matches_per_symbol(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from services import signal_service
+    from services.synthetic_data import generate_panel
+
+    symbols = [f"SYN{i:05d}" for i in range(40)]
+    panel = generate_panel(symbols, days=80, end="2024-06-28", seed=3)
+    monkeypatch.setattr(signal_service, "get_ohlcv_panel", lambda *args, **kwargs: panel)
+    config = {"rsi_macd": {"rsi_period": 9}}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        result = signal_service._scan_shard(symbols, config, 0, executor)
+
+    expected = []
+    for symbol in symbols:
+        indicators = signal_service.calculate_all_indicators(
+            panel.ohlcv(symbol), requirements=signal_service.strategy_requirements(config)
+        )
+        signal = generate_signal(symbol, panel.quote(symbol)["currentPrice"], indicators, config=config)
+        if signal["signal"] != "HOLD":
+            expected.append(strip(signal))
+    got = sorted((strip(s) for s in result["signals"]), key=lambda s: s["symbol"])
+    assert got == sorted(expected, key=lambda s: s["symbol"]) and got
+    assert result["timing"]["score_seconds"] <= result["timing"]["compute_seconds"]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("config", [
+    None,
+    {"rsi_macd": {"rsi_period": 9, "macd_fast": 8, "macd_slow": 21, "macd_signal": 5},
+     "bb_volume": {"bb_period": 10, "bb_std": 2.5}, "ema_crossover": {"fast_period": 12, "slow_period": 30}},
+])
+def test_signal_series_matches_per_bar(strategy, config):
+    from services.indicator_engine import compute_indicators
+    from services.indicators import convert_to_native
+    from services.signal_batch import signal_series
+    from services.signal_generator import strategy_requirements
+    from services.synthetic_data import generate_bars
+
+    bars = generate_bars("TCS", 260, "1d", end="2024-06-28")
+    result = signal_series(bars, strategy, config)
+    series = compute_indicators(bars, strategy_requirements(config))
+    assert len(result) == len(bars)
+    for i in range(len(bars)):
+        indicators = convert_to_native(series.latest(i))
+        expected = generate_signal("TCS", float(bars.close[i]), indicators, strategy, config)
+        assert strip(result.record(i, "TCS")) == strip(expected), i
+    assert {"BUY", "SELL"} & set(result.signals.tolist())
@@ -0,0 +1,65 @@
+import pytest
+from services.data_provider import NIFTY_50_SYMBOLS
+from services.synthetic_data import generate_panel
+from services.symbol_universe import SymbolUniverse
+
+UNIVERSE_CSV = """symbol,exchange,name,tags
+RELIANCE,NSE,Reliance Industries,NIFTY50|NIFTY500|FNO
+TCS,NSE,Tata Consultancy Services,NIFTY50;NIFTY500
+IRCTC,NSE,,NIFTY500|fno
+reliance,NSE,,MIDCAP
+"""
+
+
+def test_load_universe_with_tags(tmp_path):
+    path = tmp_path / "universe.csv"
+    path.write_text(UNIVERSE_CSV)
+    universe = SymbolUniverse.load(str(path))
+
+    assert len(universe) == 3
+    assert universe.symbols() == ["RELIANCE", "TCS", "IRCTC"]
+    assert universe.symbols("fno") == ["RELIANCE", "IRCTC"]
+    assert universe.symbols("NIFTY50", exchange="BSE") == []
+    assert universe.info("IRCTC")["name"] == "IRCTC"
+    assert universe.info("RELIANCE")["tags"] == ["FNO", "MIDCAP", "NIFTY50", "NIFTY500"]
+    assert universe.tags() == {"NIFTY50": 2, "NIFTY500": 3, "FNO": 2, "MIDCAP": 1}
+
+
+def test_missing_file_falls_back_to_nifty50(tmp_path):
+    universe = SymbolUniverse.load(str(tmp_path / "missing.csv"))
+    assert universe.symbols("NIFTY50") == NIFTY_50_SYMBOLS
+    assert "TCS" in universe
+
+
+def test_scan_runs_in_shards(monkeypatch):
+    from services import signal_service
+
+    class FakeQuery:
+        def filter(self, *args):
+            return self
+
+        def all(self):
+            return []
+
+    class FakeDB:
+        def query(self, model):
+            return FakeQuery()
+
+    panel_calls = []
+
+    def fake_panel(symbols, timeframe, period, exchange="NSE"):
+        panel_calls.append(list(symbols))
+        return generate_panel(list(symbols), days=80, end="2024-06-28", seed=1)
+
+    monkeypatch.setattr(signal_service, "get_ohlcv_panel", fake_panel)
+    monkeypatch.setattr(signal_service.settings, "scan_shard_size", 4)
+    monkeypatch.setattr(signal_service.settings, "scan_max_workers", 2)
+
+    symbols = [f"SYN{i:05d}" for i in range(10)]
+    signal_service.scan_market_and_save_signals(FakeDB(), symbols=symbols, min_confidence=101)
+
+    assert [len(c) for c in panel_calls] == [4, 4, 2]
+    report = signal_service.last_scan_report
+    assert report["symbols"] == 10
+    assert [s["symbols"] for s in report["shards"]] == [4, 4, 2]
+    assert all(s["total_seconds"] >= s["fetch_seconds"] for s in report["shards"])
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from services import data_provider
+from services.circuit_breaker import CircuitBreaker
+from services.synthetic_data import generate_panel, iter_panels, generate_bars, session_timestamps, trading_days
+
+
+def test_same_seed_same_panel():
+    a = generate_panel(3, days=20, timeframe="5m", seed=7)
+    b = generate_panel(3, days=20, timeframe="5m", seed=7)
+    c = generate_panel(3, days=20, timeframe="5m", seed=8)
+    np.testing.assert_array_equal(a.close, b.close)
+    np.testing.assert_array_equal(a.volume, b.volume)
+    assert not np.array_equal(a.close, c.close)
+
+
+def test_session_timestamps_follow_nse_hours():
+    days = trading_days(2, start="2024-01-05")  # Friday, then Monday
+    ts = pd.to_datetime(session_timestamps(days, "15m"), utc=True).tz_convert("Asia/Kolkata")
+    assert len(ts) == 50
+    assert ts[0] == pd.Timestamp("2024-01-05 09:15", tz="Asia/Kolkata")
+    assert ts[24] == pd.Timestamp("2024-01-05 15:15", tz="Asia/Kolkata")
+    assert ts[25] == pd.Timestamp("2024-01-08 09:15", tz="Asia/Kolkata")
+
+
+def test_bars_are_consistent_and_cluster():
+    panel = generate_panel(20, days=500, seed=1)
+    assert (panel.high >= np.maximum(panel.open, panel.close)).all()
+    assert (panel.low <= np.minimum(panel.open, panel.close)).all()
+    assert (panel.volume > 0).all()
+
+    returns = np.diff(np.log(panel.close), axis=1)
+    annual_vol = returns.std(axis=1).mean() * np.sqrt(252)
+    assert 0.15 < annual_vol < 0.4
+
+    # Volatility clustering: absolute returns are positively autocorrelated
+    abs_r = np.abs(returns) - np.abs(returns).mean(axis=1, keepdims=True)
+    autocorr = (abs_r[:, 1:] * abs_r[:, :-1]).mean() / abs_r.var()
+    assert autocorr > 0.02
+
+
+def test_iter_panels_covers_universe_in_chunks():
+    panels = list(iter_panels(250, chunk_size=100, days=2, timeframe="1m", seed=3))
+    assert [len(p) for p in panels] == [100, 100, 50]
+    assert panels[-1].symbols[-1] == "SYN00249"
+    assert panels[0].close.shape == (100, 750)
+
+
+def test_generate_bars_is_stable_per_symbol():
+    a = generate_bars("TCS", 120, "1d", end="2024-06-28")
+    b = generate_bars("TCS", 120, "1d", end="2024-06-28")
+    assert len(a) == 120
+    np.testing.assert_array_equal(a.close, b.close)
+    assert not np.array_equal(a.close, generate_bars("INFY", 120, "1d", end="2024-06-28").close)
+
+
+def test_mock_fallback_uses_seeded_generator(monkeypatch, tmp_path):
+    class FailingTicker:
+        def __init__(self, symbol, session=None):
+            pass
+
+        def history(self, **kwargs):
+            raise ConnectionError("offline")
+
+    monkeypatch.setattr(data_provider, "ohlcv_store", data_provider.OHLCVStore(str(tmp_path)))
+    monkeypatch.setitem(data_provider.breakers, "yahoo_history", CircuitBreaker("yahoo_history"))
+    monkeypatch.setattr(data_provider.yf, "Ticker", FailingTicker)
+    monkeypatch.setattr(data_provider, "get_stock_info_google", lambda symbol, exchange="NSE": {"currentPrice": 500.0})
+
+    first = data_provider.get_ohlcv_data("ZZTEST", "1d", "1mo")
+    second = data_provider.get_ohlcv_data("ZZTEST", "1d", "1mo")
+    assert len(first) == 100
+    assert first.close[-1] == 500.0
+    np.testing.assert_array_equal(first.close, second.close)
@@ -0,0 +1,56 @@
+import pytest
+from services import data_provider, warmup
+from services.cache import TTLCache
+from services.ohlcv_store import OHLCVStore, frame_to_columns
+from services.symbol_universe import SymbolUniverse
+from tests.test_ohlcv_store import make_history
+
+
+@pytest.fixture
+def fresh_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_provider, "quote_cache", TTLCache(maxsize=100, ttl=lambda: 30))
+    monkeypatch.setattr(data_provider, "ohlcv_store", OHLCVStore(str(tmp_path / "ohlcv")))
+    monkeypatch.setattr(warmup.settings, "quote_snapshot_path", str(tmp_path / "quotes.json"))
+    return tmp_path
+
+
+def test_quote_snapshot_roundtrip_keeps_age(fresh_caches, monkeypatch):
+    data_provider.quote_cache.put(("TCS", "NSE"), {"symbol": "TCS", "currentPrice": 4000.0})
+    data_provider.quote_cache.put(("INFY", "NSE"), {"symbol": "INFY", "currentPrice": 1500.0}, age=60)
+    assert warmup.save_quote_snapshot() == 2
+
+    monkeypatch.setattr(data_provider, "quote_cache", TTLCache(maxsize=100, ttl=lambda: 30))
+    assert warmup.load_quote_snapshot() == 2
+
+    quote, fresh = data_provider.quote_cache.lookup(("TCS", "NSE"))
+    assert quote["currentPrice"] == 4000.0 and fresh
+    # Older than the TTL when saved, so it comes back stale
+    assert data_provider.quote_cache.lookup(("INFY", "NSE"))[1] is False
+
+
+def test_warmup_prefetches_only_what_is_missing(fresh_caches, monkeypatch):
+    universe = SymbolUniverse({"symbol": s, "tags": ["NIFTY50"]} for s in ["TCS", "INFY", "SBIN"])
+    monkeypatch.setattr(warmup, "get_universe", lambda: universe)
+    data_provider.quote_cache.put(("TCS", "NSE"), {"symbol": "TCS", "currentPrice": 4000.0})
+    data_provider.ohlcv_store.merge("INFY", "1d", "NSE", frame_to_columns(make_history("2024-01-01", 5)), covered_from=0)
+
+    calls = {}
+
+    def fake_bulk(symbols, exchange="NSE"):
+        calls["quotes"] = list(symbols)
+        return {s: {"symbol": s, "currentPrice": 1.0} for s in symbols}
+
+    def fake_panel(symbols, timeframe="1d", period="3mo", exchange="NSE"):
+        calls["series"] = list(symbols)
+        return symbols
+
+    monkeypatch.setattr(data_provider, "get_bulk_quotes", fake_bulk)
+    monkeypatch.setattr(data_provider, "get_ohlcv_panel", fake_panel)
+    monkeypatch.setattr(warmup, "warmup_status", {"state": "pending"})
+    assert not warmup.is_ready()
+
+    status = warmup.run_warmup()
+    assert status["state"] == "ready" and warmup.is_ready()
+    assert calls == {"quotes": ["INFY", "SBIN"], "series": ["TCS", "SBIN"]}
+    assert status["series_loaded"] == 1
+    assert data_provider.quote_cache.lookup(("SBIN", "NSE"))[0]["currentPrice"] == 1.0
@@ -18,6 +18,15 @@ interface SignalResponse {
   is_active: boolean;
 }
 
+export interface SignalHistoryPoint {
+  timestamp: string;
+  close: number;
+  signal: 'BUY' | 'SELL' | 'HOLD';
+  confidence: number;
+  stop_loss: number;
+  target: number;
+}
+
 const mapSignal = (sig: SignalResponse): TradingSignal => ({
   id: sig.id.toString(), // Frontend expects string ID
   symbol: sig.symbol,
@@ -56,6 +65,19 @@ export const signalService = {
     return mapSignal(response.data);
   },
 
+  // Strategy output at every bar (from the 50th), for signal-history charts
+  async getSignalHistory(
+    symbol: string,
+    strategy: string = 'combined',
+    timeframe: string = '1d',
+    period: string = '6mo'
+  ): Promise<SignalHistoryPoint[]> {
+    const response: any = await api.get(`/api/signals/stock/${symbol}/history`, {
+      params: { strategy, timeframe, period }
+    });
+    return response.data;
+  },
+
   async triggerGeneration(symbols?: string[], minConfidence: number = 60): Promise<any> {
     const response: any = await api.post('/api/signals/generate', {
       symbols,
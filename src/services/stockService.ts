@@ -9,6 +9,7 @@ export interface StockData {
   change: number;
   changePercent: number;
   volume: number;
+  volumeReported?: boolean;
   avgVolume: number;
   marketCap?: number;
   previousClose?: number;
@@ -41,6 +42,26 @@ export interface IndicatorsData {
   vwap: number;
   atr: number;
   volumeSpike: boolean;
+  // null until each indicator's window fills
+  adx: {
+    value: number | null;
+    plusDI: number | null;
+    minusDI: number | null;
+  };
+  stochastic: {
+    k: number | null;
+    d: number | null;
+  };
+  supertrend: {
+    value: number | null;
+    direction: 1 | -1 | null;
+  };
+  obv: number | null;
+  donchianChannels: {
+    upper: number | null;
+    middle: number | null;
+    lower: number | null;
+  };
 }
 
 export const stockService = {
@@ -68,5 +89,17 @@ export const stockService = {
       params: { timeframe, exchange }
     });
     return response.data;
+  },
+
+  // Indicators of the finest timeframe, with the coarser ones under `mtf` (one fetch)
+  async getMultiTimeframeIndicators(
+    symbol: string,
+    timeframes: string[] = ['15m', '1h', '1d'],
+    exchange: string = 'NSE'
+  ): Promise<IndicatorsData & { mtf: Record<string, IndicatorsData | null> }> {
+    const response: any = await api.get(`/api/stocks/${symbol}/indicators/mtf`, {
+      params: { timeframes: timeframes.join(','), exchange }
+    });
+    return response.data;
   }
 };